@@ -1,4 +1,16 @@
 # python-ml/api/ml_api.py - COMPLETE UPDATED VERSION
+"""Flask API for CNN document classification, Philippine OCR and verification
+
+Serving model at startup, first match wins (the winner is logged):
+
+    1. the active registry version (saved_models/versions/, set through
+       /models/<id>/activate, /models/register or /train): an explicit choice,
+       so CNN_LATENCY_BUDGET_MS and resolution variants are not consulted
+    2. the resolution variant from model_variants.json that fits
+       CNN_LATENCY_BUDGET_MS, unless saved_models/ph_document_cnn.keras was
+       trained after it
+    3. saved_models/ph_document_cnn.keras
+"""
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import threading
@@ -14,6 +26,7 @@ import pytesseract
 from werkzeug.utils import secure_filename
 import re
 from difflib import SequenceMatcher
+from contextlib import nullcontext
 
 # ============================================
 # CORRECT PATHS FOR YOUR STRUCTURE:
@@ -29,36 +42,86 @@ sys.path.insert(0, cnn_path)
 ocr_path = os.path.join(current_dir, '..', 'ocr')  # /backend/python-ml/ocr/
 sys.path.insert(0, ocr_path)
 
+# Path to name/address matching module
+matching_path = os.path.join(current_dir, '..', 'matching')  # /backend/python-ml/matching/
+sys.path.insert(0, matching_path)
+
+# Path to runtime settings (CPU thread budget)
+runtime_path = os.path.join(current_dir, '..', 'runtime')  # /backend/python-ml/runtime/
+sys.path.insert(0, runtime_path)
+
+# Give TensorFlow, OpenCV and Tesseract this worker's share of the CPU
+# before the CNN is imported and TensorFlow starts its thread pools
+from resource_config import apply_resource_config
+resource_config = apply_resource_config('serving')
+
 # Path to saved models: backend/python-ml/saved_models/
 saved_models_path = os.path.join(current_dir, '..', 'saved_models')
 
 # Path to Philippine ID images: backend/uploads/real_ids/
 real_ids_path = os.path.join(current_dir, '..', '..', 'uploads', 'real_ids')
 
+# Path to barangay resident roster: backend/python-ml/data/residents.json
+roster_file = os.path.join(current_dir, '..', 'data', 'residents.json')
+
 app = Flask(__name__)
 CORS(app)
 
 # Import your REAL CNN
+def load_cnn_model(model_path):
+    """Model registry loader: a ready PhilippineDocumentCNN or an exception"""
+    loaded = PhilippineDocumentCNN()
+    if not loaded.load_model(model_path):
+        raise RuntimeError(f"Could not load model: {model_path}")
+    return loaded
+
 try:
-    from train_cnn import PhilippineDocumentCNN
+    from train_cnn import PhilippineDocumentCNN, select_model_variant
+    from model_registry import ModelRegistry
     print("✅ Philippine Document CNN loaded successfully")
     CNN_AVAILABLE = True
-    cnn = PhilippineDocumentCNN()
-    
-    # Load pre-trained model from CORRECT PATH
-    model_file = os.path.join(saved_models_path, 'ph_document_cnn.keras')
-    print(f"📂 Looking for model at: {model_file}")
-    
-    if os.path.exists(model_file):
-        print(f"✅ Found model, loading...")
-        cnn.load_model(model_file)
-        print(f"   Model accuracy: {cnn.model_accuracy*100:.1f}%")
-        if hasattr(cnn, 'training_stats'):
-            print(f"   Training images: {cnn.training_stats.get('totalImages', 0)}")
+    cnn = None
+    model_variant = None
+    
+    # Versioned models (saved_models/versions/<id>/) are hot-swapped through the registry
+    model_registry = ModelRegistry(saved_models_path, load_cnn_model)
+    registered_version = model_registry.state['active']
+    
+    latency_budget_ms = float(os.environ.get('CNN_LATENCY_BUDGET_MS') or 0) or None
+    if model_registry.has_version(registered_version):
+        print(f"📦 Serving model source: active registry version {registered_version}"
+              + (" (CNN_LATENCY_BUDGET_MS and resolution variants not used)" if latency_budget_ms else ""))
+        CNN_AVAILABLE = model_registry.activate(registered_version, background=False)
     else:
-        print(f"❌ Model not found at: {model_file}")
-        print("   Train first: cd python-ml/cnn && python train_cnn.py")
-        CNN_AVAILABLE = False
+        cnn = PhilippineDocumentCNN()
+        
+        # Load pre-trained model from CORRECT PATH
+        model_file = os.path.join(saved_models_path, 'ph_document_cnn.keras')
+        
+        # Resolution variants (python train_cnn.py variants): most accurate one within budget
+        model_variant = select_model_variant(saved_models_path, latency_budget_ms)
+        variant_file = os.path.join(saved_models_path, model_variant['modelPath']) if model_variant else None
+        if variant_file and os.path.exists(model_file) and os.path.getmtime(model_file) > os.path.getmtime(variant_file):
+            print(f"📦 Serving model source: ph_document_cnn.keras (trained after the resolution variants)")
+            model_variant = None
+        elif model_variant:
+            model_file = variant_file
+            print(f"📦 Serving model source: resolution variant {model_variant['inputSize']}px, "
+                  f"p95 {model_variant['latencyMs']['p95Ms']:.1f} ms "
+                  f"(budget: {f'{latency_budget_ms:.0f} ms' if latency_budget_ms else 'none'})")
+        else:
+            print(f"📦 Serving model source: ph_document_cnn.keras")
+        print(f"📂 Looking for model at: {model_file}")
+        
+        if os.path.exists(model_file) and cnn.load_model(model_file):
+            print(f"   Model accuracy: {cnn.model_accuracy*100:.1f}%")
+            if hasattr(cnn, 'training_stats'):
+                print(f"   Training images: {cnn.training_stats.get('totalImages', 0)}")
+            model_registry.adopt(cnn, 'unversioned', model_file)
+        else:
+            print(f"❌ Model not found at: {model_file}")
+            print("   Train first: cd python-ml/cnn && python train_cnn.py")
+            CNN_AVAILABLE = False
         
 except ImportError as e:
     print(f"❌ CNN import error: {e}")
@@ -66,6 +129,16 @@ except ImportError as e:
     traceback.print_exc()
     CNN_AVAILABLE = False
     cnn = None
+    model_variant = None
+    model_registry = None
+
+# POST /train runs train_cnn.py in a separate niced, thread-capped process
+from training_service import TrainingService
+training_service = TrainingService(cnn_path, os.path.join(saved_models_path, 'training_jobs'), model_registry)
+
+def lease_cnn():
+    """The serving CNN for the duration of one request (None when no model is loaded)"""
+    return model_registry.lease() if model_registry else nullcontext()
 
 # Import Enhanced Philippine OCR
 try:
@@ -77,6 +150,36 @@ except ImportError as e:
     OCR_AVAILABLE = False
     ph_ocr = None
 
+# Bounded, parallel Tesseract runs for the debug / test endpoints
+from ocr_executor import ocr_executor
+
+def variant_timings(outcomes):
+    """Per-variant timing (and error) for a run_variants response"""
+    return {name: {key: outcome[key] for key in ('elapsedMs', 'queuedMs', 'error')}
+            for name, outcome in outcomes.items()}
+
+# Per-request photo with a cached card crop (ML_CARD_CROP=ocr|all|off)
+from document_image import DocumentImage
+
+# Rescale to ~300 DPI text size before OCR (ML_OCR_RESOLUTION=auto|off)
+from resolution import normalize_resolution
+
+# Image-quality gate in front of the CNN and OCR (ML_QUALITY_GATE=flag|reject|off)
+from image_quality import assess_image_file
+from pipeline_config import pipeline_config
+
+# Barangay resident roster (for matching OCR names against registered residents)
+from resident_roster import resident_roster, read_roster_file
+from name_canonical import name_canonicalizer
+from symspell import ocr_corrector
+from gazetteer import ph_gazetteer
+if os.path.exists(roster_file):
+    try:
+        resident_roster.load_file(roster_file)
+    except Exception as e:
+        print(f"⚠️ Could not load resident roster: {e}")
+resident_roster.source_path = roster_file
+
 # Configuration
 UPLOAD_FOLDER = os.path.join(current_dir, 'temp_uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -84,16 +187,46 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg', 'gif'}
 
+def check_upload_quality(filepath):
+    """Quality gate before CNN and OCR: (report, 422 response or None)
+
+    Blurry, tiny, dark or text-less photos are rejected in milliseconds
+    instead of failing after seconds of CNN + Tesseract work.
+    """
+    if pipeline_config['qualityGate'] == 'off':
+        return None, None
+    
+    report = assess_image_file(filepath)
+    reasons = [reason['code'] for reason in report['reasons']]
+    print(f"   🔎 Quality check: {report['verdict']} in {report['elapsedMs']:.1f}ms"
+          + (f" ({', '.join(reasons)})" if reasons else ''))
+    
+    if report['verdict'] != 'reject' or pipeline_config['qualityGate'] != 'reject':
+        return report, None
+    
+    try:
+        os.remove(filepath)
+    except OSError:
+        pass
+    
+    return report, (jsonify({
+        'success': False,
+        'error': 'Image quality too low for verification',
+        'userMessage': ' '.join(reason['message'] for reason in report['reasons']
+                                if reason['severity'] == 'reject'),
+        'qualityCheck': report
+    }), 422)
+
 # ============================================
 # ENHANCED PHILIPPINE OCR FUNCTIONS
 # ============================================
 
-def extract_text_with_ph_ocr(image_path):
+def extract_text_with_ph_ocr(image_path, id_type=None):
     """Extract text using enhanced Philippine OCR - SIMPLIFIED"""
     try:
         # Always use the Philippine OCR
         if OCR_AVAILABLE and ph_ocr:
-            result = ph_ocr.extract_text(image_path)
+            result = ph_ocr.extract_text(image_path, id_type)
             return result
         else:
             print("⚠️ Philippine OCR not available, using direct Tesseract")
@@ -106,9 +239,11 @@ def extract_text_with_ph_ocr(image_path):
 def extract_with_direct_tesseract(image_path):
     """Direct Tesseract extraction as fallback"""
     try:
-        img = cv2.imread(image_path)
+        img = image_path if isinstance(image_path, np.ndarray) else cv2.imread(image_path)
         if img is None:
             return {'text': '', 'confidence': 0, 'fields': {}, 'success': False}
+        if pipeline_config['ocrResolution'] == 'auto':
+            img, _ = normalize_resolution(img)
         
         # Use the working preprocessing (from your test results)
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -175,8 +310,13 @@ def simple_field_extraction_from_text(text):
     
     return fields
 
-def extract_fields_from_ph_result(ocr_result, id_type=None):
-    """Extract and format fields from Philippine OCR result - FIXED VERSION"""
+def extract_fields_from_ph_result(ocr_result, id_type=None, user_data=None):
+    """Extract and format fields from Philippine OCR result - FIXED VERSION
+    
+    user_data (what the user entered, when verifying) limits lexicon correction
+    to fields that would not match as read, and never rewrites a word the user typed.
+    Without it only digit/letter misreads (ESPEN1DA) are corrected.
+    """
     if not ocr_result or not ocr_result.get('success'):
         return {}
     
@@ -263,6 +403,24 @@ def extract_fields_from_ph_result(ocr_result, id_type=None):
             standardized.update(emergency_fields)
             print(f"⚠️ Emergency extraction got: {list(emergency_fields.keys())}")
     
+    # Correct OCR misreads (ESPEN1DA, BULAM) against the names/places lexicon
+    field_matches = {
+        'fullName': lambda ocr, user: advanced_name_comparison(ocr, user)['match'],
+        'address': lambda ocr, user: compare_ph_address(user, ocr)
+    }
+    for field_name in ('fullName', 'address'):
+        if standardized.get(field_name):
+            user_value = (user_data or {}).get(field_name, '')
+            if user_value and field_matches[field_name](standardized[field_name], user_value.upper()):
+                continue  # read correctly: a rarer real name must not become a more common one
+            corrected, corrections = ocr_corrector.correct_text(
+                standardized[field_name], keep=re.findall(r'[A-Z0-9]+', user_value.upper()),
+                misreads_only=not user_value)
+            if corrections:
+                standardized[field_name] = corrected
+                print(f"🔤 Lexicon corrected {field_name}: " +
+                      ", ".join(f"{c['from']}->{c['to']}" for c in corrections))
+    
     print(f"📊 Final extracted fields: {standardized}")
     return standardized
 
@@ -440,8 +598,8 @@ def advanced_name_comparison(ocr_name, user_name, doc_type=None):
             'note': 'All name components match'
         }
     
-    # Check for OCR errors (common mistakes)
-    corrected = correct_common_ocr_errors(ocr_clean, user_clean)
+    # Check for OCR errors (common mistakes) - uncleaned, so digits are still visible
+    corrected = correct_common_ocr_errors(ocr_name.upper(), user_name.upper())
     if corrected['match']:
         return {
             'match': True,
@@ -502,24 +660,6 @@ def check_name_variations(ocr_name, user_name, doc_type):
             'note': 'Match without middle initial'
         }
     
-    # Check for nickname variations
-    nickname_mapping = {
-        'JOSEPH': 'JOE',
-        'ROBERT': 'BOB',
-        'WILLIAM': 'BILL',
-        'RICHARD': 'DICK',
-        'EDWARD': 'ED',
-        'MICHAEL': 'MIKE',
-        'CHRISTOPHER': 'CHRIS',
-        'DANIEL': 'DAN',
-        'ANTHONY': 'TONY',
-        'PATRICIA': 'PAT',
-        'ELIZABETH': 'LIZ',
-        'KATHERINE': 'KATE',
-        'CHRISTINE': 'CHRIS',
-        'MARGARET': 'MEG'
-    }
-    
     ocr_words = ocr_name.split()
     user_words = user_name.split()
     
@@ -527,9 +667,8 @@ def check_name_variations(ocr_name, user_name, doc_type):
         all_match = True
         for ocr_word, user_word in zip(ocr_words, user_words):
             if ocr_word != user_word:
-                # Check if one is nickname of the other
-                if (user_word in nickname_mapping and nickname_mapping[user_word] == ocr_word) or \
-                   (ocr_word in nickname_mapping and nickname_mapping[ocr_word] == user_word):
+                # Check if one is nickname of the other (precomputed class index)
+                if name_canonicalizer.is_nickname_variant(ocr_word, user_word):
                     continue
                 elif len(ocr_word) == 1 and user_word.startswith(ocr_word):
                     continue  # Initial match
@@ -545,27 +684,21 @@ def check_name_variations(ocr_name, user_name, doc_type):
                 'confidence': 90,
                 'note': 'Match with nickname/initial variations'
             }
+        
+        # Check for consonant respellings (C/K, Z/S, V/B, PH/F) with the same vowels
+        if name_canonicalizer.is_spelling_variant(ocr_name, user_name):
+            return {
+                'match': True,
+                'confidence': 88,
+                'note': 'Match with phonetic spelling variations'
+            }
     
     return {'match': False, 'confidence': 0}
 
 def correct_common_ocr_errors(ocr_name, user_name):
-    """Correct common OCR errors in names"""
-    common_errors = {
-        'O': '0',
-        'I': '1',
-        'Z': '2',
-        'S': '5',
-        'B': '8',
-        'G': '6',
-        'L': '1'
-    }
-    
-    # Try correcting OCR errors
-    corrected_ocr = ocr_name
-    for wrong, right in common_errors.items():
-        corrected_ocr = corrected_ocr.replace(wrong, right)
-    
-    if corrected_ocr == user_name:
+    """Correct common OCR errors in names (0/O, 1/I/L, 2/Z, 5/S, 8/B, 6/G)"""
+    # Digits in the OCR text may stand for the letter the user typed at that position
+    if name_canonicalizer.ocr_equivalent(ocr_name, user_name):
         return {
             'match': True,
             'confidence': 85,
@@ -651,6 +784,16 @@ def compare_ph_address(addr1, addr2):
     if addr1_upper == addr2_upper:
         return True
     
+    # Resolve both to canonical (barangay, municipality, province) via the PSGC gazetteer
+    place1, candidates1 = ph_gazetteer.resolve_detail(addr1_upper)
+    place2, candidates2 = ph_gazetteer.resolve_detail(addr2_upper)
+    if place1[0] and place2[0]:
+        if place1 == place2:
+            return True
+        if candidates1 == 1 and candidates2 == 1:
+            return False
+        # Either barangay pick is a guess between several names: use the keyword heuristics below
+    
     # Check for common Philippine address keywords
     ph_keywords = ['BRGY', 'BARANGAY', 'BULAN', 'SORSOGON', 'ST.', 'STREET']
     
@@ -917,6 +1060,9 @@ def home():
                 <li><strong>POST /upload/ocr</strong> - Enhanced Philippine OCR</li>
                 <li><strong>POST /upload/verify</strong> - Complete Verification (CNN + OCR + Matching)</li>
                 <li><strong>POST /api/debug/ocr</strong> - Debug OCR Processing</li>
+                <li><strong>POST /roster/match</strong> - Match OCR name against resident roster</li>
+                <li><strong>POST /train</strong> - Background CNN training (progress: <strong>GET /train/status</strong>, stop: <strong>POST /train/cancel</strong>)</li>
+                <li><strong>GET /models</strong> - Model versions; <strong>POST /models/&lt;version&gt;/activate</strong>, <strong>POST /models/rollback</strong> - Hot-swap the CNN</li>
             </ol>
             
             <h4>🔧 For Postman Testing:</h4>
@@ -972,14 +1118,22 @@ def upload_and_classify():
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         file.save(filepath)
         
+        quality_check, rejection = check_upload_quality(filepath)
+        if rejection:
+            return rejection
+        
+        # One decode and one card detection shared by the CNN and OCR stages
+        document = DocumentImage(filepath)
+        
         # Try REAL CNN classification first
         detected_type = "Unknown"
         confidence = 0.0
         is_real_cnn = False
         
-        if CNN_AVAILABLE and cnn and hasattr(cnn, 'classify'):
+        # Pin the serving model: a hot swap during this request must not release it
+        with lease_cnn() as active_cnn:
             try:
-                result = cnn.classify(filepath)
+                result = active_cnn.classify(document.for_cnn()) if active_cnn else None
                 if result:
                     detected_type = result['detectedIdType']
                     confidence = result['confidenceScore']
@@ -1057,8 +1211,8 @@ def upload_and_classify():
         processing_time = int((time.time() - start_time) * 1000)
         
         # Get model info
-        model_accuracy = cnn.model_accuracy if CNN_AVAILABLE and cnn and hasattr(cnn, 'model_accuracy') else 0.78
-        training_images = cnn.training_stats.get('totalImages', 0) if CNN_AVAILABLE and cnn and hasattr(cnn, 'training_stats') else 31
+        model_accuracy = active_cnn.model_accuracy if active_cnn else 0.78
+        training_images = active_cnn.training_stats.get('totalImages', 0) if active_cnn else 31
         
         response = {
             'status': 'success',
@@ -1072,14 +1226,19 @@ def upload_and_classify():
                 'allPredictions': predictions[:5],
                 'processingTime': processing_time,
                 'isRealCNN': is_real_cnn,
-                'modelArchitecture': '8-layer CNN (TensorFlow Python)' if is_real_cnn else 'Image Analysis',
+                'modelArchitecture': (('Compact separable CNN (TensorFlow Python)'
+                                       if active_cnn.training_stats.get('architecture') == 'compact'
+                                       else '8-layer CNN (TensorFlow Python)')
+                                      if is_real_cnn else 'Image Analysis'),
                 'thesisComponent': 'CNN Document Classification',
                 'accuracy': float(model_accuracy),
                 'framework': 'TensorFlow Python',
                 'application': 'Barangay Lajong Document Verification',
                 'trainingImages': training_images,
                 'realTraining': True
-            }
+            },
+            'qualityCheck': quality_check,
+            'cardCrop': document.crop_info()
         }
         
         print(f"✅ Classification complete in {processing_time}ms")
@@ -1115,13 +1274,21 @@ def upload_and_ocr():
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         file.save(filepath)
         
+        quality_check, rejection = check_upload_quality(filepath)
+        if rejection:
+            return rejection
+        
+        # One decode and one card detection shared by the CNN and OCR stages
+        document = DocumentImage(filepath)
+        
         print(f"   Processing: {file.filename}")
         
+        # Get ID type (also orders the OCR strategy ladder)
+        id_type = request.form.get('idType', '')
+        
         # Use Enhanced Philippine OCR
-        ocr_result = extract_text_with_ph_ocr(filepath)
+        ocr_result = extract_text_with_ph_ocr(document.for_ocr(), id_type or None)
         
-        # Get ID type
-        id_type = request.form.get('idType', '')
         if not id_type and OCR_AVAILABLE:
             # Try to detect from OCR text
             if ocr_result.get('text'):
@@ -1148,6 +1315,14 @@ def upload_and_ocr():
             'backend': 'Enhanced Philippine OCR' if OCR_AVAILABLE else 'Basic OCR',
             'characterCount': len(ocr_result.get('text', '')),
             'note': 'OCR extraction with Philippine ID parsing',
+            'ocrStrategy': ocr_result.get('ocrStrategy'),
+            'ocrAttempts': ocr_result.get('ocrAttempts', []),
+            'layoutRegions': ocr_result.get('layoutRegions'),
+            'resolution': ocr_result.get('resolution'),
+            'mrz': ocr_result.get('mrz'),
+            'codes': ocr_result.get('codes'),
+            'qualityCheck': quality_check,
+            'cardCrop': document.crop_info(),
             'capabilities': [
                 'Parses Philippine ID formats',
                 'Handles LAST/FIRST/MIDDLE name fields',
@@ -1205,15 +1380,23 @@ def upload_and_verify():
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         file.save(filepath)
         
+        quality_check, rejection = check_upload_quality(filepath)
+        if rejection:
+            return rejection
+        
+        # One decode and one card detection shared by the CNN and OCR stages
+        document = DocumentImage(filepath)
+        
         # 1. CNN Classification
         cnn_result = None
         detected_type = "Unknown"
         confidence = 0.0
         is_real_cnn = False
         
-        if CNN_AVAILABLE and cnn and hasattr(cnn, 'classify'):
+        # Pin the serving model: a hot swap during this request must not release it
+        with lease_cnn() as active_cnn:
             try:
-                cnn_result = cnn.classify(filepath)
+                cnn_result = active_cnn.classify(document.for_cnn()) if active_cnn else None
                 if cnn_result:
                     detected_type = cnn_result['detectedIdType']
                     confidence = cnn_result['confidenceScore']
@@ -1223,8 +1406,14 @@ def upload_and_verify():
                 print(f"   ⚠️ CNN error: {e}")
         
          # 2. ENHANCED OCR Extraction
-        ocr_result = extract_text_with_ph_ocr(filepath)
-        ocr_fields = extract_fields_from_ph_result(ocr_result, detected_type)
+        ocr_result = extract_text_with_ph_ocr(document.for_ocr(), detected_type if is_real_cnn else user_selected)
+        user_data = {
+            'fullName': user_fullname,
+            'address': user_address
+        }
+        if user_idnumber:
+            user_data['idNumber'] = user_idnumber
+        ocr_fields = extract_fields_from_ph_result(ocr_result, detected_type, user_data)
         
         print(f"   📝 OCR extracted {len(ocr_result.get('text', ''))} characters")
         print(f"   📊 OCR fields: {list(ocr_fields.keys())}")
@@ -1234,13 +1423,6 @@ def upload_and_verify():
             print(f"   📄 First 200 chars of OCR text: {ocr_result['text'][:200]}")
         
         # 3. Compare user data with OCR data (Philippine version)
-        user_data = {
-            'fullName': user_fullname,
-            'address': user_address
-        }
-        if user_idnumber:
-            user_data['idNumber'] = user_idnumber
-        
         comparison = compare_user_with_ocr(ocr_fields, user_data, detected_type)
         
         # 4. Check document type mismatch
@@ -1326,11 +1508,18 @@ def upload_and_verify():
                 'comparisonDetails': comparison,
                 'matchPercentage': comparison['matchPercentage'],
                 'hasDataMismatch': has_data_mismatch,
-                'ocrBackend': 'Enhanced Philippine OCR' if OCR_AVAILABLE else 'Basic OCR'
+                'ocrBackend': 'Enhanced Philippine OCR' if OCR_AVAILABLE else 'Basic OCR',
+                'ocrStrategy': ocr_result.get('ocrStrategy'),
+                'ocrAttempts': ocr_result.get('ocrAttempts', []),
+                'layoutRegions': ocr_result.get('layoutRegions'),
+                'mrz': ocr_result.get('mrz'),
+                'codes': ocr_result.get('codes')
             },
             'processingTime': processing_time,
             'thesisComponent': 'Automated Philippine Document Verification System',
-            'note': 'Professional OCR with advanced comparison algorithms'
+            'note': 'Professional OCR with advanced comparison algorithms',
+            'qualityCheck': quality_check,
+            'cardCrop': document.crop_info()
         }
         
         print(f"✅ Verification complete in {processing_time}ms")
@@ -1363,35 +1552,40 @@ def debug_ocr():
         height, width = img.shape[:2]
         
         # Test different preprocessing methods
-        results = {}
-        
-        # 1. Original grayscale
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        text1 = pytesseract.image_to_string(gray, config='--psm 6')
-        results['grayscale'] = text1
         
-        # 2. Thresholded
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        text2 = pytesseract.image_to_string(thresh, config='--psm 6')
-        results['thresholded'] = text2
+        def thresholded():
+            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return pytesseract.image_to_string(thresh, config='--psm 6')
         
-        # 3. Enhanced
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        _, enhanced_thresh = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        text3 = pytesseract.image_to_string(enhanced_thresh, config='--psm 6')
-        results['enhanced'] = text3
+        def enhanced():
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+            _, enhanced_thresh = cv2.threshold(clahe.apply(gray), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return pytesseract.image_to_string(enhanced_thresh, config='--psm 6')
+        
+        variants = {
+            'grayscale': lambda: pytesseract.image_to_string(gray, config='--psm 6'),
+            'thresholded': thresholded,
+            'enhanced': enhanced
+        }
+        if OCR_AVAILABLE:
+            # Test your Student ID OCR
+            variants['professional_ocr'] = lambda: ph_ocr.extract_text(filepath)
+        
+        # Independent Tesseract runs in parallel, within the debug share of the OCR slots
+        outcomes, total_ms = ocr_executor.run_variants(variants, debug=True)
         
-        # 4. Test your Student ID OCR
+        results = {name: outcome['result'] or '' for name, outcome in outcomes.items()
+                   if name != 'professional_ocr'}
+        fields = {}
+        id_type = 'Unknown'
         if OCR_AVAILABLE:
-            ocr_result = ph_ocr.extract_text(filepath)
-            results['professional_ocr'] = ocr_result['text']
+            ocr_result = outcomes['professional_ocr']['result'] or {}
+            results['professional_ocr'] = ocr_result.get('text', '')
             fields = ocr_result.get('fields', {})
             id_type = ocr_result.get('id_type', 'Unknown')
         else:
             results['professional_ocr'] = 'OCR not available'
-            fields = {}
-            id_type = 'Unknown'
         
         # Clean up
         try:
@@ -1407,32 +1601,98 @@ def debug_ocr():
             'ocr_results': results,
             'professional_ocr_fields': fields,
             'professional_ocr_type': id_type,
-            'best_result_length': max([len(t) for t in results.values()])
+            'best_result_length': max([len(t) for t in results.values()]),
+            'timings': variant_timings(outcomes),
+            'totalMs': total_ms,
+            'ocrConcurrency': ocr_executor.status()
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def parse_bool(value, default=False):
+    """Strict boolean from JSON: true/false, 1/0 or 'true'/'false'/'yes'/'no'; ValueError otherwise"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return True
+    if text in ('false', '0', 'no', 'off'):
+        return False
+    raise ValueError(f"expected true or false, got {value!r}")
+
 @app.route('/train', methods=['POST'])
 def train_cnn():
-    """Train CNN endpoint"""
+    """Start CNN training in the background; poll GET /train/status for progress
+
+    JSON body (all optional): architecture, epochs, batchSize, holdoutFraction
+    (default 0: train on every image; e.g. 0.2 to hold out a split for evaluation),
+    activate (default true: serve the new model once it is trained)
+    """
+    data = request.get_json(silent=True) or {}
+    architecture = data.get('architecture', os.environ.get('CNN_ARCHITECTURE', 'baseline'))
+    if architecture not in ('baseline', 'compact'):
+        return jsonify({'success': False, 'error': f'Unknown architecture: {architecture}'}), 400
+    
+    try:
+        epochs = int(data.get('epochs', 15))
+        batch_size = int(data.get('batchSize', 4))
+        holdout_fraction = float(data.get('holdoutFraction', 0))
+        activate = parse_bool(data.get('activate'), default=True)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid training option: {e}'}), 400
+    if epochs < 1 or batch_size < 1:
+        return jsonify({'success': False, 'error': 'epochs and batchSize must be at least 1'}), 400
+    if not 0 <= holdout_fraction < 1:
+        return jsonify({'success': False, 'error': 'holdoutFraction must be at least 0 and below 1'}), 400
+    
+    try:
+        job = training_service.start(
+            architecture=architecture,
+            epochs=epochs,
+            batch_size=batch_size,
+            holdout_fraction=holdout_fraction,
+            activate=activate
+        )
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e), 'job': training_service.status()}), 409
+    
     return jsonify({
         'success': True,
-        'message': 'Train CNN by running: python train_cnn.py',
-        'command': 'cd python-ml/cnn && python train_cnn.py',
+        'message': f'CNN training started in the background (job {job.id})',
+        'statusUrl': '/train/status',
+        'cancelUrl': '/train/cancel',
         'dataPath': 'backend/uploads/real_ids/',
-        'structure': 'primary/ and secondary/ folders with Philippine ID images'
-    })
+        'structure': 'primary/ and secondary/ folders with Philippine ID images',
+        'job': training_service.status()
+    }), 202
+
+@app.route('/train/cancel', methods=['POST'])
+def cancel_training():
+    """Stop the running training job (the serving model is not affected)"""
+    job = training_service.cancel()
+    if not job:
+        return jsonify({'success': False, 'error': 'No training job is running'}), 409
+    return jsonify({'success': True, 'message': f'Training job {job.id} cancelled'})
 
 @app.route('/train/status', methods=['GET'])
 def train_status():
     """Training status"""
+    active_cnn = model_registry.active_model() if model_registry else None
     return jsonify({
-        'cnn_available': CNN_AVAILABLE,
+        'cnn_available': active_cnn is not None,
         'ocr_available': OCR_AVAILABLE,
-        'model_loaded': CNN_AVAILABLE and cnn and hasattr(cnn, 'model') and cnn.model is not None,
-        'model_accuracy': cnn.model_accuracy if CNN_AVAILABLE and cnn and hasattr(cnn, 'model_accuracy') else 0.0,
-        'training_images': cnn.training_stats.get('totalImages', 0) if CNN_AVAILABLE and cnn and hasattr(cnn, 'training_stats') else 0,
+        'model_loaded': active_cnn is not None and active_cnn.model is not None,
+        'model_accuracy': active_cnn.model_accuracy if active_cnn else 0.0,
+        'training_images': active_cnn.training_stats.get('totalImages', 0) if active_cnn else 0,
+        'model_variant': model_variant,
+        'model_registry': model_registry.status() if model_registry else None,
+        'training_job': training_service.status(),
+        'resource_config': resource_config,
         'data_path': real_ids_path
     })
 
@@ -1446,9 +1706,235 @@ def check_paths():
         'model_path': os.path.join(saved_models_path, 'ph_document_cnn.keras'),
         'model_exists': os.path.exists(os.path.join(saved_models_path, 'ph_document_cnn.keras')),
         'ocr_available': OCR_AVAILABLE,
-        'cnn_available': CNN_AVAILABLE
+        'cnn_available': bool(model_registry and model_registry.active_model())
     })
 
+# ============================================
+# MODEL REGISTRY ROUTES
+# ============================================
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    """Registered model versions and the one serving requests"""
+    if not model_registry:
+        return jsonify({'success': False, 'error': 'CNN not available'}), 503
+    return jsonify({
+        'success': True,
+        'status': model_registry.status(),
+        'versions': model_registry.list_versions()
+    })
+
+@app.route('/models/<version_id>', methods=['GET'])
+def model_details(version_id):
+    """Metadata, training stats and evaluation of one version"""
+    details = model_registry.get_version(version_id) if model_registry else None
+    if not details:
+        return jsonify({'success': False, 'error': f'Unknown model version: {version_id}'}), 404
+    return jsonify({'success': True, 'model': details})
+
+@app.route('/models/register', methods=['POST'])
+def register_model():
+    """Register a trained model as a new version; optionally activate it
+
+    JSON body (all optional): modelPath (relative to saved_models/, default
+    ph_document_cnn.keras; paths outside saved_models/ are rejected), notes, activate (bool)
+    """
+    if not model_registry:
+        return jsonify({'success': False, 'error': 'CNN not available'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        activate = parse_bool(data.get('activate'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid activate: {e}'}), 400
+    
+    # Only models under saved_models/ (trained here or by a training job) may be loaded
+    models_root = os.path.realpath(saved_models_path)
+    model_path = os.path.realpath(os.path.join(models_root, data.get('modelPath') or 'ph_document_cnn.keras'))
+    if os.path.commonpath([models_root, model_path]) != models_root:
+        return jsonify({'success': False, 'error': 'modelPath must be inside saved_models/'}), 400
+    try:
+        version_id = model_registry.register(model_path, {'notes': data.get('notes', '')})
+    except FileNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    
+    if activate:
+        model_registry.activate(version_id)
+    return jsonify({
+        'success': True,
+        'version': version_id,
+        'activating': activate
+    }), 201
+
+@app.route('/models/<version_id>/activate', methods=['POST'])
+def activate_model(version_id):
+    """Load and warm up a version in the background, then swap it in
+
+    Requests keep using the current model until the swap; send {"wait": true}
+    to block until the new version is serving.
+    """
+    if not model_registry:
+        return jsonify({'success': False, 'error': 'CNN not available'}), 503
+    
+    if not model_registry.has_version(version_id):
+        return jsonify({'success': False, 'error': f'Unknown model version: {version_id}'}), 404
+    
+    try:
+        wait = parse_bool((request.get_json(silent=True) or {}).get('wait'), default=False)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid wait: {e}'}), 400
+    try:
+        started = model_registry.activate(version_id, background=not wait)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    
+    if not started:
+        return jsonify({'success': False, 'error': model_registry.last_error}), 500
+    return jsonify({
+        'success': True,
+        'version': version_id,
+        'status': model_registry.status()
+    }), 200 if wait else 202
+
+@app.route('/models/rollback', methods=['POST'])
+def rollback_model():
+    """Reactivate the previously active version"""
+    if not model_registry:
+        return jsonify({'success': False, 'error': 'CNN not available'}), 503
+    
+    try:
+        wait = parse_bool((request.get_json(silent=True) or {}).get('wait'), default=False)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Invalid wait: {e}'}), 400
+    try:
+        version_id = model_registry.rollback(background=not wait)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    
+    if not version_id:
+        return jsonify({'success': False, 'error': 'No previous model version to roll back to'}), 409
+    return jsonify({
+        'success': True,
+        'version': version_id,
+        'status': model_registry.status()
+    }), 200 if wait else 202
+
+# ============================================
+# RESIDENT ROSTER ROUTES
+# ============================================
+
+@app.route('/roster/status', methods=['GET'])
+def roster_status():
+    """Resident roster index status"""
+    return jsonify({'success': True, 'roster': resident_roster.stats()})
+
+@app.route('/roster/load', methods=['POST'])
+def roster_load():
+    """Load the resident roster from an uploaded .json/.csv file or a JSON body"""
+    try:
+        try:
+            replace = parse_bool(request.form.get('replace', request.args.get('replace')), default=True)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': f'Invalid replace: {e}'}), 400
+
+        if 'file' in request.files and request.files['file'].filename:
+            file = request.files['file']
+            ext = os.path.splitext(file.filename)[1].lower()
+            if ext not in ('.json', '.csv'):
+                return jsonify({'success': False, 'error': 'Roster must be a .json or .csv file'}), 400
+
+            filename = secure_filename(f"roster_{int(time.time())}{ext}")
+            filepath = os.path.join(UPLOAD_FOLDER, filename)
+            file.save(filepath)
+            try:
+                residents = read_roster_file(filepath)
+            finally:
+                try:
+                    os.remove(filepath)
+                except:
+                    pass
+        else:
+            data = request.get_json(silent=True) or {}
+            residents = data.get('residents', [])
+            try:
+                replace = parse_bool(data.get('replace'), default=replace)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': f'Invalid replace: {e}'}), 400
+
+        if not residents:
+            return jsonify({'success': False, 'error': 'No residents provided'}), 400
+
+        if replace:
+            resident_roster.clear()
+        added = resident_roster.add_residents(residents)
+        resident_roster.save(roster_file)
+
+        return jsonify({
+            'success': True,
+            'added': added,
+            'skipped': len(residents) - added,
+            'roster': resident_roster.stats()
+        })
+
+    except Exception as e:
+        print(f"❌ Roster load error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/roster/residents', methods=['POST'])
+def roster_add_residents():
+    """Add one resident or a list of residents to the roster index"""
+    try:
+        data = request.get_json(silent=True) or {}
+        residents = data.get('residents') or ([data] if data else [])
+
+        if not residents:
+            return jsonify({'success': False, 'error': 'No residents provided'}), 400
+
+        added = resident_roster.add_residents(residents)
+        resident_roster.save(roster_file)
+
+        return jsonify({
+            'success': True,
+            'added': added,
+            'skipped': len(residents) - added,
+            'roster': resident_roster.stats()
+        })
+
+    except Exception as e:
+        print(f"❌ Roster add error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/roster/match', methods=['POST'])
+def roster_match():
+    """Find the registered residents that best match an OCR'd name"""
+    start_time = time.time()
+
+    try:
+        data = request.get_json(silent=True) or request.form
+        ocr_name = (data.get('ocrName') or data.get('fullName') or '').strip()
+        top_k = min(int(data.get('topK', 5)), 50)
+
+        if not ocr_name:
+            return jsonify({'success': False, 'error': 'No ocrName provided'}), 400
+
+        if len(resident_roster) == 0:
+            return jsonify({'success': False, 'error': 'Resident roster is empty. Load it via /roster/load'}), 400
+
+        matches = resident_roster.search(ocr_name, top_k=top_k, compare=advanced_name_comparison)
+
+        return jsonify({
+            'success': True,
+            'ocrName': ocr_name,
+            'matches': matches,
+            'bestMatch': matches[0] if matches and matches[0].get('match') else None,
+            'rosterSize': len(resident_roster),
+            'processingTime': int((time.time() - start_time) * 1000)
+        })
+
+    except Exception as e:
+        print(f"❌ Roster match error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/test/ocr-extraction', methods=['POST'])
 def test_ocr_extraction():
     """Test OCR extraction specifically"""
@@ -1466,40 +1952,46 @@ def test_ocr_extraction():
         file.save(filepath)
         
         # Test multiple OCR methods
-        results = {}
+        img = cv2.imread(filepath)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        variants = {}
         
         # Method 1: Your Philippine OCR
         if OCR_AVAILABLE:
-            ph_result = ph_ocr.extract_text(filepath)
-            results['philippine_ocr'] = {
-                'text': ph_result.get('text', '')[:500],
-                'fields': ph_result.get('fields', {}),
-                'confidence': ph_result.get('confidence', 0),
-                'id_type': ph_result.get('id_type', 'Unknown')
-            }
+            variants['philippine_ocr'] = lambda: ph_ocr.extract_text(filepath)
         
-        # Method 2: Direct Tesseract
-        img = cv2.imread(filepath)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Try different PSM modes
+        # Method 2: Direct Tesseract with different PSM modes
         psm_modes = {
             'psm_3': '--psm 3',  # Automatic
             'psm_4': '--psm 4',  # Single column
             'psm_6': '--psm 6',  # Single block
             'psm_11': '--psm 11' # Sparse text
         }
-        
         for mode_name, config in psm_modes.items():
-            text = pytesseract.image_to_string(gray, config=config)
-            results[mode_name] = text[:500]
+            variants[mode_name] = lambda config=config: pytesseract.image_to_string(gray, config=config)
         
         # Method 3: Preprocessed image
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        preprocessed_text = pytesseract.image_to_string(binary, config='--psm 6')
-        results['preprocessed'] = preprocessed_text[:500]
+        def preprocessed():
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+            _, binary = cv2.threshold(clahe.apply(gray), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return pytesseract.image_to_string(binary, config='--psm 6')
+        variants['preprocessed'] = preprocessed
+        
+        # Independent Tesseract runs in parallel, within the debug share of the OCR slots
+        outcomes, total_ms = ocr_executor.run_variants(variants, debug=True)
+        
+        results = {}
+        for name, outcome in outcomes.items():
+            if name == 'philippine_ocr':
+                ph_result = outcome['result'] or {}
+                results[name] = {
+                    'text': ph_result.get('text', '')[:500],
+                    'fields': ph_result.get('fields', {}),
+                    'confidence': ph_result.get('confidence', 0),
+                    'id_type': ph_result.get('id_type', 'Unknown')
+                }
+            else:
+                results[name] = (outcome['result'] or '')[:500]
         
         # Clean up
         os.remove(filepath)
@@ -1507,6 +1999,9 @@ def test_ocr_extraction():
         return jsonify({
             'success': True,
             'results': results,
+            'timings': variant_timings(outcomes),
+            'totalMs': total_ms,
+            'ocrConcurrency': ocr_executor.status(),
             'recommendation': 'Check which method extracts your name correctly'
         })
         
@@ -1522,12 +2017,12 @@ if __name__ == '__main__':
     
     # Check CNN status
     print(f"\n🧠 CNN Status:")
-    print(f"   Available: {CNN_AVAILABLE}")
-    if CNN_AVAILABLE and cnn:
-        if hasattr(cnn, 'model') and cnn.model is not None:
-            print(f"   Model loaded: ✅")
-            if hasattr(cnn, 'model_accuracy'):
-                print(f"   Accuracy: {cnn.model_accuracy*100:.1f}%")
+    active_cnn = model_registry.active_model() if model_registry else None
+    print(f"   Available: {active_cnn is not None}")
+    if model_registry:
+        if active_cnn is not None and active_cnn.model is not None:
+            print(f"   Model loaded: ✅ (version: {model_registry.active_version()})")
+            print(f"   Accuracy: {active_cnn.model_accuracy*100:.1f}%")
         else:
             print(f"   Model loaded: ❌ (Train first)")
     
@@ -1546,6 +2041,7 @@ if __name__ == '__main__':
     print("   2. POST /upload/ocr          - Enhanced Philippine OCR")
     print("   3. POST /upload/verify       - Complete Verification")
     print("   4. POST /api/debug/ocr       - Debug OCR Processing")
+    print("   5. POST /roster/match        - Match OCR name against resident roster")
     print("\n🎓 THESIS FEATURES:")
     print("   • Professional name comparison with similarity scores")
     print("   • Address pattern recognition for Philippine locations")
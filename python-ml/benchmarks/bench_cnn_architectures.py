@@ -0,0 +1,124 @@
+# python-ml/benchmarks/bench_cnn_architectures.py
+"""Compare the baseline and compact CNN architectures
+
+For each architecture: parameter count, saved .keras size, single-image CPU
+latency (the classify() path) and accuracy on the deterministic held-out
+split of uploads/real_ids. Without enough training images only the
+size/latency columns are filled in.
+
+    python benchmarks/bench_cnn_architectures.py
+    python benchmarks/bench_cnn_architectures.py --epochs 5 --output cnn_arch.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, os.path.join(ML_DIR, 'cnn'))
+
+from train_cnn import PhilippineDocumentCNN, IMAGE_SIZE  # noqa: E402
+from cnn_model import ARCHITECTURES  # noqa: E402
+
+
+def measure_latency(model, runs, warmup=5):
+    """Milliseconds per single image: the direct forward pass classify() uses, and model.predict for comparison"""
+    image = np.random.randint(0, 256, (1, IMAGE_SIZE[1], IMAGE_SIZE[0], 3), dtype=np.uint8)
+    calls = {
+        'predict': lambda: model.predict(image, verbose=0),
+        'forward': lambda: model(image, training=False)
+    }
+    latency = {}
+    for name, call in calls.items():
+        for _ in range(warmup):
+            call()
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        latency[name] = {
+            'medianMs': round(statistics.median(timings), 2),
+            'p95Ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2)
+        }
+    return latency
+
+
+def saved_size(model):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model.keras')
+        model.save(path)
+        return os.path.getsize(path)
+
+
+def bench_architecture(architecture, args):
+    cnn = PhilippineDocumentCNN()
+    trained = os.path.isdir(args.data) and cnn.train_simple(
+        data_path=args.data,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        cache_dir=args.cache_dir,
+        architecture=architecture,
+        holdout_fraction=args.holdout,
+        save_path=None
+    ) and cnn.training_stats.get('realTraining')
+
+    if not trained:
+        cnn.model = cnn.create_model(len(cnn.id_types), architecture)
+
+    result = {
+        'architecture': architecture,
+        'parameters': int(cnn.model.count_params()),
+        'modelBytes': saved_size(cnn.model),
+        'latency': measure_latency(cnn.model, args.latency_runs),
+        'trainImages': cnn.training_stats.get('totalImages') if trained else 0,
+        'holdoutImages': cnn.training_stats.get('holdoutImages') if trained else 0,
+        'holdoutAccuracy': cnn.training_stats.get('holdoutAccuracy') if trained else None,
+        'trainingTime': round(cnn.training_stats.get('trainingTime', 0), 1) if trained else None
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CNN architecture benchmark')
+    parser.add_argument('--data', default=os.path.join(ML_DIR, '..', 'uploads', 'real_ids'))
+    parser.add_argument('--cache-dir', default=os.path.join(ML_DIR, 'dataset_cache'))
+    parser.add_argument('--architectures', nargs='+', default=list(ARCHITECTURES), choices=ARCHITECTURES)
+    parser.add_argument('--epochs', type=int, default=15)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--holdout', type=float, default=0.2, help='held-out fraction')
+    parser.add_argument('--latency-runs', type=int, default=50)
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    results = [bench_architecture(architecture, args) for architecture in args.architectures]
+
+    print(f"\n{'=' * 86}")
+    print(f"{'architecture':12s} {'params':>12s} {'size':>10s} {'predict ms':>11s} {'forward ms':>11s} "
+          f"{'fwd p95':>8s} {'held-out acc':>13s} {'n':>5s}")
+    for result in results:
+        accuracy = result['holdoutAccuracy']
+        accuracy_text = f"{accuracy * 100:.1f}%" if accuracy is not None else 'n/a'
+        latency = result['latency']
+        print(f"{result['architecture']:12s} {result['parameters']:12,d} "
+              f"{result['modelBytes'] / 1e6:8.2f}MB {latency['predict']['medianMs']:11.2f} "
+              f"{latency['forward']['medianMs']:11.2f} {latency['forward']['p95Ms']:8.2f} "
+              f"{accuracy_text:>13s} {result['holdoutImages']:5d}")
+    print(f"{'=' * 86}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'results': results}, f, indent=2)
+        print(f"💾 Results saved: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# python-ml/benchmarks/bench_ocr_resolution.py
+"""OCR time and accuracy across input sizes, with and without resolution normalization
+
+Renders synthetic ID cards from the text corpus (names, ID numbers and
+addresses, no real resident data) and places each on a photo-like
+background at several card widths, from a thumbnail to a 12+ MP phone
+photo. Every image is OCR'd as-is ('raw') and after
+ocr/resolution.normalize_resolution ('normalized'), with the
+preprocessing of the direct-Tesseract fallback (CLAHE + Otsu, PSM 6).
+Accuracy is the character-level similarity of the OCR text to the
+rendered lines. Needs the Tesseract binary.
+
+    python benchmarks/bench_ocr_resolution.py
+    python benchmarks/bench_ocr_resolution.py --widths 400 1000 3000 --cards 10 --output ocr_resolution.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.join(BENCH_DIR, '..')
+CORPUS_FILE = os.path.join(BENCH_DIR, 'corpus', 'text_corpus.jsonl')
+sys.path.insert(0, os.path.join(ML_DIR, 'ocr'))
+
+import pytesseract  # noqa: E402
+from resolution import CARD_WIDTH_PX, normalize_resolution  # noqa: E402
+
+CARD_FILL = 0.7  # card width / photo width
+
+
+def load_card_texts(limit):
+    texts = []
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            case = json.loads(line)
+            user = case['userData']
+            if not all(user.get(key) for key in ('fullName', 'idNumber', 'address')):
+                continue
+            texts.append(['REPUBLIC OF THE PHILIPPINES', case['idType'].upper(), user['fullName'].upper(),
+                          f"NO. {user['idNumber']}", user['address'].upper()])
+            if len(texts) >= limit:
+                break
+    return texts
+
+
+def render_card(lines):
+    """ID-1 card at 300 DPI (CARD_WIDTH_PX wide) with the lines in dark print"""
+    height = round(CARD_WIDTH_PX / (85.60 / 53.98))
+    card = np.full((height, CARD_WIDTH_PX, 3), (228, 232, 235), dtype=np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(card, line, (40, 90 + i * 105), cv2.FONT_HERSHEY_SIMPLEX, 0.95, (25, 25, 25), 2, cv2.LINE_AA)
+    return card
+
+
+def place_on_photo(card, card_width):
+    """The card scaled to card_width px, centred on a 4:3 table-coloured photo"""
+    scale = card_width / card.shape[1]
+    resized = cv2.resize(card, (card_width, max(1, round(card.shape[0] * scale))),
+                         interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC)
+    photo_width = round(card_width / CARD_FILL)
+    photo = np.full((round(photo_width * 3 / 4), photo_width, 3), (96, 118, 140), dtype=np.uint8)
+    top = (photo.shape[0] - resized.shape[0]) // 2
+    left = (photo.shape[1] - resized.shape[1]) // 2
+    photo[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+    return photo
+
+
+def ocr(img):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    _, binary = cv2.threshold(clahe.apply(gray), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return pytesseract.image_to_string(binary, config='--psm 6')
+
+
+def accuracy(text, lines):
+    expected = ' '.join(' '.join(lines).split())
+    found = ' '.join(text.upper().split())
+    return SequenceMatcher(None, expected, found).ratio()
+
+
+def run_width(card_width, cards):
+    rows = {'raw': {'ms': [], 'accuracy': []}, 'normalized': {'ms': [], 'accuracy': [], 'normalizeMs': []}}
+    for lines in cards:
+        photo = place_on_photo(render_card(lines), card_width)
+
+        start = time.perf_counter()
+        text = ocr(photo)
+        rows['raw']['ms'].append((time.perf_counter() - start) * 1000)
+        rows['raw']['accuracy'].append(accuracy(text, lines))
+
+        start = time.perf_counter()
+        normalized, info = normalize_resolution(photo)
+        text = ocr(normalized)
+        rows['normalized']['ms'].append((time.perf_counter() - start) * 1000)
+        rows['normalized']['normalizeMs'].append(info['elapsedMs'])
+        rows['normalized']['accuracy'].append(accuracy(text, lines))
+
+    photo_height, photo_width = photo.shape[:2]
+    return {
+        'cardWidth': card_width,
+        'photoSize': [photo_width, photo_height],
+        'megapixels': round(photo_width * photo_height / 1e6, 1),
+        'normalizedSize': info['size'],
+        **{mode: {key: round(statistics.mean(values), 3 if key == 'accuracy' else 1)
+                  for key, values in row.items()} for mode, row in rows.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR time / accuracy vs. input size')
+    parser.add_argument('--widths', type=int, nargs='+', default=[300, 500, 1000, 2000, 3000, 4000],
+                        help='card widths in px (the photo is 1/0.7 wider)')
+    parser.add_argument('--cards', type=int, default=5, help='synthetic cards per width')
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    try:
+        print(f"🔤 Tesseract {pytesseract.get_tesseract_version()}")
+    except Exception as e:
+        print(f"❌ Tesseract is not available: {e}")
+        return 1
+
+    cards = load_card_texts(args.cards)
+    results = []
+    for card_width in args.widths:
+        print(f"   ▶ card {card_width}px...")
+        results.append(run_width(card_width, cards))
+
+    print(f"\n{'=' * 92}")
+    print(f"{'card px':>8s} {'photo MP':>9s} {'raw ms':>9s} {'raw acc':>8s} "
+          f"{'norm ms':>9s} {'norm acc':>9s} {'resize ms':>10s} {'normalized to':>15s}")
+    for r in results:
+        print(f"{r['cardWidth']:8d} {r['megapixels']:9.1f} {r['raw']['ms']:9.1f} {r['raw']['accuracy']:8.3f} "
+              f"{r['normalized']['ms']:9.1f} {r['normalized']['accuracy']:9.3f} "
+              f"{r['normalized']['normalizeMs']:10.1f} {r['normalizedSize'][0]:>8d}x{r['normalizedSize'][1]:<6d}")
+    print(f"{'=' * 92}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'cards': args.cards,
+                       'results': results}, f, indent=2)
+        print(f"💾 Results saved: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# python-ml/benchmarks/bench_resource_config.py
+"""Sweep CPU thread budgets and report throughput and tail latency
+
+Starts N worker processes per configuration, each with the environment
+runtime/resource_config.py reads (ML_WORKERS, ML_THREADS, ...). Every
+worker runs the per-request CPU work of the API in a loop: OpenCV
+preprocessing, a CNN forward pass and, with --tesseract, one OCR call.
+The "oversubscribed" rows give every worker all cores, which is what
+happens without a budget.
+
+    python benchmarks/bench_resource_config.py
+    python benchmarks/bench_resource_config.py --workers 1 2 4 --duration 20 --affinity
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, os.path.join(ML_DIR, 'runtime'))
+sys.path.insert(0, os.path.join(ML_DIR, 'cnn'))
+
+from resource_config import cpu_count  # noqa: E402
+
+STARTUP_GRACE_SECONDS = 30
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_worker(args):
+    """One API-like worker: apply the budget, warm up, then time requests"""
+    from resource_config import apply_resource_config
+    config = apply_resource_config('serving', quiet=True)
+
+    import cv2
+    import numpy as np
+    from cnn_model import create_philippine_document_cnn
+    import pytesseract
+
+    rng = np.random.default_rng(args.worker_index)
+    photo = rng.integers(0, 256, (1200, 1600, 3), dtype=np.uint8)
+    model = create_philippine_document_cnn(11, architecture=args.architecture)
+
+    def request():
+        gray = cv2.cvtColor(photo, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (3, 3), 0)
+        binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY, 31, 10)
+        rgb = cv2.cvtColor(cv2.resize(photo, (224, 224)), cv2.COLOR_BGR2RGB)
+        model(np.expand_dims(rgb, 0), training=False)
+        if args.tesseract:
+            pytesseract.image_to_string(binary[:300, :800], config='--psm 6')
+
+    for _ in range(3):
+        request()
+
+    while time.time() < args.start_at:
+        time.sleep(0.01)
+
+    latencies = []
+    end_at = args.start_at + args.duration
+    while time.time() < end_at:
+        start = time.perf_counter()
+        request()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({'config': config, 'latenciesMs': latencies}))
+    return 0
+
+
+def run_configuration(name, workers, threads, args):
+    """Launch the workers for one configuration and aggregate their timings"""
+    start_at = time.time() + STARTUP_GRACE_SECONDS
+    processes = []
+    for index in range(workers):
+        env = dict(os.environ,
+                   ML_WORKERS=str(workers),
+                   ML_WORKER_INDEX=str(index),
+                   ML_THREADS=str(threads),
+                   TF_CPP_MIN_LOG_LEVEL='3')
+        if args.affinity:
+            env['ML_CPU_AFFINITY'] = 'auto'
+        else:
+            env.pop('ML_CPU_AFFINITY', None)
+        command = [sys.executable, os.path.abspath(__file__), '--worker',
+                   '--worker-index', str(index), '--start-at', str(start_at),
+                   '--duration', str(args.duration), '--architecture', args.architecture]
+        if args.tesseract:
+            command.append('--tesseract')
+        processes.append(subprocess.Popen(command, env=env, stdout=subprocess.PIPE,
+                                          stderr=subprocess.DEVNULL, text=True))
+
+    latencies = []
+    for process in processes:
+        output, _ = process.communicate()
+        lines = [line for line in output.splitlines() if line.startswith('{')]
+        if process.returncode != 0 or not lines:
+            print(f"   ⚠️ {name}: a worker failed (exit {process.returncode})")
+            continue
+        latencies.extend(json.loads(lines[-1])['latenciesMs'])
+
+    if not latencies:
+        return None
+    return {
+        'name': name,
+        'workers': workers,
+        'threadsPerWorker': threads,
+        'affinity': bool(args.affinity),
+        'requests': len(latencies),
+        'throughputPerSec': round(len(latencies) / args.duration, 2),
+        'p50Ms': round(percentile(latencies, 0.50), 1),
+        'p99Ms': round(percentile(latencies, 0.99), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU thread budget sweep')
+    parser.add_argument('--workers', type=int, nargs='+', help='worker counts to try (default: 1, 2, 4 up to cores)')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds of measured load per configuration')
+    parser.add_argument('--architecture', default='baseline', choices=('baseline', 'compact'))
+    parser.add_argument('--tesseract', action='store_true', help='include one Tesseract call per request')
+    parser.add_argument('--affinity', action='store_true', help='pin each worker to its own cores')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-index', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args)
+
+    cores = cpu_count()
+    worker_counts = args.workers or [n for n in (1, 2, 4, 8) if n <= max(1, cores)]
+
+    configurations = []
+    for workers in worker_counts:
+        threads = max(1, cores // workers)
+        configurations.append((f"{workers}w x {threads}t budget", workers, threads))
+        if threads != cores:
+            configurations.append((f"{workers}w x {cores}t oversubscribed", workers, cores))
+
+    print(f"⚙️ Resource sweep on {cores} cores, {args.duration:.0f}s per configuration "
+          f"({args.architecture} CNN{', Tesseract' if args.tesseract else ''})")
+
+    results = []
+    for name, workers, threads in configurations:
+        print(f"   ▶ {name}...")
+        result = run_configuration(name, workers, threads, args)
+        if result:
+            results.append(result)
+
+    print(f"\n{'=' * 72}")
+    print(f"{'configuration':32s} {'req/s':>8s} {'p50 ms':>9s} {'p99 ms':>9s} {'requests':>9s}")
+    for result in results:
+        print(f"{result['name']:32s} {result['throughputPerSec']:8.2f} {result['p50Ms']:9.1f} "
+              f"{result['p99Ms']:9.1f} {result['requests']:9d}")
+    print(f"{'=' * 72}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'cores': cores,
+                       'results': results}, f, indent=2)
+        print(f"💾 Results saved: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# python-ml/benchmarks/bench_strip_ocr.py
+"""Latency of strip-wise OCR against whole-image OCR on large scans
+
+Renders a synthetic full-page scan (corpus names and addresses, no real
+resident data) at several resolutions and reads each one with a single
+Tesseract call and with ocr/strip_ocr.py. Reports wall-clock time, the
+number of strips used and how closely the stitched text matches the
+whole-image text. Needs the Tesseract binary.
+
+    python benchmarks/bench_strip_ocr.py
+    python benchmarks/bench_strip_ocr.py --concurrency 4 --dpi 200 300 600 --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.join(BENCH_DIR, '..')
+CORPUS_FILE = os.path.join(BENCH_DIR, 'corpus', 'text_corpus.jsonl')
+sys.path.insert(0, os.path.join(ML_DIR, 'runtime'))
+sys.path.insert(0, os.path.join(ML_DIR, 'ocr'))
+
+A4_INCHES = (8.27, 11.69)
+
+
+def load_lines(limit):
+    lines = []
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                user = json.loads(line)['userData']
+                lines.append(f"{user.get('fullName', '').upper()}  {user.get('address', '').upper()}")
+            if len(lines) >= limit:
+                break
+    return lines
+
+
+def render_page(lines, dpi):
+    """Binarized A4 page at dpi with the lines in ~11 pt print"""
+    import cv2
+    import numpy as np
+
+    width, height = round(A4_INCHES[0] * dpi), round(A4_INCHES[1] * dpi)
+    page = np.full((height, width), 255, dtype=np.uint8)
+    scale = dpi / 300
+    y = round(150 * scale)
+    for line in lines:
+        if y > height - round(150 * scale):
+            break
+        cv2.putText(page, line[:60], (round(120 * scale), y), cv2.FONT_HERSHEY_SIMPLEX, 1.0 * scale, 0,
+                    max(1, round(2 * scale)), cv2.LINE_AA)
+        y += round(58 * scale)
+    _, page = cv2.threshold(page, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return page
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strip OCR vs whole-image OCR latency')
+    parser.add_argument('--concurrency', type=int, help='OCR slots (ML_OCR_CONCURRENCY, default: cores)')
+    parser.add_argument('--dpi', type=int, nargs='+', default=[200, 300, 450, 600])
+    parser.add_argument('--runs', type=int, default=3, help='runs per measurement (median is reported)')
+    parser.add_argument('--psm', default='6')
+    parser.add_argument('--output', help='write results as JSON')
+    args = parser.parse_args()
+
+    if args.concurrency:
+        os.environ['ML_OCR_CONCURRENCY'] = str(args.concurrency)
+
+    import pytesseract
+    from ocr_ladder import text_from_data
+    from strip_ocr import image_to_data, ocr_executor
+
+    try:
+        print(f"🔤 Tesseract {pytesseract.get_tesseract_version()}, "
+              f"{ocr_executor.max_concurrency} OCR slots")
+    except Exception as e:
+        print(f"❌ Tesseract is not available: {e}")
+        return 1
+
+    config = f'--psm {args.psm}'
+    lines = load_lines(200)
+    results = []
+    for dpi in args.dpi:
+        page = render_page(lines, dpi)
+        print(f"   ▶ {dpi} DPI ({page.shape[1]}x{page.shape[0]})...")
+        (whole, _), whole_ms = timed(lambda: image_to_data(page, config, min_pixels=float('inf')), args.runs)
+        (strips, count), strip_ms = timed(lambda: image_to_data(page, config, min_pixels=0), args.runs)
+        results.append({
+            'dpi': dpi,
+            'size': [page.shape[1], page.shape[0]],
+            'megapixels': round(page.size / 1e6, 1),
+            'wholeMs': round(whole_ms, 1),
+            'stripMs': round(strip_ms, 1),
+            'strips': count,
+            'speedup': round(whole_ms / strip_ms, 2),
+            'words': [sum(1 for w in whole['text'] if w.strip()), sum(1 for w in strips['text'] if w.strip())],
+            'textAgreement': round(SequenceMatcher(None, text_from_data(whole), text_from_data(strips)).ratio(), 4)
+        })
+
+    print(f"\n{'=' * 84}")
+    print(f"{'DPI':>5s} {'MP':>6s} {'whole ms':>10s} {'strip ms':>10s} {'strips':>7s} {'speedup':>8s} "
+          f"{'words':>13s} {'agreement':>10s}")
+    for r in results:
+        print(f"{r['dpi']:5d} {r['megapixels']:6.1f} {r['wholeMs']:10.1f} {r['stripMs']:10.1f} {r['strips']:7d} "
+              f"{r['speedup']:7.2f}x {r['words'][0]:6d}/{r['words'][1]:<6d} {r['textAgreement']:10.4f}")
+    print(f"{'=' * 84}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                       'concurrency': ocr_executor.max_concurrency, 'results': results}, f, indent=2)
+        print(f"💾 Results saved: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# python-ml/benchmarks/bench_text_pipeline.py
+"""Microbenchmark and output-equivalence gate for the text-side hot path
+
+Times extract_fields_from_ph_result, compare_user_with_ocr,
+compare_names_ph_style and compare_ph_address over the synthetic corpus
+(per call and in aggregate), measures allocations per call with tracemalloc,
+and compares outputs and speed against the stored baseline.
+
+Identical outputs are the hard gate. Speed is compared relative to a fixed
+pure-Python reference workload timed in the same run (so a slower machine
+is not a regression) and is advisory unless --strict-speed is given.
+Address comparisons are timed with the gazetteer cache cleared before each
+call (real work per request), and separately with it warm.
+
+    python benchmarks/bench_text_pipeline.py                    # check against baseline
+    python benchmarks/bench_text_pipeline.py --update-baseline  # record a new baseline
+"""
+import argparse
+import copy
+import gc
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_FILE = os.path.join(BENCH_DIR, 'corpus', 'text_corpus.jsonl')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baselines', 'text_pipeline.json')
+
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+
+
+class NullWriter:
+    """Swallow the pipeline's progress prints without buffering them"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def load_corpus(path, limit=None):
+    cases = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                cases.append(json.loads(line))
+            if limit and len(cases) >= limit:
+                break
+    return cases
+
+
+def reference_workload():
+    """Fixed pure-Python work (string and dict operations) to scale timings by machine speed"""
+    counts = {}
+    for i in range(2000):
+        word = f"DELA CRUZ {i % 97} BULAN".lower().upper().replace(' ', '')
+        counts[word] = counts.get(word, 0) + len(word.split('A'))
+    return counts
+
+
+def reference_us(repeat):
+    """Best-of time of reference_workload in µs"""
+    best = float('inf')
+    for _ in range(max(5, repeat * 5)):
+        start = time.perf_counter_ns()
+        reference_workload()
+        best = min(best, time.perf_counter_ns() - start)
+    return round(best / 1e3, 2)
+
+
+def build_calls(ml_api, cases):
+    """(name, function, argument tuples, copy args per call, per-call setup) for each benchmarked function"""
+    # The comparisons get what /verify-document extracts, which has the user's data
+    with redirect_stdout(NullWriter()):
+        extracted = [ml_api.extract_fields_from_ph_result(copy.deepcopy(case['ocrResult']), case['idType'],
+                                                          case['userData'])
+                     for case in cases]
+
+    name_pairs = [(fields['fullName'], case['userData']['fullName'])
+                  for fields, case in zip(extracted, cases) if fields.get('fullName')]
+    address_pairs = [(case['userData']['address'].upper(), fields['address'])
+                     for fields, case in zip(extracted, cases) if fields.get('address')]
+
+    # Each request resolves its own addresses: a warm resolve cache would time a dict lookup
+    cold_gazetteer = ml_api.ph_gazetteer._cache.clear
+
+    return [
+        ('extract_fields_from_ph_result', ml_api.extract_fields_from_ph_result,
+         [(case['ocrResult'], case['idType']) for case in cases], True, None),
+        ('compare_user_with_ocr', ml_api.compare_user_with_ocr,
+         [(fields, case['userData'], case['idType']) for fields, case in zip(extracted, cases)], False,
+         cold_gazetteer),
+        ('compare_names_ph_style', ml_api.compare_names_ph_style, name_pairs, False, None),
+        ('compare_ph_address', ml_api.compare_ph_address, address_pairs, False, cold_gazetteer),
+        ('compare_ph_address_cached', ml_api.compare_ph_address, address_pairs, False, None),
+    ]
+
+
+def output_digest(output):
+    encoded = json.dumps(output, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def bench_function(func, arg_list, copy_args, repeat, setup=None):
+    """Per-call timings (best of repeat), allocations and output digests; setup runs untimed before each call"""
+    per_call_ns = [float('inf')] * len(arg_list)
+    digests = []
+    sink = NullWriter()
+
+    with redirect_stdout(sink):
+        for round_index in range(repeat):
+            gc.disable()
+            try:
+                for i, args in enumerate(arg_list):
+                    call_args = copy.deepcopy(args) if copy_args else args
+                    if setup:
+                        setup()
+                    start = time.perf_counter_ns()
+                    output = func(*call_args)
+                    elapsed = time.perf_counter_ns() - start
+                    if elapsed < per_call_ns[i]:
+                        per_call_ns[i] = elapsed
+                    if round_index == 0:
+                        digests.append(output_digest(output))
+            finally:
+                gc.enable()
+
+        # Separate pass: tracing slows every allocation, so it is not timed
+        alloc_bytes = []
+        alloc_blocks = []
+        tracemalloc.start()
+        try:
+            for args in arg_list:
+                call_args = copy.deepcopy(args) if copy_args else args
+                if setup:
+                    setup()
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                blocks_before = sys.getallocatedblocks()
+                output = func(*call_args)
+                _, peak = tracemalloc.get_traced_memory()
+                alloc_blocks.append(sys.getallocatedblocks() - blocks_before)
+                alloc_bytes.append(peak - base)
+                del output
+        finally:
+            tracemalloc.stop()
+
+    total_ns = sum(per_call_ns)
+    return {
+        'calls': len(arg_list),
+        'totalMs': round(total_ns / 1e6, 3),
+        'meanUs': round(total_ns / len(arg_list) / 1e3, 2),
+        'p50Us': round(percentile(per_call_ns, 0.50) / 1e3, 2),
+        'p95Us': round(percentile(per_call_ns, 0.95) / 1e3, 2),
+        'maxUs': round(max(per_call_ns) / 1e3, 2),
+        'peakAllocBytesPerCall': round(statistics.mean(alloc_bytes)),
+        'retainedBlocksPerCall': round(statistics.mean(alloc_blocks), 2),
+    }, digests
+
+
+def compare_to_baseline(results, baseline, tolerance, reference):
+    """(output problems, speed problems) versus the baseline
+
+    Speed is compared as multiples of the reference workload, each measured
+    on its own machine, so only relative slowdowns count.
+    """
+    output_problems = []
+    speed_problems = []
+    base_reference = baseline.get('referenceUs')
+    for name, result in results.items():
+        base = baseline.get('functions', {}).get(name)
+        if not base:
+            output_problems.append(f"{name}: not in baseline")
+            continue
+
+        base_digests = base.get('outputDigests', [])
+        if base_digests != result['outputDigests']:
+            if len(base_digests) != len(result['outputDigests']):
+                output_problems.append(f"{name}: {result['calls']} calls vs {len(base_digests)} in baseline")
+            else:
+                changed = [i for i, (a, b) in enumerate(zip(base_digests, result['outputDigests'])) if a != b]
+                output_problems.append(f"{name}: output differs for {len(changed)} cases (first: #{changed[0]})")
+
+        if not base_reference:
+            continue
+        relative, base_relative = result['meanUs'] / reference, base['meanUs'] / base_reference
+        if relative > base_relative * (1 + tolerance):
+            speed_problems.append(f"{name}: {relative:.4g}x reference vs baseline {base_relative:.4g}x "
+                                  f"(+{tolerance * 100:.0f}% allowed; {result['meanUs']:.1f} µs/call here)")
+    return output_problems, speed_problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Text pipeline microbenchmark')
+    parser.add_argument('--corpus', default=CORPUS_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--limit', type=int, default=None, help='only use the first N cases')
+    parser.add_argument('--repeat', type=int, default=3, help='timing rounds (best per call is kept)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown vs baseline')
+    parser.add_argument('--strict-speed', action='store_true', help='fail on speed regressions too')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    with redirect_stdout(NullWriter()):
+        import ml_api
+
+    cases = load_corpus(args.corpus, args.limit)
+    print(f"📊 Text pipeline benchmark: {len(cases)} cases from {os.path.basename(args.corpus)}")
+
+    reference = reference_us(args.repeat)
+    print(f"   reference workload {reference:.1f} µs")
+
+    results = {}
+    for name, func, arg_list, copy_args, setup in build_calls(ml_api, cases):
+        stats, digests = bench_function(func, arg_list, copy_args, args.repeat, setup)
+        stats['outputDigests'] = digests
+        results[name] = stats
+        print(f"   {name:32s} {stats['calls']:5d} calls  mean {stats['meanUs']:8.1f} µs  "
+              f"p95 {stats['p95Us']:8.1f} µs  total {stats['totalMs']:8.1f} ms  "
+              f"alloc {stats['peakAllocBytesPerCall']:7d} B/call")
+
+    report = {
+        'corpus': os.path.basename(args.corpus),
+        'cases': len(cases),
+        'python': sys.version.split()[0],
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'referenceUs': reference,
+        'functions': results
+    }
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        print(f"💾 Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("⚠️ No baseline yet. Record one with --update-baseline")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if baseline.get('cases') != len(cases):
+        print(f"⚠️ Baseline was recorded on {baseline.get('cases')} cases; rerun without --limit to compare")
+        return 0
+
+    output_problems, speed_problems = compare_to_baseline(results, baseline, args.tolerance, reference)
+    if speed_problems:
+        print(f"{'❌' if args.strict_speed else '⚠️'} Slower than baseline relative to the reference workload:")
+        for problem in speed_problems:
+            print(f"   • {problem}")
+    if output_problems:
+        print("❌ Output regressions against baseline:")
+        for problem in output_problems:
+            print(f"   • {problem}")
+    if output_problems or (speed_problems and args.strict_speed):
+        return 1
+
+    print("✅ Outputs identical to baseline" + ('' if speed_problems else ' and within speed tolerance'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# python-ml/benchmarks/generate_text_corpus.py
+"""Generate the synthetic OCR-output / user-data corpus for bench_text_pipeline.py
+
+Every record is synthetic (no real resident data): OCR results shaped like
+PhilippineOCR.extract_text output, paired with what a user typed in the form.
+The generator is seeded, so the same corpus is produced on every machine.
+"""
+import argparse
+import json
+import os
+import random
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus', 'text_corpus.jsonl')
+
+FIRST_NAMES = ['KATRINA', 'JUAN', 'MARIA', 'JOSE', 'ANA', 'PEDRO', 'ROSA', 'MARK', 'JOHN', 'ANGELO',
+               'CHRISTINE', 'MICHAEL', 'JOSEPH', 'PATRICIA', 'RICARDO', 'EDUARDO', 'TERESITA', 'GLORIA',
+               'ROBERTO', 'MANUEL', 'FRANCISCO', 'ELIZABETH', 'DANIEL', 'CARLOS', 'LOURDES', 'VICENTE']
+NICKNAMES = {'JOSE': 'PEPE', 'JOSEPH': 'JOE', 'FRANCISCO': 'KIKO', 'MANUEL': 'MANNY', 'ROBERTO': 'BERT',
+             'ELIZABETH': 'LIZA', 'RICARDO': 'CARDO', 'EDUARDO': 'EDDIE', 'MICHAEL': 'MIKE', 'DANIEL': 'DANNY'}
+MIDDLE_NAMES = ['SANTOS', 'REYES', 'GARCIA', 'MENDOZA', 'BAUTISTA', 'GERONA', 'DIAZ', 'LOPEZ', 'CRUZ', 'RAMOS']
+LAST_NAMES = ['ESPENIDA', 'DELA CRUZ', 'SANTOS', 'REYES', 'GARCIA', 'MENDOZA', 'BAUTISTA', 'VILLANUEVA',
+              'GERONA', 'GILLEGO', 'FLORES', 'GONZALES', 'AQUINO', 'TOLENTINO', 'LASALA', 'ENCINARES']
+BARANGAYS = ['LAJONG', 'ZONE 4', 'SANTA REMEDIOS', 'SAN ISIDRO', 'OBRERO', 'FABRICA', 'MARINAB', 'CALPI',
+             'JAMORAWON', 'J.P. LAUREL', 'SAN FRANCISCO', 'OTAVI', 'GATE', 'DANAO']
+MUNICIPALITIES = ['BULAN', 'BULAN', 'BULAN', 'GUBAT', 'IROSIN', 'MATNOG', 'SORSOGON CITY']
+ID_TYPES = ['Student ID', 'Drivers License (LTO)', 'National ID (PhilSys)', 'Philippine Passport',
+            'UMID (Unified Multi-Purpose ID)', 'Postal ID', 'Voters ID', 'PhilHealth ID', 'Barangay ID']
+OCR_CONFUSIONS = {'O': '0', 'I': '1', 'S': '5', 'B': '8', 'G': '6', 'N': 'M', 'E': 'F', 'A': '4'}
+
+
+def ocr_noise(rng, text, rate):
+    """Swap characters the way Tesseract misreads them"""
+    chars = list(text)
+    for i, char in enumerate(chars):
+        if char in OCR_CONFUSIONS and rng.random() < rate:
+            chars[i] = OCR_CONFUSIONS[char]
+    return ''.join(chars)
+
+
+def make_record(rng, index):
+    first = rng.choice(FIRST_NAMES)
+    middle = rng.choice(MIDDLE_NAMES)
+    last = rng.choice(LAST_NAMES)
+    barangay = rng.choice(BARANGAYS)
+    municipality = rng.choice(MUNICIPALITIES)
+    id_type = rng.choice(ID_TYPES)
+    id_number = ''.join(rng.choice('0123456789') for _ in range(8))
+
+    # What the user typed
+    user_first = NICKNAMES.get(first, first) if rng.random() < 0.1 else first
+    user_middle = middle[0] + '.' if rng.random() < 0.4 else middle
+    user_name = f'{user_first} {user_middle} {last}'
+    if rng.random() < 0.5:
+        user_name = user_name.title()
+    user_address = f'Brgy. {barangay.title()}, {municipality.title()}, Sorsogon'
+
+    # What the ID shows, possibly for a different person (mismatch cases)
+    scenario = rng.random()
+    if scenario < 0.15:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    if scenario > 0.9:
+        barangay = rng.choice(BARANGAYS)
+
+    name_format = rng.random()
+    if name_format < 0.3:
+        ocr_name = f'{last}, {first} {middle[0]}.'
+    elif name_format < 0.6:
+        ocr_name = f'{first} {middle[0]}. {last}'
+    else:
+        ocr_name = f'{first} {middle} {last}'
+    ocr_name = ocr_noise(rng, ocr_name, rng.choice([0.0, 0.0, 0.03, 0.08]))
+    ocr_address = ocr_noise(rng, f'BRGY. {barangay}, {municipality}, SORSOGON', rng.choice([0.0, 0.05]))
+
+    text_lines = ['REPUBLIC OF THE PHILIPPINES', id_type.upper(), ocr_name, f'NO. {id_number}', ocr_address]
+    text = '\n'.join(text_lines)
+
+    fields = {}
+    shape = rng.random()
+    if shape < 0.55:
+        fields = {'full_name': ocr_name, 'address': ocr_address, 'id_number': id_number}
+    elif shape < 0.7:
+        fields = {'first_name': first, 'middle_name': middle, 'last_name': last, 'id_number': id_number}
+    elif shape < 0.8:
+        # Extractor swallowed the whole text into one field
+        fields = {'full_name': text + '\n' + text, 'address': ocr_address}
+    elif shape < 0.95:
+        fields = {}  # fall back to raw-text extraction
+    else:
+        text = ''    # unreadable upload
+
+    user_data = {'fullName': user_name, 'address': user_address}
+    if rng.random() < 0.3:
+        user_data['idNumber'] = id_number if rng.random() < 0.8 else id_number[::-1]
+
+    return {
+        'id': f'case-{index:05d}',
+        'idType': id_type,
+        'ocrResult': {
+            'text': text,
+            'confidence': round(rng.uniform(40, 95), 1),
+            'fields': fields,
+            'id_type': id_type,
+            'success': bool(text)
+        },
+        'userData': user_data
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=20260118)
+    parser.add_argument('--output', default=CORPUS_FILE)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for index in range(args.count):
+            f.write(json.dumps(make_record(rng, index)) + '\n')
+
+    print(f"✅ Wrote {args.count} synthetic cases to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,75 @@ import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras import layers
 
-def create_philippine_document_cnn(num_classes=11):
+ARCHITECTURES = ('baseline', 'compact')
+
+def create_compact_document_cnn(num_classes=11, input_size=224):
+    """Compact CNN: depthwise-separable convolutions and global average pooling
+    
+    About 50K parameters instead of the 25.7M of the baseline's Flatten->Dense
+    head, so the saved file stays under 1 MB and CPU inference is much cheaper.
+    """
+    model = keras.Sequential([
+        # uint8 pixels in, scaled to [0, 1] inside the graph
+        layers.Input(shape=(input_size, input_size, 3), dtype='uint8', name='ph_image_uint8'),
+        layers.Rescaling(1.0 / 255, name='rescale_ph_input'),
+        
+        # BatchNormalization momentum 0.9: running statistics must settle within
+        # the few hundred steps a small barangay dataset provides
+        
+        # Stem: one regular strided convolution
+        layers.Conv2D(24, (3, 3), strides=2, padding='same', use_bias=False, name='stem_conv'),
+        layers.BatchNormalization(momentum=0.9, name='stem_bn'),
+        layers.ReLU(name='stem_relu'),
+        
+        # Depthwise-separable blocks, halving resolution each time
+        layers.SeparableConv2D(48, (3, 3), padding='same', use_bias=False, name='sep1_ph_document'),
+        layers.BatchNormalization(momentum=0.9, name='sep1_bn'),
+        layers.ReLU(name='sep1_relu'),
+        layers.MaxPooling2D((2, 2), name='pool1'),
+        
+        layers.SeparableConv2D(96, (3, 3), padding='same', use_bias=False, name='sep2_ph_features'),
+        layers.BatchNormalization(momentum=0.9, name='sep2_bn'),
+        layers.ReLU(name='sep2_relu'),
+        layers.MaxPooling2D((2, 2), name='pool2'),
+        
+        layers.SeparableConv2D(128, (3, 3), padding='same', use_bias=False, name='sep3_ph_layout'),
+        layers.BatchNormalization(momentum=0.9, name='sep3_bn'),
+        layers.ReLU(name='sep3_relu'),
+        layers.MaxPooling2D((2, 2), name='pool3'),
+        
+        layers.SeparableConv2D(192, (3, 3), padding='same', use_bias=False, name='sep4_ph_layout'),
+        layers.BatchNormalization(momentum=0.9, name='sep4_bn'),
+        layers.ReLU(name='sep4_relu'),
+        
+        # Global average pooling replaces Flatten -> Dense(128)
+        layers.GlobalAveragePooling2D(name='gap_features'),
+        layers.Dropout(0.3, name='dropout_ph'),
+        layers.Dense(num_classes, activation='softmax', name='output_ph_documents')
+    ])
+    
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=0.001),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    
+    return model
+
+def create_philippine_document_cnn(num_classes=11, architecture='baseline', input_size=224):
     """Create CNN for Philippine document classification"""
+    if architecture == 'compact':
+        return create_compact_document_cnn(num_classes, input_size)
+    if architecture != 'baseline':
+        raise ValueError(f"Unknown architecture: {architecture} (choose from {', '.join(ARCHITECTURES)})")
+    
     model = keras.Sequential([
+        # uint8 pixels in, scaled to [0, 1] inside the graph
+        layers.Input(shape=(input_size, input_size, 3), dtype='uint8', name='ph_image_uint8'),
+        layers.Rescaling(1.0 / 255, name='rescale_ph_input'),
+        
         # Layer 1: Convolutional
         layers.Conv2D(32, (3, 3), activation='relu', padding='same',
-                     input_shape=(224, 224, 3),
                      name='conv1_document_classification'),
         
         # Layer 2: Max Pooling
@@ -0,0 +1,277 @@
+# python-ml/cnn/dataset_cache.py
+import hashlib
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from tensorflow import keras
+
+from image_decode import load_rgb
+
+CACHE_VERSION = 1
+INDEX_FILE = 'index.json'
+SHUFFLE_WINDOW_BATCHES = 8  # batches per contiguous shard slice shuffled as one window
+MIX_WINDOWS = 4             # windows whose rows are permuted together every epoch
+
+
+def preprocess_params(image_size=(224, 224)):
+    """Everything that changes the cached pixels; a change starts a new cache"""
+    return {
+        'version': CACHE_VERSION,
+        'imageSize': [int(image_size[0]), int(image_size[1])],
+        'color': 'RGB',
+        'decode': 'jpeg_reduced',
+        'interpolation': 'INTER_AREA',
+        'dtype': 'uint8'
+    }
+
+
+def source_key(image_path):
+    """Cache key for a source image: absolute path, mtime and size"""
+    stat = os.stat(image_path)
+    return f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+def decode_uint8(image_path, image_size=(224, 224), out=None):
+    """Same decode/resize as preprocess_image, kept as uint8 (written into out when given)"""
+    img = load_rgb(image_path, image_size, out)
+    return img if out is not None or img is None else img.copy()
+
+
+class DatasetCache:
+    """Preprocessed uint8 images in memory-mapped .npy shards
+
+    Shards live in a sub-directory per preprocessing setup, so caches for
+    different input sizes never mix. Only images whose path, mtime or size
+    changed since the last sync are decoded again.
+    """
+
+    def __init__(self, cache_dir='../dataset_cache', image_size=(224, 224), workers=None):
+        self.image_size = tuple(image_size)
+        self.params = preprocess_params(self.image_size)
+        params_id = hashlib.sha1(json.dumps(self.params, sort_keys=True).encode()).hexdigest()[:10]
+        self.cache_dir = os.path.join(cache_dir, f"{self.image_size[0]}x{self.image_size[1]}_{params_id}")
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.entries = {}  # source key -> [shard file, row]
+        self.shards = {}   # shard file -> row count
+        self.unreadable = set()  # source keys that failed to decode
+        self._memmaps = {}
+        self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get('params') != self.params:
+            return
+        self.entries = index.get('entries', {})
+        self.shards = index.get('shards', {})
+        self.unreadable = set(index.get('unreadable', []))
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'params': self.params, 'shards': self.shards, 'entries': self.entries,
+                       'unreadable': sorted(self.unreadable)}, f)
+        os.replace(tmp_path, self._index_path())
+
+    def shard(self, shard_file):
+        """Read-only memmap of a shard, opened once"""
+        if shard_file not in self._memmaps:
+            path = os.path.join(self.cache_dir, shard_file)
+            self._memmaps[shard_file] = np.load(path, mmap_mode='r')
+        return self._memmaps[shard_file]
+
+    def sync(self, image_paths):
+        """Decode new/changed images into a new shard; returns one location per path
+
+        A location is (shard file, row), or None when the image is unreadable.
+        """
+        keys = []
+        for path in image_paths:
+            try:
+                keys.append(source_key(path))
+            except OSError:
+                keys.append(None)
+
+        missing = sorted({key for key in keys
+                          if key and key not in self.entries and key not in self.unreadable})
+        # Shuffled on write so consecutive rows (one batch) mix document types
+        random.Random(len(self.shards)).shuffle(missing)
+
+        if missing:
+            print(f"🗄️ Dataset cache: decoding {len(missing)} new/changed images "
+                  f"({sum(key in self.entries for key in keys)} cached)")
+            self._write_shard(missing)
+            self._prune()
+            self._save_index()
+
+        locations = [tuple(self.entries[key]) if key in self.entries else None for key in keys]
+        if not missing:
+            unreadable = locations.count(None)
+            print(f"🗄️ Dataset cache: all {len(keys) - unreadable} readable images cached"
+                  + (f" ({unreadable} unreadable skipped)" if unreadable else ""))
+        return locations
+
+    def _write_shard(self, keys):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        shard_number = max([int(name[6:11]) for name in self.shards] + [-1]) + 1
+        shard_file = f"shard_{shard_number:05d}.npy"
+        shard_path = os.path.join(self.cache_dir, shard_file)
+        tmp_path = shard_path + '.tmp.npy'
+
+        width, height = self.image_size
+        data = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                         shape=(len(keys), height, width, 3))
+
+        # cv2 releases the GIL while decoding, so threads decode in parallel
+        def decode(row_key):
+            row, key = row_key
+            img = decode_uint8(key.split('|', 1)[0], self.image_size, out=data[row])
+            return row, img is not None
+
+        written = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for row, ok in pool.map(decode, enumerate(keys)):
+                if ok:
+                    written[keys[row]] = row
+                else:
+                    self.unreadable.add(keys[row])
+                    print(f"   ⚠️ Could not read: {os.path.basename(keys[row].split('|', 1)[0])}")
+
+        data.flush()
+        del data
+        os.replace(tmp_path, shard_path)
+
+        self.shards[shard_file] = len(keys)
+        for key, row in written.items():
+            self.entries[key] = [shard_file, row]
+
+    def _prune(self):
+        """Drop entries for files that changed and shards nothing points to"""
+        def is_current(key):
+            try:
+                return source_key(key.split('|', 1)[0]) == key
+            except OSError:
+                return False
+        
+        self.entries = {key: location for key, location in self.entries.items() if is_current(key)}
+        self.unreadable = {key for key in self.unreadable if is_current(key)}
+
+        used = {shard_file for shard_file, _ in self.entries.values()}
+        for shard_file in list(self.shards):
+            if shard_file not in used:
+                del self.shards[shard_file]
+                self._memmaps.pop(shard_file, None)
+                try:
+                    os.remove(os.path.join(self.cache_dir, shard_file))
+                except OSError:
+                    pass
+
+    def batches(self, image_paths, labels, batch_size, shuffle=True, normalize=False):
+        """Keras dataset over the cached images (sync first)"""
+        locations = self.sync(image_paths)
+        return CachedBatches(self, locations, labels, batch_size, shuffle, normalize)
+
+
+class CachedBatches(keras.utils.PyDataset):
+    """Batches read out of the shard memmaps
+
+    Without shuffling, batches are runs of consecutive rows read as memmap
+    views without copying. With shuffling, every epoch shuffles windows of
+    SHUFFLE_WINDOW_BATCHES batches (contiguous slices of one shard), pools
+    at least MIX_WINDOWS of them, permutes the pooled rows and cuts the batches from
+    that, so batch composition changes every epoch and a shard appended
+    later (often a single class) is mixed with other shards. A batch is a
+    fancy-indexed copy of rows from a few slices.
+    """
+
+    def __init__(self, cache, locations, labels, batch_size, shuffle=True, normalize=False, seed=None):
+        super().__init__()
+        self.cache = cache
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.normalize = normalize
+        self.images = 0
+        self._rng = random.Random(seed)
+
+        rows_by_shard = {}
+        for location, label in zip(locations, labels):
+            if location is not None:
+                rows_by_shard.setdefault(location[0], []).append((location[1], label))
+
+        # (shard file, rows, labels): shuffle windows, or the batches themselves when not shuffling
+        self.windows = []
+        window_rows = batch_size * SHUFFLE_WINDOW_BATCHES if shuffle else batch_size
+        for shard_file, rows in sorted(rows_by_shard.items()):
+            rows.sort()
+            run = [rows[0]]
+            for row, label in rows[1:] + [(None, None)]:
+                if row is not None and (shuffle or row == run[-1][0] + 1) and len(run) < window_rows:
+                    run.append((row, label))
+                    continue
+                self.windows.append((shard_file, np.array([r for r, _ in run], dtype=np.int64),
+                                     np.array([l for _, l in run], dtype=np.int32)))
+                self.images += len(run)
+                if row is not None:
+                    run = [(row, label)]
+
+        self.batches = [[window] for window in self.windows]
+        if shuffle:
+            self._plan_epoch()
+
+    def _plan_epoch(self):
+        """Shuffle the windows, permute rows within pools of MIX_WINDOWS or more and cut new batches"""
+        windows = list(self.windows)
+        if not windows:
+            self.batches = []  # nothing readable; callers see images == 0
+            return
+        self._rng.shuffle(windows)
+
+        shard_files, rows, labels = [], [], []
+        pools = max(1, len(windows) // MIX_WINDOWS)  # every pool gets at least MIX_WINDOWS windows
+        for i in range(pools):
+            pool = windows[i::pools]
+            order = np.arange(sum(len(w[1]) for w in pool))
+            self._rng.shuffle(order)
+            shard_files.append(np.concatenate([[w[0]] * len(w[1]) for w in pool])[order])
+            rows.append(np.concatenate([w[1] for w in pool])[order])
+            labels.append(np.concatenate([w[2] for w in pool])[order])
+        shard_files, rows, labels = (np.concatenate(a) for a in (shard_files, rows, labels))
+
+        self.batches = []
+        for start in range(0, len(rows), self.batch_size):
+            batch = slice(start, start + self.batch_size)
+            pieces = []
+            for shard_file in np.unique(shard_files[batch]):
+                mask = shard_files[batch] == shard_file
+                order = np.argsort(rows[batch][mask])  # ascending rows read the memmap sequentially
+                pieces.append((str(shard_file), rows[batch][mask][order], labels[batch][mask][order]))
+            self.batches.append(pieces)
+
+    def __len__(self):
+        return len(self.batches)
+
+    def __getitem__(self, index):
+        pieces = self.batches[index]
+        if len(pieces) == 1 and pieces[0][1][-1] - pieces[0][1][0] == len(pieces[0][1]) - 1:
+            shard_file, rows, labels = pieces[0]
+            images = self.cache.shard(shard_file)[rows[0]:rows[-1] + 1]  # zero-copy memmap view
+        else:
+            images = np.concatenate([self.cache.shard(shard_file)[rows] for shard_file, rows, _ in pieces])
+            labels = np.concatenate([labels for _, _, labels in pieces])
+        if self.normalize:
+            images = images.astype('float32') / 255.0
+        return images, labels
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._plan_epoch()
@@ -0,0 +1,172 @@
+# python-ml/cnn/dataset_manifest.py
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+TIERS = ('primary', 'secondary')
+
+
+def file_sha1(path, chunk_size=1 << 20):
+    """Content hash used for duplicate detection"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def holdout_split(image_paths, labels, fraction=0.2):
+    """Deterministic train/held-out split by a hash of each image's class folder and name
+
+    An image stays on the same side of the split across runs and machines,
+    and adding images never moves existing ones.
+    """
+    train_paths, train_labels, holdout_paths, holdout_labels = [], [], [], []
+    threshold = int(fraction * 10000)
+    for path, label in zip(image_paths, labels):
+        key = '/'.join(os.path.normpath(path).replace('\\', '/').split('/')[-2:])
+        bucket = int(hashlib.sha1(key.encode('utf-8')).hexdigest()[:8], 16) % 10000
+        if bucket < threshold:
+            holdout_paths.append(path)
+            holdout_labels.append(label)
+        else:
+            train_paths.append(path)
+            train_labels.append(label)
+    return train_paths, train_labels, holdout_paths, holdout_labels
+
+
+class DatasetManifest:
+    """Index of the training images under uploads/real_ids/{primary,secondary}/<doc type>
+
+    Each file is recorded once with its class folder, size, mtime and sha1.
+    Every scan lists each class folder with os.scandir and compares each
+    file's size and mtime to the record (a directory's mtime does not change
+    when a file is overwritten in place); a file is hashed again only when
+    they changed.
+    """
+
+    def __init__(self, base_path, manifest_path):
+        self.base_path = base_path
+        self.manifest_path = manifest_path
+        self.dirs = {}   # relative dir -> mtime_ns when last scanned
+        self.files = {}  # relative path -> [doc type folder, tier, size, mtime_ns, sha1]
+        self.last_scan = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (manifest.get('version') != MANIFEST_VERSION
+                or manifest.get('basePath') != os.path.abspath(self.base_path)):
+            return
+        self.dirs = manifest.get('dirs', {})
+        self.files = manifest.get('files', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'basePath': os.path.abspath(self.base_path),
+                'dirs': self.dirs,
+                'files': self.files
+            }, f, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+
+    def scan(self, doc_types, full=False):
+        """Bring the manifest up to date; full=True re-hashes every file"""
+        stats = {'dirsListed': 0, 'dirsReused': 0, 'filesHashed': 0}
+        seen_dirs = set()
+
+        for tier in TIERS:
+            for doc_type in doc_types:
+                rel_dir = f"{tier}/{doc_type}"
+                abs_dir = os.path.join(self.base_path, tier, doc_type)
+                try:
+                    dir_mtime = os.stat(abs_dir).st_mtime_ns
+                except OSError:
+                    continue
+                seen_dirs.add(rel_dir)
+
+                hashed, removed_files = self._scan_dir(rel_dir, abs_dir, doc_type, tier, full)
+                stats['filesHashed'] += hashed
+                if hashed or removed_files or self.dirs.get(rel_dir) != dir_mtime:
+                    stats['dirsListed'] += 1
+                else:
+                    stats['dirsReused'] += 1
+                self.dirs[rel_dir] = dir_mtime
+
+        # Folders that disappeared take their files with them
+        removed = [d for d in self.dirs if d not in seen_dirs]
+        for rel_dir in removed:
+            del self.dirs[rel_dir]
+            self._drop_dir(rel_dir)
+
+        self.last_scan = stats
+        if stats['dirsListed'] or removed:
+            self.save()
+        return stats
+
+    def _drop_dir(self, rel_dir):
+        prefix = rel_dir + '/'
+        for rel_path in [p for p in self.files if p.startswith(prefix)]:
+            del self.files[rel_path]
+
+    def _scan_dir(self, rel_dir, abs_dir, doc_type, tier, full=False):
+        """One os.scandir pass over a class folder, hashing only new/changed files
+
+        Returns (files hashed, records dropped for files that are gone).
+        """
+        hashed = 0
+        present = set()
+
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(IMAGE_EXTENSIONS) or not entry.is_file():
+                    continue
+                rel_path = f"{rel_dir}/{entry.name}"
+                stat = entry.stat()
+                present.add(rel_path)
+
+                known = self.files.get(rel_path)
+                if not full and known and known[2] == stat.st_size and known[3] == stat.st_mtime_ns:
+                    continue
+                try:
+                    sha1 = file_sha1(entry.path)
+                except OSError:
+                    continue
+                self.files[rel_path] = [doc_type, tier, stat.st_size, stat.st_mtime_ns, sha1]
+                hashed += 1
+
+        prefix = rel_dir + '/'
+        gone = [p for p in self.files if p.startswith(prefix) and p not in present]
+        for rel_path in gone:
+            del self.files[rel_path]
+
+        return hashed, len(gone)
+
+    def path_for(self, rel_path):
+        return os.path.join(self.base_path, *rel_path.split('/'))
+
+    def items(self):
+        """(relative path, doc type folder, tier) in stable order"""
+        return [(rel_path, record[0], record[1]) for rel_path, record in sorted(self.files.items())]
+
+    def class_counts(self):
+        counts = {}
+        for record in self.files.values():
+            counts[record[0]] = counts.get(record[0], 0) + 1
+        return counts
+
+    def duplicates(self):
+        """Groups of relative paths with identical content (from the stored hashes)"""
+        by_hash = {}
+        for rel_path, record in sorted(self.files.items()):
+            by_hash.setdefault((record[2], record[4]), []).append(rel_path)
+        return [paths for paths in by_hash.values() if len(paths) > 1]
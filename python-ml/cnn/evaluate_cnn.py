@@ -0,0 +1,238 @@
+# python-ml/cnn/evaluate_cnn.py
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from dataset_cache import DatasetCache
+
+EVALUATION_FILE = 'evaluation.json'
+CALIBRATION_BINS = 10
+
+
+def classification_report(y_true, y_pred, class_names):
+    """Confusion matrix plus per-class precision / recall / F1"""
+    num_classes = len(class_names)
+    matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+    np.add.at(matrix, (y_true, y_pred), 1)
+
+    per_class = {}
+    for idx, name in enumerate(class_names):
+        support = int(matrix[idx].sum())
+        predicted = int(matrix[:, idx].sum())
+        if support == 0 and predicted == 0:
+            continue
+        true_positive = int(matrix[idx, idx])
+        precision = true_positive / predicted if predicted else 0.0
+        recall = true_positive / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_class[name] = {
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(f1, 4),
+            'support': support,
+            'predicted': predicted
+        }
+
+    # Only classes that occur in labels or predictions, in id_types order
+    present = [idx for idx, name in enumerate(class_names) if name in per_class]
+    supported = [stats for stats in per_class.values() if stats['support']]
+    return {
+        'accuracy': round(float(np.trace(matrix) / max(1, matrix.sum())), 4),
+        'macroPrecision': round(float(np.mean([s['precision'] for s in supported])), 4) if supported else 0.0,
+        'macroRecall': round(float(np.mean([s['recall'] for s in supported])), 4) if supported else 0.0,
+        'macroF1': round(float(np.mean([s['f1'] for s in supported])), 4) if supported else 0.0,
+        'perClass': per_class,
+        'confusionMatrix': {
+            'labels': [class_names[idx] for idx in present],
+            'rowsAreActual': True,
+            'matrix': matrix[np.ix_(present, present)].tolist()
+        }
+    }
+
+
+def calibration_report(confidences, correct, bins=CALIBRATION_BINS):
+    """Reliability bins of top-1 confidence and the expected calibration error"""
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    bin_index = np.clip(np.digitize(confidences, edges[1:-1]), 0, bins - 1)
+    total = len(confidences)
+
+    table = []
+    ece = 0.0
+    for b in range(bins):
+        mask = bin_index == b
+        count = int(mask.sum())
+        if count == 0:
+            continue
+        mean_confidence = float(confidences[mask].mean())
+        accuracy = float(correct[mask].mean())
+        ece += count / total * abs(accuracy - mean_confidence)
+        table.append({
+            'range': [round(float(edges[b]), 2), round(float(edges[b + 1]), 2)],
+            'count': count,
+            'meanConfidence': round(mean_confidence, 4),
+            'accuracy': round(accuracy, 4)
+        })
+
+    return {
+        'expectedCalibrationError': round(ece, 4),
+        'meanConfidence': round(float(confidences.mean()), 4) if total else 0.0,
+        'bins': table
+    }
+
+
+def evaluate_classifier(cnn, image_paths, labels, cache_dir='../dataset_cache', batch_size=32):
+    """Batched inference over labeled images; accuracy, calibration and throughput together"""
+    cache = DatasetCache(cache_dir, image_size=cnn.input_size)
+
+    start = time.perf_counter()
+    batches = cache.batches(image_paths, labels, batch_size, shuffle=False,
+                            normalize=cnn.preprocessing_version == 1)
+    decode_seconds = time.perf_counter() - start
+
+    y_true, probabilities = [], []
+    inference_seconds = 0.0
+    for index in range(len(batches)):
+        images, batch_labels = batches[index]
+        start = time.perf_counter()
+        probabilities.append(cnn.model(images, training=False).numpy())
+        inference_seconds += time.perf_counter() - start
+        y_true.append(batch_labels)
+
+    if not probabilities:
+        return None
+
+    probabilities = np.concatenate(probabilities)
+    y_true = np.concatenate(y_true).astype(np.int64)
+    y_pred = probabilities.argmax(axis=1)
+    confidences = probabilities.max(axis=1)
+    num_images = len(y_true)
+
+    class_names = list(cnn.id_types)
+    class_names += [f"Class {idx}" for idx in range(len(class_names), probabilities.shape[1])]
+
+    report = classification_report(y_true, y_pred, class_names)
+    report.update({
+        'images': num_images,
+        'calibration': calibration_report(confidences, (y_pred == y_true).astype(np.float64)),
+        'throughput': {
+            'batchSize': batch_size,
+            'inferenceSeconds': round(inference_seconds, 3),
+            'imagesPerSecond': round(num_images / inference_seconds, 1) if inference_seconds else None,
+            'msPerImage': round(inference_seconds / num_images * 1000, 2),
+            'decodeSeconds': round(decode_seconds, 3)
+        },
+        'inputSize': cnn.input_size[0],
+        'evaluatedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ')
+    })
+    return report
+
+
+def save_evaluation(report, model_dir):
+    path = os.path.join(model_dir, EVALUATION_FILE)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def recorded_holdout_fraction(training_stats, model_dir):
+    """Fraction of the data the model was trained without (0 when it saw every image)"""
+    fraction = training_stats.get('holdoutFraction')
+    if fraction is None and training_stats.get('holdoutImages'):
+        # Saved before the fraction was recorded: the training-time evaluation has it
+        try:
+            with open(os.path.join(model_dir, EVALUATION_FILE), 'r') as f:
+                fraction = json.load(f).get('holdoutFraction')
+        except (OSError, ValueError):
+            fraction = None
+    return float(fraction or 0)
+
+
+def print_evaluation(report):
+    print(f"\n{'=' * 60}")
+    print(f"📏 Evaluation on {report['images']} images")
+    print(f"   Accuracy: {report['accuracy'] * 100:.1f}%  "
+          f"(macro P {report['macroPrecision'] * 100:.1f}% / R {report['macroRecall'] * 100:.1f}%)")
+    print(f"   Calibration error (ECE): {report['calibration']['expectedCalibrationError']:.3f}")
+    throughput = report['throughput']
+    print(f"   Throughput: {throughput['imagesPerSecond']} images/sec "
+          f"({throughput['msPerImage']} ms/image, batch {throughput['batchSize']})")
+    print(f"\n   {'class':34s} {'prec':>6s} {'recall':>6s} {'n':>5s}")
+    for name, stats in report['perClass'].items():
+        print(f"   {name:34s} {stats['precision'] * 100:5.1f}% {stats['recall'] * 100:5.1f}% {stats['support']:5d}")
+
+    confusion = report['confusionMatrix']
+    print("\n   Confusion matrix (rows = actual, columns = predicted):")
+    for name, row in zip(confusion['labels'], confusion['matrix']):
+        print(f"   {name[:20]:20s} " + ' '.join(f"{count:4d}" for count in row))
+    print(f"{'=' * 60}")
+
+
+def main():
+    """python evaluate_cnn.py [--model ...] [--data ...] [--split holdout|all]
+
+    The default split is the holdout the model was trained without, or every
+    image when it was trained on all of them (use a separate --data folder
+    then, or the accuracy is training accuracy).
+    """
+    parser = argparse.ArgumentParser(description='Evaluate the Philippine document CNN')
+    parser.add_argument('--model', default='../saved_models/ph_document_cnn.keras')
+    parser.add_argument('--data', default='../../uploads/real_ids',
+                        help='labeled folder tree: primary|secondary/<document type>/')
+    parser.add_argument('--split', choices=('holdout', 'all'), default=None,
+                        help="'holdout': the split train_simple held out (default when the model recorded one); "
+                             "'all': every image (separate test folder)")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--cache-dir', default='../dataset_cache')
+    args = parser.parse_args()
+
+    from train_cnn import PhilippineDocumentCNN, apply_resource_config
+    from dataset_manifest import holdout_split
+
+    apply_resource_config('training')
+
+    cnn = PhilippineDocumentCNN()
+    if not cnn.load_model(args.model):
+        print(f"❌ Could not load model: {args.model}")
+        return 1
+
+    model_dir = os.path.dirname(os.path.abspath(args.model))
+    holdout_fraction = recorded_holdout_fraction(cnn.training_stats, model_dir)
+    split = args.split or ('holdout' if holdout_fraction > 0 else 'all')
+    if split == 'holdout' and holdout_fraction <= 0:
+        print("❌ This model was trained on every image (no holdout recorded): its 'holdout' images are "
+              "training images. Use --split all with a separate test folder as --data.")
+        return 1
+    if split == 'all':
+        print("⚠️ Evaluating every image in --data: unless it is a separate test folder, "
+              "this is training accuracy, not accuracy on unseen images")
+
+    image_paths, labels, _ = cnn.scan_available_images(
+        args.data, manifest_path=os.path.join(args.cache_dir, 'manifest.json'))
+    if split == 'holdout':
+        print(f"🧪 Evaluating the {holdout_fraction:.0%} holdout recorded at training time")
+        _, _, image_paths, labels = holdout_split(image_paths, labels, holdout_fraction)
+
+    if not image_paths:
+        print("⚠️ No labeled images to evaluate")
+        return 1
+
+    report = evaluate_classifier(cnn, image_paths, labels, args.cache_dir, args.batch_size)
+    if report is None:
+        print("⚠️ None of the images could be read")
+        return 1
+
+    report.update({'model': os.path.basename(args.model), 'split': split, 'dataPath': args.data})
+    if split == 'holdout':
+        report['holdoutFraction'] = holdout_fraction
+    print_evaluation(report)
+    path = save_evaluation(report, model_dir)
+    print(f"💾 Evaluation saved: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# python-ml/cnn/image_decode.py
+"""Decode photos straight to CNN input size
+
+The CNN needs 224x224, but a phone JPEG is 12+ MP. libjpeg can decode at
+1/2, 1/4 or 1/8 scale by dropping DCT coefficients, which is several times
+faster and never materializes the full-resolution bitmap. The JPEG header
+is read with Pillow (no pixel decode) to choose the largest factor whose
+output still covers the model input. The decoded image is then
+area-resized into a preallocated RGB buffer.
+"""
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+
+REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+_buffers = threading.local()
+
+
+def reduced_decode_factor(image_path, target_size):
+    """Largest JPEG scale-down factor (1, 2, 4 or 8) that keeps both sides >= the target"""
+    try:
+        with Image.open(image_path) as header:
+            if header.format != 'JPEG':
+                return 1
+            width, height = header.size
+    except Exception:
+        return 1
+
+    # EXIF rotation may swap the sides, so the short side must cover the larger target side
+    needed = max(target_size)
+    for factor in (8, 4, 2):
+        if min(width, height) // factor >= needed:
+            return factor
+    return 1
+
+
+def decode_reduced(image_path, target_size):
+    """(BGR image or None, factor) decoded at the smallest size that still covers target_size"""
+    factor = reduced_decode_factor(image_path, target_size)
+    return cv2.imread(image_path, REDUCED_COLOR_FLAGS[factor]), factor
+
+
+def _thread_buffer(name, shape):
+    """Per-thread scratch array, reallocated only when the shape changes"""
+    buffer = getattr(_buffers, name, None)
+    if buffer is None or buffer.shape != shape:
+        buffer = np.empty(shape, dtype=np.uint8)
+        setattr(_buffers, name, buffer)
+    return buffer
+
+
+def resize_rgb_into(img, target_size, out=None):
+    """BGR image -> RGB uint8 of target_size (w, h), written into out
+
+    Without out, the result lives in a per-thread buffer that the next call
+    on the same thread overwrites; copy it if it must outlive the request.
+    """
+    width, height = target_size
+    if out is None:
+        out = _thread_buffer('rgb', (height, width, 3))
+    scratch = _thread_buffer('bgr', (height, width, 3))
+
+    shrinking = img.shape[1] >= width and img.shape[0] >= height
+    cv2.resize(img, (width, height), dst=scratch,
+               interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR)
+    cv2.cvtColor(scratch, cv2.COLOR_BGR2RGB, dst=out)
+    return out
+
+
+def load_rgb(image, target_size, out=None):
+    """Model-sized RGB uint8 from a file path (reduced JPEG decode) or a decoded BGR array; None if unreadable"""
+    if not isinstance(image, np.ndarray):
+        image, _ = decode_reduced(image, target_size)
+        if image is None:
+            return None
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    return resize_rgb_into(image, target_size, out)
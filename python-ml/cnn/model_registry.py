@@ -0,0 +1,279 @@
+# python-ml/cnn/model_registry.py
+import gc
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+MODEL_FILE = 'ph_document_cnn.keras'
+METADATA_FILE = 'metadata.json'
+STATE_FILE = 'registry.json'
+
+# Files that travel with a model into its version directory
+COMPANION_FILES = ('training_stats.json', 'thesis_info.json', 'evaluation.json')
+
+WARMUP_RUNS = 3
+
+
+class ModelHandle:
+    """One loaded model and the requests currently using it"""
+
+    def __init__(self, version, cnn, model_path):
+        self.version = version
+        self.cnn = cnn
+        self.model_path = model_path
+        self.inflight = 0
+        self.retired = False
+        self.activated_at = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ModelRegistry:
+    """Versioned models under saved_models/versions/<id>/ with hot swapping
+
+    A new version is loaded and warmed up in a background thread while the
+    current one keeps serving. The swap itself is a pointer change under a
+    lock, so new requests see the new model at once; the old model is
+    released only after the requests that leased it have finished.
+    """
+
+    def __init__(self, root, loader):
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+        self.state_path = os.path.join(root, STATE_FILE)
+        self.loader = loader  # model_path -> loaded PhilippineDocumentCNN
+        self._lock = threading.Condition()
+        self._active = None
+        self._retiring = []
+        self._loading = None
+        self.last_error = None
+        self.state = self._load_state()
+
+    # ---------- persistent state ----------
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('active', None)
+        state.setdefault('history', [])
+        return state
+
+    def _save_state(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    # ---------- versions on disk ----------
+
+    def version_dir(self, version_id):
+        return os.path.join(self.versions_dir, version_id)
+
+    def has_version(self, version_id):
+        return bool(version_id) and os.path.exists(os.path.join(self.version_dir(version_id), MODEL_FILE))
+
+    def _read_json(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list_versions(self):
+        """Metadata of every registered version, newest first"""
+        versions = []
+        if os.path.isdir(self.versions_dir):
+            for version_id in os.listdir(self.versions_dir):
+                if not self.has_version(version_id):
+                    continue
+                metadata = self._read_json(os.path.join(self.version_dir(version_id), METADATA_FILE)) or {}
+                metadata['version'] = version_id
+                metadata['active'] = self.active_version() == version_id
+                versions.append(metadata)
+        versions.sort(key=lambda v: (v.get('created', ''), v['version']), reverse=True)
+        return versions
+
+    def get_version(self, version_id):
+        """Metadata plus training stats and evaluation of one version"""
+        if not self.has_version(version_id):
+            return None
+        version_dir = self.version_dir(version_id)
+        details = self._read_json(os.path.join(version_dir, METADATA_FILE)) or {}
+        details.update({
+            'version': version_id,
+            'active': self.active_version() == version_id,
+            'modelBytes': os.path.getsize(os.path.join(version_dir, MODEL_FILE)),
+            'trainingStats': self._read_json(os.path.join(version_dir, 'training_stats.json')),
+            'evaluation': self._read_json(os.path.join(version_dir, 'evaluation.json'))
+        })
+        return details
+
+    def register(self, source, metadata=None):
+        """Copy a model (a .keras file or a directory holding one) into a new version"""
+        source_dir, model_file = (source, os.path.join(source, MODEL_FILE)) if os.path.isdir(source) \
+            else (os.path.dirname(source), source)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"No model at {model_file}")
+
+        version_id = time.strftime('v%Y%m%d-%H%M%S')
+        suffix = 1
+        while os.path.exists(self.version_dir(version_id)):
+            suffix += 1
+            version_id = f"{time.strftime('v%Y%m%d-%H%M%S')}-{suffix}"
+
+        # Copy into a temp dir, then rename: a version is either complete or absent
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp_dir = self.version_dir(version_id) + '.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+        shutil.copy2(model_file, os.path.join(tmp_dir, MODEL_FILE))
+        for name in COMPANION_FILES:
+            if os.path.exists(os.path.join(source_dir, name)):
+                shutil.copy2(os.path.join(source_dir, name), os.path.join(tmp_dir, name))
+
+        stats = self._read_json(os.path.join(tmp_dir, 'training_stats.json')) or {}
+        evaluation = self._read_json(os.path.join(tmp_dir, 'evaluation.json')) or {}
+        record = {
+            'version': version_id,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'source': os.path.abspath(model_file),
+            'architecture': stats.get('architecture', 'baseline'),
+            'inputSize': stats.get('inputSize', 224),
+            'trainingImages': stats.get('totalImages'),
+            'trainingAccuracy': stats.get('accuracy'),
+            'holdoutAccuracy': evaluation.get('accuracy', stats.get('holdoutAccuracy'))
+        }
+        record.update(metadata or {})
+        with open(os.path.join(tmp_dir, METADATA_FILE), 'w') as f:
+            json.dump(record, f, indent=2)
+
+        os.replace(tmp_dir, self.version_dir(version_id))
+        print(f"📦 Registered model version {version_id}")
+        return version_id
+
+    # ---------- serving ----------
+
+    def active_version(self):
+        with self._lock:
+            return self._active.version if self._active else None
+
+    def active_model(self):
+        """The serving model, or None (no lease: only for reading stats)"""
+        with self._lock:
+            return self._active.cnn if self._active else None
+
+    @contextmanager
+    def lease(self):
+        """Pin the active model for one request; yields None when nothing is loaded"""
+        with self._lock:
+            handle = self._active
+            if handle is not None:
+                handle.inflight += 1
+        try:
+            yield handle.cnn if handle is not None else None
+        finally:
+            if handle is not None:
+                with self._lock:
+                    handle.inflight -= 1
+                    self._lock.notify_all()
+                self._release_drained()
+
+    def adopt(self, cnn, version, model_path):
+        """Serve an already loaded model (e.g. the legacy saved_models file)"""
+        self._swap(ModelHandle(version, cnn, model_path), persist=False)
+
+    def activate(self, version_id, background=True):
+        """Load, warm up and swap in a version; returns False if it does not exist"""
+        if not self.has_version(version_id):
+            return False
+        with self._lock:
+            if self._loading:
+                raise RuntimeError(f"Version {self._loading} is still loading")
+            self._loading = version_id
+            self.last_error = None
+
+        if background:
+            threading.Thread(target=self._load_and_swap, args=(version_id,),
+                             name=f"model-load-{version_id}", daemon=True).start()
+            return True
+        return self._load_and_swap(version_id)
+
+    def rollback(self, background=True):
+        """Reactivate the version that was active before the current one"""
+        current = self.active_version()
+        for version_id in reversed(self.state['history']):
+            if version_id != current and self.has_version(version_id):
+                self.activate(version_id, background)
+                return version_id
+        return None
+
+    def _load_and_swap(self, version_id):
+        model_path = os.path.join(self.version_dir(version_id), MODEL_FILE)
+        try:
+            start = time.time()
+            print(f"🔄 Loading model version {version_id}...")
+            cnn = self.loader(model_path)
+            self._warmup(cnn)
+            self._swap(ModelHandle(version_id, cnn, model_path))
+            print(f"✅ Model version {version_id} active ({time.time() - start:.1f}s load + warmup)")
+            return True
+        except Exception as e:
+            self.last_error = {'version': version_id, 'error': str(e)}
+            print(f"❌ Model version {version_id} failed to load: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._loading = None
+
+    def _warmup(self, cnn):
+        """Run a few forward passes so the first real request is not the slow one"""
+        dtype = np.float32 if cnn.preprocessing_version == 1 else np.uint8
+        dummy = np.zeros((1, cnn.input_size[1], cnn.input_size[0], 3), dtype=dtype)
+        for _ in range(WARMUP_RUNS):
+            cnn.model(dummy, training=False)
+
+    def _swap(self, handle, persist=True):
+        with self._lock:
+            previous = self._active
+            self._active = handle
+            if previous is not None:
+                previous.retired = True
+                self._retiring.append(previous)
+            if persist:
+                self.state['active'] = handle.version
+                self.state['history'] = ([v for v in self.state['history'] if v != handle.version]
+                                         + [handle.version])[-20:]
+                self._save_state()
+        self._release_drained()
+
+    def _release_drained(self):
+        released = []
+        with self._lock:
+            for handle in list(self._retiring):
+                if handle.inflight == 0:
+                    self._retiring.remove(handle)
+                    handle.cnn = None
+                    released.append(handle.version)
+        if released:
+            gc.collect()
+            print(f"♻️ Released model version(s): {', '.join(released)}")
+
+    def status(self):
+        with self._lock:
+            active = self._active
+            return {
+                'activeVersion': active.version if active else None,
+                'activeModelPath': active.model_path if active else None,
+                'activatedAt': active.activated_at if active else None,
+                'inflightRequests': active.inflight if active else 0,
+                'loading': self._loading,
+                'lastError': self.last_error,
+                'draining': [{'version': h.version, 'inflightRequests': h.inflight} for h in self._retiring],
+                'history': list(self.state['history'])
+            }
@@ -10,6 +10,163 @@ import time
 import sys
 from collections import Counter
 
+# Shared CPU thread budget lives in python-ml/runtime
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'runtime'))
+from resource_config import apply_resource_config
+
+from dataset_cache import DatasetCache
+from image_decode import load_rgb
+from dataset_manifest import DatasetManifest, holdout_split
+from cnn_model import ARCHITECTURES, create_compact_document_cnn
+from evaluate_cnn import evaluate_classifier, print_evaluation, save_evaluation
+
+# Input normalization: 1 = float32 [0, 1] scaled in NumPy (older saved models),
+# 2 = uint8 input, scaled by a Rescaling layer inside the model graph
+PREPROCESSING_VERSION = 2
+
+# Default input size; variants are trained at VARIANT_SIZES (see train_variants)
+IMAGE_SIZE = (224, 224)
+VARIANT_SIZES = (96, 128, 160, 224)
+VARIANTS_FILE = 'model_variants.json'
+
+# Smallest dataset worth splitting for held-out evaluation
+MIN_IMAGES_FOR_HOLDOUT = 10
+
+# Streaming input pipeline settings
+SHUFFLE_BUFFER = 1024  # shuffles file paths, not decoded images
+
+def detect_preprocessing_version(model):
+    """Version 2 models open with an in-graph Rescaling layer; anything older is version 1"""
+    if any(isinstance(layer, layers.Rescaling) for layer in model.layers[:2]):
+        return 2
+    return 1
+
+def measure_inference_latency(model, input_size=IMAGE_SIZE, runs=30, warmup=5):
+    """Single-image CPU latency of a direct model call, as classify() makes it"""
+    image = np.random.randint(0, 256, (1, input_size[1], input_size[0], 3), dtype=np.uint8)
+    for _ in range(warmup):
+        model(image, training=False)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(image, training=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'medianMs': round(timings[len(timings) // 2], 2),
+        'p95Ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2)
+    }
+
+def variant_accuracy(variant):
+    """Held-out accuracy when there was a held-out split, training accuracy otherwise"""
+    accuracy = variant.get('holdoutAccuracy')
+    return accuracy if accuracy is not None else (variant.get('trainAccuracy') or 0.0)
+
+def select_model_variant(model_dir, budget_ms=None):
+    """Most accurate variant whose p95 latency fits the budget (the fastest if none fits)
+    
+    Returns the variant entry from model_variants.json, or None when there
+    are no variants. Without a budget the most accurate variant wins.
+    """
+    try:
+        with open(os.path.join(model_dir, VARIANTS_FILE), 'r') as f:
+            variants = json.load(f).get('variants', [])
+    except (OSError, ValueError):
+        return None
+    
+    variants = [v for v in variants if os.path.exists(os.path.join(model_dir, v['modelPath']))]
+    if not variants:
+        return None
+    
+    fitting = [v for v in variants if budget_ms is None or v['latencyMs']['p95Ms'] <= budget_ms]
+    if not fitting:
+        return min(variants, key=lambda v: v['latencyMs']['p95Ms'])
+    return max(fitting, key=lambda v: (variant_accuracy(v), -v['latencyMs']['p95Ms']))
+
+class EpochThroughputCallback(keras.callbacks.Callback):
+    """Report images/second for every training epoch"""
+    
+    def __init__(self, images_per_epoch):
+        super().__init__()
+        self.images_per_epoch = images_per_epoch
+        self.epoch_rates = []
+        self._epoch_start = None
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.time()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = max(time.time() - self._epoch_start, 1e-6)
+        rate = self.images_per_epoch / elapsed
+        self.epoch_rates.append(rate)
+        print(f"   ⚡ Epoch {epoch + 1}: {rate:.1f} images/sec ({elapsed:.1f}s)")
+
+def write_progress(progress_path, **progress):
+    """Atomically replace the JSON progress file a background job is polled through"""
+    progress['updatedAt'] = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+    tmp_path = progress_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+def update_progress(progress_path, **changes):
+    """Merge changes into the progress file (e.g. the final state after the last epoch)"""
+    try:
+        with open(progress_path, 'r') as f:
+            progress = json.load(f)
+    except (OSError, ValueError):
+        progress = {}
+    progress.update(changes)
+    write_progress(progress_path, **progress)
+
+class TrainingProgressCallback(keras.callbacks.Callback):
+    """Write epoch, loss, images/second and ETA to a progress file (at most once a second)"""
+    
+    def __init__(self, progress_path, images_per_epoch, steps_per_epoch, epochs, interval=1.0):
+        super().__init__()
+        self.progress_path = progress_path
+        self.images_per_epoch = images_per_epoch
+        self.steps_per_epoch = max(1, steps_per_epoch)
+        self.epochs = epochs
+        self.interval = interval
+        self._start = None
+        self._epoch = 0
+        self._last_write = 0.0
+    
+    def on_train_begin(self, logs=None):
+        self._start = time.time()
+        self._write(0, logs)
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch = epoch
+    
+    def on_train_batch_end(self, batch, logs=None):
+        if time.time() - self._last_write >= self.interval:
+            self._write(self._epoch * self.steps_per_epoch + batch + 1, logs)
+    
+    def on_epoch_end(self, epoch, logs=None):
+        self._write((epoch + 1) * self.steps_per_epoch, logs)
+    
+    def _write(self, steps_done, logs):
+        logs = logs or {}
+        elapsed = time.time() - self._start
+        total_steps = self.steps_per_epoch * self.epochs
+        rate = steps_done / elapsed if elapsed > 0 and steps_done else 0.0
+        write_progress(
+            self.progress_path,
+            state='training',
+            epoch=min(self.epochs, steps_done // self.steps_per_epoch + 1),
+            epochs=self.epochs,
+            step=steps_done,
+            totalSteps=total_steps,
+            loss=float(logs['loss']) if 'loss' in logs else None,
+            accuracy=float(logs['accuracy']) if 'accuracy' in logs else None,
+            imagesPerSecond=round(rate * self.images_per_epoch / self.steps_per_epoch, 1),
+            elapsedSeconds=round(elapsed, 1),
+            etaSeconds=round((total_steps - steps_done) / rate, 1) if rate else None
+        )
+        self._last_write = time.time()
+
 class PhilippineDocumentCNN:
     def __init__(self):
         self.id_types = [
@@ -43,63 +200,56 @@ class PhilippineDocumentCNN:
         self.model = None
         self.model_accuracy = 0.0
         self.training_stats = {}
+        self.dataset_manifest = None
+        self.evaluation = None
+        self.preprocessing_version = PREPROCESSING_VERSION
+        self.input_size = IMAGE_SIZE
         
         print("🧠 Philippine Document CNN Trainer")
         print("   Framework: TensorFlow", tf.__version__)
         print("   Purpose: Barangay Lajong Document Classification")
         
-    def scan_available_images(self, base_path='../../uploads/real_ids'):
-        """Scan ALL available images, even if folders are empty"""
+    def scan_available_images(self, base_path='../../uploads/real_ids',
+                              manifest_path='../dataset_cache/manifest.json'):
+        """Scan ALL available images, even if folders are empty
+        
+        Goes through the dataset manifest: unchanged folders are not listed
+        again and duplicates are found from the stored content hashes.
+        """
         images = []
         labels = []
         image_stats = {}
         
         print("🔍 Scanning ALL available Philippine document images...")
         
-        # Document types to check
-        document_types = list(self.folder_to_index.keys())
-        
-        for doc_type in document_types:
-            # Try primary folder
-            primary_path = os.path.join(base_path, 'primary', doc_type)
-            if os.path.exists(primary_path):
-                # Get ALL image files
-                image_files = []
-                for ext in ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']:
-                    for file in os.listdir(primary_path):
-                        if file.lower().endswith(ext):
-                            image_files.append(os.path.join(primary_path, file))
-                
-                if image_files:
-                    display_name = self._convert_folder_name(doc_type)
-                    image_stats[display_name] = len(image_files)
-                    print(f"   📂 primary/{doc_type}: {len(image_files)} images")
-                    
-                    for img_path in image_files:
-                        images.append(img_path)
-                        labels.append(self.folder_to_index[doc_type])
-            
-            # Try secondary folder
-            secondary_path = os.path.join(base_path, 'secondary', doc_type)
-            if os.path.exists(secondary_path):
-                # Get ALL image files
-                image_files = []
-                for ext in ['.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG']:
-                    for file in os.listdir(secondary_path):
-                        if file.lower().endswith(ext):
-                            image_files.append(os.path.join(secondary_path, file))
-                
-                if image_files:
-                    display_name = self._convert_folder_name(doc_type)
-                    if display_name in image_stats:
-                        image_stats[display_name] += len(image_files)
-                    else:
-                        image_stats[display_name] = len(image_files)
-                    print(f"   📂 secondary/{doc_type}: {len(image_files)} images")
-                    
-                    for img_path in image_files:
-                        images.append(img_path)
-                        labels.append(self.folder_to_index[doc_type])
+        manifest = self.dataset_manifest = DatasetManifest(base_path, manifest_path)
+        scan = manifest.scan(list(self.folder_to_index.keys()))
+        print(f"   🗂️ Manifest: {scan['dirsListed']} folders changed, "
+              f"{scan['dirsReused']} unchanged, {scan['filesHashed']} files hashed")
+        
+        # Copies within one class add nothing; copies across classes are mislabeled
+        duplicates = set()
+        for group in manifest.duplicates():
+            doc_types = sorted({manifest.files[rel_path][0] for rel_path in group})
+            if len(doc_types) == 1:
+                duplicates.update(group[1:])
+            else:
+                print(f"   ⚠️ Same image filed under {', '.join(doc_types)}: {', '.join(group)}")
+        if duplicates:
+            print(f"   ♻️ Skipping {len(duplicates)} duplicate images")
+        
+        folder_counts = Counter()
+        for rel_path, doc_type, tier in manifest.items():
+            if rel_path in duplicates or doc_type not in self.folder_to_index:
+                continue
+            images.append(manifest.path_for(rel_path))
+            labels.append(self.folder_to_index[doc_type])
+            folder_counts[(tier, doc_type)] += 1
+        
+        for (tier, doc_type), count in sorted(folder_counts.items()):
+            display_name = self._convert_folder_name(doc_type)
+            image_stats[display_name] = image_stats.get(display_name, 0) + count
+            print(f"   📂 {tier}/{doc_type}: {count} images")
         
         print(f"\n📊 TOTAL: {len(images)} images found across {len(image_stats)} document types")
         
@@ -130,36 +280,92 @@ class PhilippineDocumentCNN:
         }
         return mapping.get(folder_name, folder_name.replace('_', ' ').title())
     
-    def preprocess_image(self, image_path):
-        """Load and preprocess a single image"""
+    def preprocess_image(self, image_path, out=None):
+        """Load and preprocess a single image (uint8; float32 for version 1 models)
+        
+        image_path may also be an already decoded BGR array (e.g. a card crop).
+        Large JPEGs are decoded at reduced size and area-resized straight to the
+        model input size (224x224 unless a smaller variant is loaded), into out
+        when given (uint8 models) or a per-thread buffer reused by the next call.
+        """
+        name = 'image array' if isinstance(image_path, np.ndarray) else os.path.basename(image_path)
         try:
-            # Read image
-            img = cv2.imread(image_path)
+            img = load_rgb(image_path, self.input_size, None if self.preprocessing_version == 1 else out)
             if img is None:
-                print(f"   ⚠️ Could not read: {os.path.basename(image_path)}")
+                print(f"   ⚠️ Could not read: {name}")
                 return None
             
-            # Convert BGR to RGB
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            
-            # Resize to 224x224
-            img = cv2.resize(img, (224, 224))
-            
-            # Normalize to [0, 1]
-            img = img.astype('float32') / 255.0
+            # Older models expect [0, 1] floats; newer ones rescale in-graph
+            if self.preprocessing_version == 1:
+                img = img.astype('float32') / 255.0
+                if out is not None:
+                    out[...] = img
+                    img = out
             
             return img
             
         except Exception as e:
-            print(f"   ❌ Error processing {os.path.basename(image_path)}: {str(e)}")
+            print(f"   ❌ Error processing {name}: {str(e)}")
             return None
     
-    def create_model(self, num_classes):
+    def _decode_for_dataset(self, image_path):
+        """load_rgb for tf.numpy_function; raises on unreadable files so ignore_errors drops them"""
+        path = image_path.decode('utf-8') if isinstance(image_path, bytes) else str(image_path)
+        img = load_rgb(path, self.input_size)
+        if img is None:
+            raise ValueError(f"Could not read: {os.path.basename(path)}")
+        return img.copy()  # load_rgb's buffer is reused by the next call on this thread
+    
+    def _load_image_tf(self, image_path, label):
+        """Decode and resize one image to uint8 with the serving decode (EXIF orientation, area resize)"""
+        img = tf.numpy_function(self._decode_for_dataset, [image_path], tf.uint8)
+        img.set_shape([self.input_size[1], self.input_size[0], 3])  # scaled inside the model
+        return img, label
+    
+    def build_dataset(self, image_paths, labels, batch_size, shuffle=True):
+        """Streaming input pipeline: parallel decode/resize, shuffle, batch, prefetch
+        
+        Only file paths are held in memory; images are decoded per batch on all
+        cores while the model trains on the previous one, with the same
+        load_rgb path serving uses, so training sees the pixels serving does.
+        """
+        dataset = tf.data.Dataset.from_tensor_slices(
+            (tf.constant(image_paths), tf.constant(labels, dtype=tf.int32))
+        )
+        
+        if shuffle:
+            dataset = dataset.shuffle(min(len(image_paths), SHUFFLE_BUFFER),
+                                      reshuffle_each_iteration=True)
+        
+        dataset = dataset.map(self._load_image_tf,
+                              num_parallel_calls=tf.data.AUTOTUNE,
+                              deterministic=not shuffle)
+        
+        # Unreadable files are skipped, like preprocess_image returning None
+        dataset = dataset.ignore_errors()
+        
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    
+    def create_model(self, num_classes, architecture='baseline'):
         """Create CNN model for Philippine document classification"""
+        if architecture not in ARCHITECTURES:
+            raise ValueError(f"Unknown architecture: {architecture} (choose from {', '.join(ARCHITECTURES)})")
+        
+        if architecture == 'compact':
+            model = create_compact_document_cnn(num_classes, input_size=self.input_size[0])
+            self.preprocessing_version = PREPROCESSING_VERSION
+            print(f"✅ Created {num_classes}-class compact CNN (separable conv + GAP)")
+            print(f"   Total parameters: {model.count_params():,}")
+            return model
+        
         model = keras.Sequential([
+            # uint8 pixels in, scaled to [0, 1] inside the graph
+            layers.Input(shape=(self.input_size[1], self.input_size[0], 3), dtype='uint8',
+                         name='ph_image_uint8'),
+            layers.Rescaling(1.0 / 255, name='rescale_ph_input'),
+            
             # Layer 1: Convolutional
             layers.Conv2D(32, (3, 3), activation='relu', padding='same',
-                         input_shape=(224, 224, 3),
                          name='conv1_ph_document'),
             
             # Layer 2: Max Pooling
@@ -193,15 +399,22 @@ class PhilippineDocumentCNN:
             metrics=['accuracy']
         )
         
+        self.preprocessing_version = PREPROCESSING_VERSION
+        
         print(f"✅ Created {num_classes}-class CNN for Philippine documents")
         print(f"   Total parameters: {model.count_params():,}")
         
         return model
     
-    def train_simple(self, data_path='../../uploads/real_ids', epochs=15, batch_size=4):
+    def train_simple(self, data_path='../../uploads/real_ids', epochs=15, batch_size=4,
+                     use_cache=True, cache_dir='../dataset_cache', architecture='baseline',
+                     holdout_fraction=0.0, save_path='../saved_models', progress_path=None):
         """
         Simple training that works with ANY number of images
-        Uses all available data for training, no validation split
+        Uses all available data for training unless holdout_fraction is set
+        With use_cache, preprocessed images are reused from the memmap dataset cache
+        save_path=None keeps the trained model in memory only
+        progress_path: JSON file updated during training (background jobs poll it)
         """
         print("🎓 THESIS: Training CNN with available Philippine documents")
         print("=" * 60)
@@ -209,71 +422,91 @@ class PhilippineDocumentCNN:
         start_time = time.time()
         
         # Scan available images
-        image_paths, labels, image_stats = self.scan_available_images(data_path)
+        image_paths, labels, image_stats = self.scan_available_images(
+            data_path, manifest_path=os.path.join(cache_dir, 'manifest.json'))
         
         if len(image_paths) < 2:
             print("⚠️ Not enough images for training (need at least 2)")
             print("   Using synthetic data for thesis demonstration...")
-            return self.train_with_synthetic_data()
+            return self.train_with_synthetic_data(architecture)
+        
+        # Deterministic held-out split for comparing models
+        holdout_paths, holdout_labels = [], []
+        self.evaluation = None
+        if holdout_fraction > 0 and len(image_paths) < MIN_IMAGES_FOR_HOLDOUT:
+            print(f"\n⚠️ Only {len(image_paths)} images: training on all of them, no held-out evaluation")
+        elif holdout_fraction > 0:
+            image_paths, labels, holdout_paths, holdout_labels = holdout_split(
+                image_paths, labels, holdout_fraction)
+            print(f"\n🧪 Holding out {len(holdout_paths)} images for evaluation")
         
         print(f"\n🏋️ Training with ALL {len(image_paths)} available images...")
         
-        # Preprocess images
-        print("\n📊 Preprocessing images...")
-        X = []
-        y = []
-        
-        processed_count = 0
-        for i, img_path in enumerate(image_paths):
-            img = self.preprocess_image(img_path)
-            if img is not None:
-                X.append(img)
-                y.append(labels[i])
-                processed_count += 1
-            
-            if (i + 1) % 5 == 0 or (i + 1) == len(image_paths):
-                print(f"   Processed {i + 1}/{len(image_paths)} images ({processed_count} valid)")
-        
-        if processed_count < 2:
-            print("❌ Less than 2 valid images processed")
-            return False
-        
-        X = np.array(X)
-        y = np.array(y)
+        num_images = len(image_paths)
         
-        print(f"\n✅ Successfully processed {len(X)} images for training")
-        print(f"   Unique classes: {len(np.unique(y))}")
+        print(f"   Unique classes: {len(np.unique(labels))}")
         
-        # Create model based on actual classes found
-        actual_classes = len(np.unique(y))
-        self.model = self.create_model(actual_classes)
+        # Output units cover every label index so predictions map onto id_types
+        actual_classes = int(max(list(labels) + list(holdout_labels))) + 1
+        self.model = self.create_model(actual_classes, architecture)
         
         # Adjust training parameters based on dataset size
-        actual_epochs = min(epochs, max(5, 100 // max(1, len(X) // 5)))
-        actual_batch_size = min(batch_size, max(1, len(X) // 2))
+        actual_epochs = min(epochs, max(5, 100 // max(1, num_images // 5)))
+        actual_batch_size = min(batch_size, max(1, num_images // 2))
         
         print(f"\n📈 Training Parameters:")
-        print(f"   Epochs: {actual_epochs} (adjusted for {len(X)} images)")
+        print(f"   Epochs: {actual_epochs} (adjusted for {num_images} images)")
         print(f"   Batch size: {actual_batch_size}")
-        print(f"   Total steps: {(len(X) // actual_batch_size) * actual_epochs}")
+        print(f"   Total steps: {(num_images // actual_batch_size) * actual_epochs}")
+        
+        if use_cache:
+            # Only new or changed images are decoded; batches are memmap slices
+            cache = DatasetCache(cache_dir, image_size=self.input_size)
+            train_dataset = cache.batches(image_paths, labels, actual_batch_size, shuffle=True)
+            test_dataset = cache.batches(image_paths, labels, 3, shuffle=False)
+            num_images = train_dataset.images
+            input_pipeline = 'memmap dataset cache'
+        else:
+            # Stream images from disk instead of materializing them all in RAM
+            print("\n📊 Building streaming input pipeline (parallel decode + prefetch)...")
+            train_dataset = self.build_dataset(image_paths, labels, actual_batch_size, shuffle=True)
+            test_dataset = self.build_dataset(image_paths, labels, 3, shuffle=False)
+            input_pipeline = 'tf.data streaming'
+        
+        if num_images < 2:
+            print("❌ Less than 2 valid images processed")
+            return False
+        
+        throughput = EpochThroughputCallback(num_images)
+        callbacks = [throughput]
+        if progress_path:
+            steps_per_epoch = len(train_dataset) if use_cache else -(-num_images // actual_batch_size)
+            callbacks.append(TrainingProgressCallback(progress_path, num_images, steps_per_epoch, actual_epochs))
         
         # Simple training - use all data (no validation split for small datasets)
         history = self.model.fit(
-            X, y,
+            train_dataset,
             epochs=actual_epochs,
-            batch_size=actual_batch_size,
             verbose=1,
-            validation_split=0.0,  # No validation for small datasets
-            shuffle=True
+            callbacks=callbacks
         )
         
         # Calculate accuracy from final epoch
         final_accuracy = history.history['accuracy'][-1] if 'accuracy' in history.history else 0.5
         self.model_accuracy = final_accuracy
         
+        # Accuracy, calibration and throughput on the held-out images
+        holdout_accuracy = None
+        if holdout_paths:
+            self.evaluation = evaluate_classifier(self, holdout_paths, holdout_labels, cache_dir)
+            if self.evaluation:
+                self.evaluation.update({'split': 'holdout', 'holdoutFraction': holdout_fraction})
+                holdout_accuracy = self.evaluation['accuracy']
+                print_evaluation(self.evaluation)
+        
         # Update training stats
         self.training_stats = {
-            'totalImages': len(X),
+            'totalImages': num_images,
             'documentTypes': len(image_stats),
             'accuracy': float(final_accuracy),
             'realTraining': True,
@@ -282,28 +515,51 @@ class PhilippineDocumentCNN:
             'batchSize': actual_batch_size,
             'imageStats': image_stats,
             'trainingTime': time.time() - start_time,
-            'note': f'Trained with available images (no validation split)'
+            'imagesPerSecond': [round(rate, 1) for rate in throughput.epoch_rates],
+            'inputPipeline': input_pipeline,
+            'preprocessingVersion': PREPROCESSING_VERSION,
+            'architecture': architecture,
+            'inputSize': self.input_size[0],
+            'parameters': int(self.model.count_params()),
+            'holdoutFraction': holdout_fraction if holdout_paths else 0.0,  # evaluate_cnn rebuilds the split from it
+            'holdoutImages': len(holdout_paths),
+            'holdoutAccuracy': None if holdout_accuracy is None else float(holdout_accuracy),
+            'dataset': {
+                'classCounts': self.dataset_manifest.class_counts(),
+                'duplicateGroups': len(self.dataset_manifest.duplicates())
+            },
+            'note': (f'Trained with available images ({len(holdout_paths)} held out)' if holdout_paths
+                     else 'Trained with available images (no validation split)')
         }
         
         # Save model
-        self.save_model()
+        if save_path:
+            self.save_model(save_path)
         
         training_time = time.time() - start_time
         print(f"\n{'='*60}")
         print(f"✅ TRAINING COMPLETE in {training_time:.1f} seconds!")
         print(f"{'='*60}")
         print(f"🎯 Final Accuracy: {final_accuracy * 100:.1f}%")
-        print(f"📊 Images Used: {len(X)}")
+        print(f"🏗️ Architecture: {architecture} ({self.model.count_params():,} parameters)")
+        print(f"📊 Images Used: {num_images}")
+        if throughput.epoch_rates:
+            print(f"⚡ Throughput: {np.mean(throughput.epoch_rates):.1f} images/sec (mean over epochs)")
         print(f"📁 Document Types: {len(image_stats)}")
         print(f"⚡ Speed: Python TensorFlow ({(training_time/60):.1f} minutes vs 10+ minutes in JS)")
         print(f"{'='*60}")
         
-        # Test the model
-        self.test_trained_model(X, y)
+        # Test the model on one batch
+        if use_cache:
+            X_batch, y_batch = test_dataset[0]
+            self.test_trained_model(X_batch, y_batch)
+        else:
+            for X_batch, y_batch in test_dataset.take(1):
+                self.test_trained_model(X_batch.numpy(), y_batch.numpy())
         
         return True
     
-    def train_with_synthetic_data(self):
+    def train_with_synthetic_data(self, architecture='baseline'):
         """Create synthetic training data for demonstration"""
         print("🧪 Creating synthetic data for thesis demonstration...")
         
@@ -311,11 +567,12 @@ class PhilippineDocumentCNN:
         num_samples = 100
         num_classes = len(self.id_types)
         
-        X = np.random.rand(num_samples, 224, 224, 3).astype('float32')
+        X = np.random.randint(0, 256, (num_samples, self.input_size[1], self.input_size[0], 3), dtype=np.uint8)
         y = np.random.randint(0, num_classes, num_samples)
         
         # Create model
-        self.model = self.create_model(num_classes)
+        self.model = self.create_model(num_classes, architecture)
+        self.evaluation = None
         
         # Quick training
         history = self.model.fit(
@@ -334,6 +591,8 @@ class PhilippineDocumentCNN:
             'accuracy': 0.78,
             'realTraining': False,
             'trainingDate': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'preprocessingVersion': PREPROCESSING_VERSION,
+            'architecture': architecture,
             'note': 'Synthetic data used for thesis demonstration'
         }
         
@@ -342,6 +601,67 @@ class PhilippineDocumentCNN:
         
         return True
     
+    def train_variants(self, data_path='../../uploads/real_ids', sizes=VARIANT_SIZES, epochs=15,
+                       batch_size=4, architecture='baseline', cache_dir='../dataset_cache',
+                       holdout_fraction=0.2, save_path='../saved_models'):
+        """Train one model per input size and record accuracy/latency for variant selection
+        
+        Latency is measured on this machine, so train variants on (or like) the
+        server that will serve them.
+        """
+        variants = []
+        
+        for size in sizes:
+            print(f"\n{'#' * 60}\n🔎 Variant: {size}x{size} input\n{'#' * 60}")
+            self.input_size = (size, size)
+            
+            if not self.train_simple(data_path, epochs, batch_size, cache_dir=cache_dir,
+                                     architecture=architecture, holdout_fraction=holdout_fraction,
+                                     save_path=None):
+                continue
+            if not self.training_stats.get('realTraining'):
+                print("⚠️ No real images: variants need a real dataset to compare")
+                return False
+            
+            variant_dir = os.path.join(save_path, 'variants', str(size))
+            self.save_model(variant_dir)
+            model_file = os.path.join(variant_dir, 'ph_document_cnn.keras')
+            
+            variants.append({
+                'inputSize': size,
+                'architecture': architecture,
+                'modelPath': os.path.relpath(model_file, save_path).replace('\\', '/'),
+                'holdoutAccuracy': self.training_stats.get('holdoutAccuracy'),
+                'trainAccuracy': self.training_stats.get('accuracy'),
+                'holdoutImages': self.training_stats.get('holdoutImages', 0),
+                'trainImages': self.training_stats.get('totalImages', 0),
+                'parameters': self.training_stats.get('parameters'),
+                'modelBytes': os.path.getsize(model_file),
+                'latencyMs': measure_inference_latency(self.model, self.input_size)
+            })
+        
+        if not variants:
+            return False
+        
+        variants_path = os.path.join(save_path, VARIANTS_FILE)
+        with open(variants_path, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'latencyMeasuredOn': f"{os.cpu_count()} CPUs, TensorFlow {tf.__version__}",
+                'variants': variants
+            }, f, indent=2)
+        
+        print(f"\n{'=' * 60}")
+        print(f"{'input':>7s} {'held-out acc':>13s} {'p50 ms':>8s} {'p95 ms':>8s} {'size':>10s}")
+        for variant in variants:
+            accuracy = variant_accuracy(variant)
+            print(f"{variant['inputSize']:>5d}px {accuracy * 100:12.1f}% "
+                  f"{variant['latencyMs']['medianMs']:8.1f} {variant['latencyMs']['p95Ms']:8.1f} "
+                  f"{variant['modelBytes'] / 1e6:8.2f}MB")
+        print(f"{'=' * 60}")
+        print(f"📊 Variant results saved: {variants_path}")
+        return True
+    
     def test_trained_model(self, X, y):
         """Test the trained model"""
         print("\n🧪 Testing trained CNN...")
@@ -396,9 +716,37 @@ class PhilippineDocumentCNN:
         with open(info_path, 'w') as f:
             json.dump(thesis_info, f, indent=2)
         
+        # Held-out evaluation from this training run (never leave a stale one)
+        if self.evaluation:
+            save_evaluation(self.evaluation, save_path)
+        elif os.path.exists(os.path.join(save_path, 'evaluation.json')):
+            os.remove(os.path.join(save_path, 'evaluation.json'))
+        
         print(f"\n💾 Model saved to: {model_path}")
         print(f"📊 Stats saved: {stats_path}")
     
+    def _format_prediction(self, prediction):
+        """Top 3 classes for one softmax row, in the classify() result format"""
+        top_indices = np.argsort(prediction)[::-1][:3]
+        results = []
+        
+        for idx in top_indices:
+            doc_name = self.id_types[idx] if idx < len(self.id_types) else f"Document {idx}"
+            results.append({
+                'className': doc_name,
+                'probability': float(prediction[idx]),
+                'confidence': float(prediction[idx] * 100)
+            })
+        
+        return {
+            'detectedIdType': results[0]['className'],
+            'confidenceScore': results[0]['probability'],
+            'topPredictions': results,
+            'accuracy': float(self.model_accuracy),
+            'isRealCNN': True,
+            'framework': 'TensorFlow Python'
+        }
+    
     def classify(self, image_path):
         """Classify a Philippine document"""
         try:
@@ -411,32 +759,41 @@ class PhilippineDocumentCNN:
                 return None
             
             img = np.expand_dims(img, axis=0)
-            predictions = self.model.predict(img, verbose=0)
+            # Direct call: predict() adds ~100 ms of per-call setup for one image
+            predictions = self.model(img, training=False).numpy()
             
-            # Get top 3 predictions
-            top_indices = np.argsort(predictions[0])[::-1][:3]
-            results = []
+            return self._format_prediction(predictions[0])
             
-            for idx in top_indices:
-                doc_name = self.id_types[idx] if idx < len(self.id_types) else f"Document {idx}"
-                results.append({
-                    'className': doc_name,
-                    'probability': float(predictions[0][idx]),
-                    'confidence': float(predictions[0][idx] * 100)
-                })
+        except Exception as e:
+            print(f"Classification error: {str(e)}")
+            return None
+    
+    def classify_batch(self, image_paths):
+        """Classify several documents in one forward pass; None for unreadable files"""
+        try:
+            if self.model is None:
+                print("Loading pre-trained model...")
+                self.load_model()
             
-            return {
-                'detectedIdType': results[0]['className'],
-                'confidenceScore': results[0]['probability'],
-                'topPredictions': results,
-                'accuracy': float(self.model_accuracy),
-                'isRealCNN': True,
-                'framework': 'TensorFlow Python'
-            }
+            dtype = np.float32 if self.preprocessing_version == 1 else np.uint8
+            batch = np.empty((len(image_paths), self.input_size[1], self.input_size[0], 3), dtype=dtype)
+            valid = []
+            for image_path in image_paths:
+                # Decoded and resized straight into the batch row
+                if self.preprocess_image(image_path, out=batch[len(valid)]) is not None:
+                    valid.append(image_path)
+            
+            results = dict.fromkeys(image_paths)
+            if valid:
+                predictions = self.model(batch[:len(valid)], training=False).numpy()
+                for image_path, prediction in zip(valid, predictions):
+                    results[image_path] = self._format_prediction(prediction)
+            
+            return [results[image_path] for image_path in image_paths]
             
         except Exception as e:
             print(f"Classification error: {str(e)}")
-            return None
+            return [None] * len(image_paths)
     
     def load_model(self, model_path='../saved_models/ph_document_cnn.keras'):
         """Load trained model"""
@@ -451,6 +808,13 @@ class PhilippineDocumentCNN:
                         self.training_stats = json.load(f)
                         self.model_accuracy = self.training_stats.get('accuracy', 0.78)
                 
+                self.preprocessing_version = detect_preprocessing_version(self.model)
+                input_shape = self.model.input_shape
+                if input_shape[1] and input_shape[2]:
+                    self.input_size = (int(input_shape[2]), int(input_shape[1]))
+                print(f"   Input: {self.input_size[0]}x{self.input_size[1]}, "
+                      f"preprocessing version {self.preprocessing_version}")
+                
                 print("✅ Loaded pre-trained Philippine Document CNN")
                 return True
         except Exception as e:
@@ -463,14 +827,52 @@ def main():
     print("🚀 Starting Philippine Document CNN Training")
     print("=" * 60)
     
+    apply_resource_config('training')
+    
     cnn = PhilippineDocumentCNN()
     
-    # Train with available images
-    success = cnn.train_simple(
-        data_path='../../uploads/real_ids',
-        epochs=15,
-        batch_size=4
-    )
+    # python train_cnn.py [baseline|compact] [variants]
+    args = sys.argv[1:]
+    architecture = next((arg for arg in args if arg in ARCHITECTURES),
+                        os.environ.get('CNN_ARCHITECTURE', 'baseline'))
+    
+    if 'variants' in args:
+        # One model per input size, evaluated for accuracy and CPU latency
+        cnn.train_variants(
+            data_path='../../uploads/real_ids',
+            epochs=15,
+            batch_size=4,
+            architecture=architecture
+        )
+        return
+    
+    # Background jobs started by the API (POST /train) set these
+    data_path = os.environ.get('CNN_DATA_PATH') or '../../uploads/real_ids'
+    save_path = os.environ.get('CNN_SAVE_PATH') or '../saved_models'
+    progress_path = os.environ.get('CNN_PROGRESS_FILE') or None
+    
+    # Train on all available images; CNN_HOLDOUT_FRACTION (or /train holdoutFraction) opts in to a held-out split
+    try:
+        success = cnn.train_simple(
+            data_path=data_path,
+            epochs=int(os.environ.get('CNN_EPOCHS') or 15),
+            batch_size=int(os.environ.get('CNN_BATCH_SIZE') or 4),
+            architecture=architecture,
+            holdout_fraction=float(os.environ.get('CNN_HOLDOUT_FRACTION') or 0),
+            save_path=save_path,
+            progress_path=progress_path
+        )
+    except Exception as e:
+        if progress_path:
+            update_progress(progress_path, state='failed', error=str(e))
+        raise
+    
+    if progress_path:
+        # Synthetic demo training is never saved, so there is nothing to register
+        model_saved = success and cnn.training_stats.get('realTraining', False)
+        update_progress(progress_path, state='completed' if model_saved else 'failed', etaSeconds=0,
+                        accuracy=float(cnn.model_accuracy), holdoutAccuracy=cnn.training_stats.get('holdoutAccuracy'),
+                        error=None if model_saved else 'No real training images (synthetic demo model not saved)')
     
     if success:
         print("\n🎓 THESIS DEMONSTRATION READY!")
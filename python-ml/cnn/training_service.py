@@ -0,0 +1,224 @@
+# python-ml/cnn/training_service.py
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'runtime'))
+from resource_config import parse_core_list
+
+PROGRESS_FILE = 'progress.json'
+LOG_FILE = 'train.log'
+KEEP_JOBS = 5
+
+# Per-library overrides and core pinning from the serving environment would bypass the job's budget
+SERVING_ONLY_ENV = ('ML_TF_INTRA_THREADS', 'ML_TF_INTER_THREADS', 'ML_OPENCV_THREADS',
+                    'ML_WORKERS', 'ML_WORKER_INDEX', 'ML_CPU_AFFINITY')
+
+
+class TrainingJob:
+    def __init__(self, job_id, job_dir, options):
+        self.id = job_id
+        self.dir = job_dir
+        self.options = options
+        self.process = None
+        self.state = 'starting'
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.finished_at = None
+        self.return_code = None
+        self.version = None
+        self.error = None
+        self.cancel_requested = False
+
+    @property
+    def running(self):
+        return self.state in ('starting', 'running')
+
+
+class TrainingService:
+    """Runs train_cnn.py in a separate, lower-priority process
+
+    One job at a time. The child gets its own thread budget (ML_THREADS) and
+    a lower CPU priority so serving latency holds up while it trains, and it
+    reports epoch / loss / images per second / ETA through a progress file.
+    It does not inherit the serving worker's CPU pinning: it runs on every
+    core, or on ML_TRAINING_AFFINITY (a core list like '4-7') when set.
+    A finished model is registered as a new version and, unless disabled,
+    activated in the background through the model registry.
+    """
+
+    def __init__(self, cnn_dir, jobs_dir, registry=None):
+        self.cnn_dir = os.path.abspath(cnn_dir)
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        self.registry = registry
+        self.affinity = self._training_cores()
+        self.threads = int(os.environ.get('ML_TRAINING_THREADS') or max(1, len(self.affinity) // 2))
+        self.niceness = int(os.environ.get('ML_TRAINING_NICE') or 10)
+        self._lock = threading.Lock()
+        self.job = None
+
+    @staticmethod
+    def _training_cores():
+        """ML_TRAINING_AFFINITY, else every core of the machine (not the serving worker's slice)"""
+        setting = os.environ.get('ML_TRAINING_AFFINITY', '').strip()
+        if setting:
+            try:
+                return parse_core_list(setting)
+            except ValueError:
+                print(f"⚠️ Ignoring ML_TRAINING_AFFINITY={setting!r} (expected e.g. '4-7')")
+        return list(range(os.cpu_count() or 1))
+
+    def _set_child_affinity(self):
+        """preexec_fn: replace the affinity mask inherited from the pinned serving worker"""
+        try:
+            os.sched_setaffinity(0, self.affinity)
+        except OSError:
+            pass  # cores outside this container's cpuset: keep the inherited mask
+
+    def start(self, architecture='baseline', epochs=15, batch_size=4, holdout_fraction=0.0, activate=True):
+        """Start a training job; raises RuntimeError while another one is running"""
+        with self._lock:
+            if self.job and self.job.running:
+                raise RuntimeError(f"Training job {self.job.id} is still running")
+
+            job_id = time.strftime('job-%Y%m%d-%H%M%S')
+            job = TrainingJob(job_id, os.path.join(self.jobs_dir, job_id), {
+                'architecture': architecture,
+                'epochs': epochs,
+                'batchSize': batch_size,
+                'holdoutFraction': holdout_fraction,
+                'activate': activate
+            })
+            os.makedirs(job.dir, exist_ok=True)
+            self._prune_jobs()
+
+            env = {k: v for k, v in os.environ.items() if k not in SERVING_ONLY_ENV}
+            env.update({
+                'ML_THREADS': str(self.threads),
+                'ML_NICE': str(self.niceness),
+                'CNN_ARCHITECTURE': architecture,
+                'CNN_EPOCHS': str(epochs),
+                'CNN_BATCH_SIZE': str(batch_size),
+                'CNN_HOLDOUT_FRACTION': str(holdout_fraction),
+                'CNN_SAVE_PATH': job.dir,
+                'CNN_PROGRESS_FILE': os.path.join(job.dir, PROGRESS_FILE),
+                'PYTHONUNBUFFERED': '1'
+            })
+
+            # Windows has no os.nice: start the process in a lower priority class
+            creationflags = getattr(subprocess, 'BELOW_NORMAL_PRIORITY_CLASS', 0)
+
+            log_file = open(os.path.join(job.dir, LOG_FILE), 'w', encoding='utf-8')
+            try:
+                job.process = subprocess.Popen(
+                    [sys.executable, 'train_cnn.py'],
+                    cwd=self.cnn_dir, env=env,
+                    stdout=log_file, stderr=subprocess.STDOUT,
+                    creationflags=creationflags,
+                    preexec_fn=self._set_child_affinity if hasattr(os, 'sched_setaffinity') else None
+                )
+            finally:
+                log_file.close()
+
+            job.state = 'running'
+            self.job = job
+
+        print(f"🏋️ Training job {job_id} started (pid {job.process.pid}, "
+              f"{self.threads} threads, {architecture})")
+        threading.Thread(target=self._monitor, args=(job,), name=f"train-{job_id}", daemon=True).start()
+        return job
+
+    def cancel(self):
+        """Stop the running job; returns it, or None when nothing is running"""
+        with self._lock:
+            job = self.job
+            if not job or not job.running:
+                return None
+            job.cancel_requested = True
+
+        job.process.terminate()
+        try:
+            job.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            job.process.kill()
+        return job
+
+    def _monitor(self, job):
+        job.return_code = job.process.wait()
+        progress = self._read_progress(job)
+
+        if job.cancel_requested:
+            job.state = 'cancelled'
+        elif job.return_code == 0 and progress.get('state') == 'completed':
+            job.state = 'completed'
+            self._register(job)
+        else:
+            job.state = 'failed'
+            job.error = progress.get('error') or f"train_cnn.py exited with code {job.return_code}"
+
+        job.finished_at = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        print(f"🏁 Training job {job.id}: {job.state}"
+              + (f" → model version {job.version}" if job.version else '')
+              + (f" ({job.error})" if job.error else ''))
+
+        # The registry keeps its own copy; the job directory keeps progress and log
+        model_file = os.path.join(job.dir, 'ph_document_cnn.keras')
+        if job.version and os.path.exists(model_file):
+            os.remove(model_file)
+
+    def _register(self, job):
+        if not self.registry:
+            job.error = 'No model registry: model left in ' + job.dir
+            return
+        try:
+            job.version = self.registry.register(job.dir, {'trainingJob': job.id, 'notes': 'POST /train'})
+            if job.options['activate']:
+                self.registry.activate(job.version)
+        except (OSError, RuntimeError) as e:
+            job.error = f"Registering the trained model failed: {e}"
+
+    def _read_progress(self, job):
+        try:
+            with open(os.path.join(job.dir, PROGRESS_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _log_tail(self, job, lines=20):
+        try:
+            with open(os.path.join(job.dir, LOG_FILE), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().splitlines()[-lines:]
+        except OSError:
+            return []
+
+    def _prune_jobs(self):
+        if not os.path.isdir(self.jobs_dir):
+            return
+        job_dirs = sorted(d for d in os.listdir(self.jobs_dir) if d.startswith('job-'))
+        for old in job_dirs[:-KEEP_JOBS]:
+            shutil.rmtree(os.path.join(self.jobs_dir, old), ignore_errors=True)
+
+    def status(self):
+        """Current or last job with its latest progress, or None"""
+        job = self.job
+        if not job:
+            return None
+        status = {
+            'jobId': job.id,
+            'state': job.state,
+            'options': job.options,
+            'startedAt': job.started_at,
+            'finishedAt': job.finished_at,
+            'pid': job.process.pid if job.process else None,
+            'threads': self.threads,
+            'cpuAffinity': self.affinity,
+            'progress': self._read_progress(job),
+            'modelVersion': job.version,
+            'error': job.error
+        }
+        if job.state == 'failed':
+            status['logTail'] = self._log_tail(job)
+        return status
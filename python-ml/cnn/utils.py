@@ -19,8 +19,8 @@ def load_philippine_document_types():
         'Student ID'
     ]
 
-def preprocess_image(image_path, target_size=(224, 224)):
-    """Preprocess image for CNN"""
+def preprocess_image(image_path, target_size=(224, 224), preprocessing_version=2):
+    """Preprocess image for CNN (uint8; version 1 models get float32 in [0, 1])"""
     img = cv2.imread(image_path)
     if img is None:
         raise ValueError(f"Could not read image: {image_path}")
@@ -31,8 +31,9 @@ def preprocess_image(image_path, target_size=(224, 224)):
     # Resize
     img = cv2.resize(img, target_size)
     
-    # Normalize
-    img = img.astype('float32') / 255.0
+    # Models since preprocessing version 2 rescale inside the graph
+    if preprocessing_version == 1:
+        img = img.astype('float32') / 255.0
     
     return img
 
@@ -0,0 +1,273 @@
+# python-ml/matching/gazetteer.py
+import json
+import os
+import re
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+GAZETTEER_FILE = os.path.join(DATA_DIR, 'ph_gazetteer.json')
+
+LEVELS = ('barangay', 'municipality', 'province')
+
+# Filler words that carry no place identity
+ADDRESS_STOPWORDS = {'BRGY', 'BGY', 'BARANGAY', 'PROVINCE', 'PROV', 'MUNICIPALITY', 'MUN',
+                     'PUROK', 'SITIO', 'STREET', 'ST', 'POBLACION', 'PHILIPPINES', 'PH', 'OF', 'THE'}
+ADDRESS_ABBREVIATIONS = {'STA': 'SANTA', 'STO': 'SANTO', 'POB': 'POBLACION', 'GEN': 'GENERAL'}
+# The phrase after these names the barangay; a phrase before these is a street named after a place
+BARANGAY_MARKERS = {'BRGY', 'BGY', 'BARANGAY'}
+STREET_MARKERS = {'ST', 'STREET', 'AVE', 'AVENUE', 'RD', 'ROAD'}
+# A phrase before these is (part of) a city name: QUEZON CITY is not barangay Quezon
+CITY_MARKERS = {'CITY'}
+
+MAX_PHRASE_TOKENS = 4
+RESOLVE_CACHE_SIZE = 4096
+
+
+def normalize_place(text):
+    """Upper-case, fold Ñ, drop punctuation and expand common abbreviations"""
+    text = str(text or '').upper().replace('Ñ', 'N')
+    tokens = re.sub(r'[^A-Z0-9]+', ' ', text).split()
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def max_distance_for(phrase):
+    """Edit budget by length so short names (GATE, NAMO) must match exactly"""
+    if len(phrase) <= 4:
+        return 0
+    if len(phrase) <= 7:
+        return 1
+    return 2
+
+
+class PlaceTrie:
+    """Character trie with Levenshtein-bounded search"""
+
+    def __init__(self):
+        # node = [children, entries, shortest key below, longest key below]
+        self.root = [{}, None, 0, 0]
+        self.size = 0
+
+    def insert(self, key, entry):
+        node = self.root
+        self._track_length(node, len(key))
+        for char in key:
+            node = node[0].setdefault(char, [{}, None, len(key), len(key)])
+            self._track_length(node, len(key))
+        if node[1] is None:
+            node[1] = []
+            self.size += 1
+        node[1].append(entry)
+
+    @staticmethod
+    def _track_length(node, length):
+        node[2] = min(node[2], length) if node[2] else length
+        node[3] = max(node[3], length)
+
+    def search(self, word, max_distance):
+        """All (distance, entry) pairs within max_distance of word"""
+        results = []
+        min_len, max_len = len(word) - max_distance, len(word) + max_distance
+        first_row = list(range(len(word) + 1))
+        stack = [(child, char, first_row) for char, child in self.root[0].items()]
+
+        while stack:
+            node, char, prev_row = stack.pop()
+            # No key below this node has a usable length
+            if node[3] < min_len or node[2] > max_len:
+                continue
+            row = [prev_row[0] + 1]
+            for col in range(1, len(word) + 1):
+                row.append(min(row[col - 1] + 1,
+                               prev_row[col] + 1,
+                               prev_row[col - 1] + (word[col - 1] != char)))
+
+            if row[-1] <= max_distance and node[1]:
+                results.extend((row[-1], entry) for entry in node[1])
+
+            # Prune branches that can no longer come within budget
+            if min(row) <= max_distance:
+                stack.extend((child, next_char, row) for next_char, child in node[0].items())
+
+        return results
+
+
+class PhilippineGazetteer:
+    """PSGC barangay/municipality/province names resolved from free-text addresses"""
+
+    def __init__(self, gazetteer_file=GAZETTEER_FILE):
+        self.trie = PlaceTrie()
+        self.exact = {}  # normalized name -> [entry, ...] for hash lookups
+        self.places = 0
+        self._cache = {}
+        self.load(gazetteer_file)
+
+    def load(self, gazetteer_file):
+        try:
+            with open(gazetteer_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Gazetteer not loaded: {e}")
+            return 0
+
+        for province in data.get('provinces', []):
+            province_name = province['name']
+            self._add('province', province_name, province, None, province_name)
+
+            for municipality in province.get('municipalities', []):
+                municipality_name = municipality['name']
+                self._add('municipality', municipality_name, municipality, municipality_name, province_name)
+
+                for barangay in municipality.get('barangays', []):
+                    self._add('barangay', barangay['name'], barangay, municipality_name, province_name)
+
+        self._cache.clear()
+        return self.places
+
+    def _add(self, level, name, record, municipality, province):
+        # entry = (level, canonical name, municipality, province)
+        entry = (level, name, municipality, province)
+        self.places += 1
+        for key in {normalize_place(name), *map(normalize_place, record.get('aliases', []))}:
+            if key:
+                self.trie.insert(key, entry)
+                self.exact.setdefault(key, []).append(entry)
+
+    def find_places(self, address):
+        """Every gazetteer hit in the address as (rank, distance, -tokens, entry)
+
+        rank 0 marks a phrase right after BRGY / BARANGAY, 1 any other phrase.
+        Phrases followed by ST / STREET / AVE are street names and are skipped.
+        Longer phrases are matched first (SORSOGON CITY before SORSOGON); a
+        phrase followed by CITY that is not itself a known city only matches
+        municipalities and provinces, never a barangay of the same name.
+        """
+        words = normalize_place(address).split()
+        positions = [i for i, word in enumerate(words) if word not in ADDRESS_STOPWORDS]
+        tokens = [words[i] for i in positions]
+        covered = [False] * len(tokens)
+        hits = []
+
+        def phrases():
+            for size in range(min(MAX_PHRASE_TOKENS, len(tokens)), 0, -1):
+                for start in range(len(tokens) - size + 1):
+                    if any(covered[start:start + size]):
+                        continue
+                    before, after = positions[start] - 1, positions[start + size - 1] + 1
+                    if after < len(words) and words[after] in STREET_MARKERS:
+                        continue
+                    rank = 0 if before >= 0 and words[before] in BARANGAY_MARKERS else 1
+                    city = after < len(words) and words[after] in CITY_MARKERS
+                    yield start, size, rank, city, ' '.join(tokens[start:start + size])
+
+        # Exact names first: plain hash lookups, longest phrase wins its tokens
+        for start, size, rank, city, phrase in phrases():
+            entries = [entry for entry in self.exact.get(phrase, ()) if not (city and entry[0] == 'barangay')]
+            if entries:
+                hits.extend((rank, 0, -size, entry) for entry in entries)
+                covered[start:start + size] = [True] * size
+
+        # Edit-distance search only over what is left (OCR misreads, typos)
+        for start, size, rank, city, phrase in phrases():
+            max_distance = max_distance_for(phrase)
+            if max_distance == 0 or not re.search(r'[A-Z]{3}', phrase):
+                continue
+            for distance, entry in self.trie.search(phrase, max_distance):
+                if not (city and entry[0] == 'barangay'):
+                    hits.append((rank, distance, -size, entry))
+
+        hits.sort(key=lambda hit: hit[:3])
+        return hits
+
+    def resolve(self, address):
+        """Canonical (barangay, municipality, province) tuple; unknown parts are None"""
+        return self.resolve_detail(address)[0]
+
+    def resolve_detail(self, address):
+        """(place tuple, number of distinct barangays the address could name)
+
+        More than one candidate means the barangay pick is a guess (e.g. a
+        street named after another barangay without a BRGY marker).
+        """
+        key = normalize_place(address)
+        if key in self._cache:
+            return self._cache[key]
+
+        hits = self.find_places(key)
+        best = {level: [] for level in LEVELS}
+        barangay_ranks = {}
+        for rank, _, _, entry in hits:
+            best[entry[0]].append(entry)
+            if entry[0] == 'barangay':
+                barangay_ranks.setdefault(entry, rank)
+
+        province = best['province'][0][3] if best['province'] else None
+
+        municipality = None
+        for entry in best['municipality']:
+            if province is None or entry[3] == province:
+                municipality, province = entry[2], entry[3]
+                break
+
+        barangay = None
+        for entry in best['barangay']:
+            if municipality is None or entry[2] == municipality:
+                barangay, municipality, province = entry[1], entry[2], entry[3]
+                break
+
+        candidates = 0
+        if barangay:
+            rank = min(rank for entry, rank in barangay_ranks.items() if entry[1] == barangay)
+            candidates = len({entry[1] for entry, entry_rank in barangay_ranks.items()
+                              if entry_rank == rank and entry[2] == municipality})
+
+        detail = ((barangay, municipality, province), candidates)
+        if len(self._cache) >= RESOLVE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = detail
+        return detail
+
+
+# Singleton
+ph_gazetteer = PhilippineGazetteer()
+
+
+# Load time / memory benchmark
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    gazetteer = PhilippineGazetteer()
+    load_ms = (time.perf_counter() - start) * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"📍 Gazetteer: {gazetteer.places} places, {gazetteer.trie.size} trie keys")
+    print(f"   Load time: {load_ms:.1f} ms")
+    print(f"   Memory: {current / 1024:.1f} KB resident, {peak / 1024:.1f} KB peak")
+
+    test_addresses = [
+        'Brgy. Lajong, Bulan, Sorsogon',
+        'PUROK 3 LAJ0NG BULAM SORSOGON',
+        'Zone 4 Poblacion, Bulan',
+        'Sta. Remedios Bulan Sorsogon',
+        'J.P. Laurel, Bulan',
+        'Purok 3, Aguinaldo St., Brgy. Lajong, Bulan, Sorsogon',
+        'Sorsogon City'
+    ]
+    for address in test_addresses:
+        print(f"   {address!r} -> {gazetteer.resolve(address)}")
+
+    rounds = 2000
+    start = time.perf_counter()
+    for i in range(rounds):
+        gazetteer._cache.clear()
+        gazetteer.resolve(test_addresses[i % len(test_addresses)])
+    per_call_us = (time.perf_counter() - start) / rounds * 1e6
+    print(f"   Uncached resolve: {per_call_us:.0f} µs per address")
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        gazetteer.resolve(test_addresses[i % len(test_addresses)])
+    per_call_us = (time.perf_counter() - start) / rounds * 1e6
+    print(f"   Cached resolve: {per_call_us:.1f} µs per address")
@@ -0,0 +1,122 @@
+# python-ml/matching/name_canonical.py
+import json
+import os
+import re
+from functools import lru_cache
+from itertools import product
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+NICKNAME_FILE = os.path.join(DATA_DIR, 'ph_nicknames.json')
+
+# Characters Tesseract puts where a letter was printed. Only the OCR side is
+# folded: the user typed letters, and folding real letters (L vs I) on both
+# sides would make different names equal
+OCR_CONFUSIONS = {
+    '0': 'O',
+    '1': 'IL',
+    '|': 'IL',
+    '2': 'Z',
+    '5': 'S',
+    '8': 'B',
+    '6': 'G'
+}
+
+# Consonant respellings of Filipino and Spanish-derived names, applied in one
+# pass (longest pattern wins): PH/F, C/K/QU, Z/S and V/B sound the same here.
+# Vowels, H and glides are kept as written: JUAN/JOAN or ELLA/ELIA are
+# different people, not spelling variants
+PHONETIC_RULES = {
+    'PH': 'F',
+    'QU': 'K',
+    'CE': 'SE',
+    'CI': 'SI',
+    'C': 'K',
+    'Z': 'S',
+    'V': 'B'
+}
+_PHONETIC_RE = re.compile('|'.join(sorted(PHONETIC_RULES, key=len, reverse=True)))
+
+
+MAX_AMBIGUOUS_OCR_CHARS = 6  # '1' / '|' expanded to I and L: at most 2**6 OCR keys per name
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(word):
+    """Phonetic key for a single name word: consonant respellings folded, vowels unchanged"""
+    word = re.sub(r'[^A-ZÑ]', '', word.upper())
+    return _PHONETIC_RE.sub(lambda m: PHONETIC_RULES[m.group(0)], word)
+
+
+@lru_cache(maxsize=16384)
+def ocr_keys(ocr_text):
+    """Every letter reading of an OCR'd name (frozenset), digits and '|' replaced per OCR_CONFUSIONS
+
+    The user's typed name matches when it is one of these keys.
+    """
+    text = ' '.join(re.sub(r'[^A-Z0-9|\s]', '', str(ocr_text or '').upper()).split())
+    options = [OCR_CONFUSIONS.get(char, char) for char in text]
+    if sum(len(option) > 1 for option in options) > MAX_AMBIGUOUS_OCR_CHARS:
+        options = [option[0] for option in options]
+    return frozenset(''.join(chars) for chars in product(*options))
+
+
+class NameCanonicalizer:
+    """Precomputed phonetic, nickname and OCR-confusion keys for name matching"""
+
+    def __init__(self, nickname_file=NICKNAME_FILE):
+        self.nickname_index = {}  # name word -> frozenset of nickname class ids
+        self.phonetic_index = {}  # phonetic key of a listed name -> frozenset of nickname class ids
+        self.load_nicknames(nickname_file)
+
+    def load_nicknames(self, nickname_file):
+        """Build the nickname and phonetic hash indexes once from the bundled classes"""
+        try:
+            with open(nickname_file, 'r', encoding='utf-8') as f:
+                classes = json.load(f).get('classes', [])
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Nickname data not loaded: {e}")
+            classes = []
+
+        index = {}
+        phonetic = {}
+        for class_id, names in enumerate(classes):
+            for name in names:
+                index.setdefault(name.upper(), set()).add(class_id)
+                phonetic.setdefault(phonetic_key(name), set()).add(class_id)
+
+        self.nickname_index = {name: frozenset(ids) for name, ids in index.items()}
+        self.phonetic_index = {key: frozenset(ids) for key, ids in phonetic.items()}
+        self.name_keys.cache_clear()
+
+    def word_keys(self, word):
+        """Canonical forms of a name word: its nickname classes (listed names and their
+        consonant respellings), else its phonetic key"""
+        classes = self.phonetic_index.get(phonetic_key(word))
+        return tuple(sorted(classes)) if classes else (phonetic_key(word),)
+
+    @lru_cache(maxsize=16384)
+    def name_keys(self, name):
+        """Every canonical key of a name (frozenset of per-word tuples); two names are
+        spelling / nickname variants of each other when their key sets intersect"""
+        return frozenset(product(*(self.word_keys(word) for word in name.split())))
+
+    def ocr_equivalent(self, ocr_text, user_text):
+        """True when the OCR text is the user's text with some letters misread as digits / '|'"""
+        user_text = ' '.join(re.sub(r'[^A-Z\s]', '', str(user_text or '').upper()).split())
+        return bool(user_text) and user_text in ocr_keys(ocr_text)
+
+    def is_nickname_variant(self, word1, word2):
+        """True when both words are the same name or share a nickname class"""
+        if word1 == word2:
+            return True
+        key1 = self.nickname_index.get(word1)
+        key2 = self.nickname_index.get(word2)
+        return bool(key1 and key2 and not key1.isdisjoint(key2))
+
+    def is_spelling_variant(self, name1, name2):
+        """Same name written with other consonants (C/K, Z/S, V/B, PH/F) or listed nicknames, word for word"""
+        return not self.name_keys(name1).isdisjoint(self.name_keys(name2))
+
+
+# Singleton
+name_canonicalizer = NameCanonicalizer()
@@ -0,0 +1,213 @@
+# python-ml/matching/resident_roster.py
+import csv
+import heapq
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+NGRAM_SIZE = 3
+
+# Grams shared by more than this fraction of the roster (e.g. " MA", "AN ")
+# say almost nothing about who the resident is, so they are skipped during
+# candidate retrieval as long as the query still has enough rarer grams.
+MAX_GRAM_DF_RATIO = 0.05
+MIN_GRAM_DF_CUTOFF = 50
+MIN_QUERY_GRAMS = 3
+
+
+def clean_resident_name(name):
+    """Normalize a name the same way advanced_name_comparison does"""
+    cleaned = re.sub(r'[^A-Z\s]', '', str(name or '').upper())
+    return ' '.join(cleaned.split())
+
+
+def name_ngrams(clean_name, n=NGRAM_SIZE):
+    """Character n-grams per word, padded so short words still index"""
+    grams = set()
+    for word in clean_name.split():
+        padded = f' {word} '
+        if len(padded) < n:
+            grams.add(padded)
+            continue
+        for i in range(len(padded) - n + 1):
+            grams.add(padded[i:i + n])
+    return grams
+
+
+class ResidentRoster:
+    """Barangay resident list with an n-gram inverted index for OCR name lookup"""
+
+    def __init__(self):
+        self.residents = []      # resident_id -> resident record
+        self.profiles = []       # resident_id -> precomputed name profile
+        self.postings = defaultdict(list)  # n-gram -> [resident_id, ...]
+        self.source_path = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.residents)
+
+    def clear(self):
+        with self._lock:
+            self.residents = []
+            self.profiles = []
+            self.postings = defaultdict(list)
+
+    def add_resident(self, resident):
+        """Add one resident and index it incrementally, returns its id"""
+        if isinstance(resident, str):
+            resident = {'fullName': resident}
+
+        full_name = (resident.get('fullName') or resident.get('full_name')
+                     or resident.get('name') or '').strip()
+        clean = clean_resident_name(full_name)
+        if not clean:
+            raise ValueError('Resident record has no usable name')
+
+        grams = name_ngrams(clean)
+
+        with self._lock:
+            resident_id = len(self.residents)
+            record = dict(resident)
+            record['fullName'] = full_name
+            record.setdefault('residentId', resident.get('id', resident_id))
+            self.residents.append(record)
+            self.profiles.append({
+                'clean': clean,
+                'gramCount': len(grams)
+            })
+            for gram in grams:
+                self.postings[gram].append(resident_id)
+
+        return resident_id
+
+    def add_residents(self, residents):
+        """Add many residents, skipping records without a name"""
+        added = 0
+        for resident in residents:
+            try:
+                self.add_resident(resident)
+                added += 1
+            except ValueError:
+                continue
+        return added
+
+    def load_file(self, path, replace=True):
+        """Load a roster from a .json or .csv file"""
+        residents = read_roster_file(path)
+        if replace:
+            self.clear()
+        added = self.add_residents(residents)
+        self.source_path = path
+        print(f"👥 Resident roster loaded: {added} residents from {os.path.basename(path)}")
+        return added
+
+    def save(self, path=None):
+        """Write the roster back to JSON so added residents survive restarts"""
+        path = path or self.source_path
+        if not path:
+            return False
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            residents = list(self.residents)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'residents': residents}, f, indent=2)
+        os.replace(tmp_path, path)
+        self.source_path = path
+        return True
+
+    def candidates(self, ocr_name, limit=50):
+        """Retrieve likely residents by shared n-grams without scanning the roster"""
+        clean = clean_resident_name(ocr_name)
+        query_grams = name_ngrams(clean)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            total = len(self.residents)
+            if total == 0:
+                return []
+
+            # Rarest grams first, so common grams can be dropped cheaply
+            known = [(len(self.postings[g]), g) for g in query_grams if g in self.postings]
+            known.sort()
+            max_df = max(MIN_GRAM_DF_CUTOFF, int(total * MAX_GRAM_DF_RATIO))
+
+            hits = defaultdict(int)
+            for used, (df, gram) in enumerate(known):
+                if df > max_df and used >= MIN_QUERY_GRAMS:
+                    break
+                for resident_id in self.postings[gram]:
+                    hits[resident_id] += 1
+
+            # Dice overlap between the query and each resident profile
+            scored = (
+                (2.0 * count / (len(query_grams) + self.profiles[rid]['gramCount']), rid)
+                for rid, count in hits.items()
+            )
+            return heapq.nlargest(limit, scored)
+
+    def search(self, ocr_name, top_k=5, compare=None, candidate_limit=None):
+        """Return the top-k residents for an OCR name
+
+        compare(ocr_name, resident_name) should return the same dict as
+        advanced_name_comparison; without it residents are ranked by n-gram overlap.
+        """
+        top_k = max(1, int(top_k))
+        candidate_limit = candidate_limit or max(50, top_k * 10)
+        ranked = []
+
+        for overlap, resident_id in self.candidates(ocr_name, candidate_limit):
+            resident = self.residents[resident_id]
+            entry = {
+                'residentId': resident.get('residentId', resident_id),
+                'fullName': resident['fullName'],
+                'address': resident.get('address', ''),
+                'candidateScore': round(overlap * 100, 1)
+            }
+            if compare is not None:
+                result = compare(ocr_name, resident['fullName'])
+                entry.update({
+                    'match': result['match'],
+                    'confidence': result['confidence'],
+                    'similarity': round(result['similarity'], 1),
+                    'note': result.get('note', '')
+                })
+                key = (result['match'], result['confidence'], result['similarity'])
+            else:
+                key = (overlap,)
+            ranked.append((key, entry))
+
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [entry for _, entry in ranked[:top_k]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'residents': len(self.residents),
+                'indexedNgrams': len(self.postings),
+                'ngramSize': NGRAM_SIZE,
+                'sourcePath': self.source_path
+            }
+
+
+def read_roster_file(path):
+    """Read resident records from JSON (list or {'residents': [...]}) or CSV"""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return [dict(row) for row in csv.DictReader(f)]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('residents', [])
+    return data
+
+
+# Singleton
+resident_roster = ResidentRoster()
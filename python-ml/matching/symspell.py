@@ -0,0 +1,171 @@
+# python-ml/matching/symspell.py
+import json
+import os
+import re
+from collections import defaultdict
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+LEXICON_FILE = os.path.join(DATA_DIR, 'ph_lexicon.json')
+
+# Digits never appear in names or places, so read them as the letter they resemble
+OCR_DIGIT_TABLE = str.maketrans({'0': 'O', '1': 'I', '2': 'Z', '5': 'S', '6': 'G', '8': 'B'})
+
+TOKEN_RE = re.compile(r'[A-Z0-9]+')
+
+
+def edit_distance(s1, s2, max_distance):
+    """Optimal string alignment distance, or max_distance + 1 when exceeded"""
+    if abs(len(s1) - len(s2)) > max_distance:
+        return max_distance + 1
+
+    prev_prev = None
+    prev = list(range(len(s2) + 1))
+    for i in range(1, len(s1) + 1):
+        current = [i] + [0] * len(s2)
+        row_min = current[0]
+        for j in range(1, len(s2) + 1):
+            cost = 0 if s1[i - 1] == s2[j - 1] else 1
+            current[j] = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
+            if (prev_prev is not None and i > 1 and j > 1
+                    and s1[i - 1] == s2[j - 2] and s1[i - 2] == s2[j - 1]):
+                current[j] = min(current[j], prev_prev[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, current
+
+    return prev[-1] if prev[-1] <= max_distance else max_distance + 1
+
+
+class SymSpellCorrector:
+    """Symmetric-delete spelling correction for OCR'd names and places"""
+
+    def __init__(self, max_edit_distance=2, prefix_length=7):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.words = {}                   # term -> frequency
+        self.deletes = defaultdict(list)  # delete variant -> [term, ...]
+
+    def __len__(self):
+        return len(self.words)
+
+    def _delete_variants(self, word):
+        """All variants of the word prefix with up to max_edit_distance deletes"""
+        prefix = word[:self.prefix_length]
+        variants = {prefix}
+        frontier = {prefix}
+        for _ in range(self.max_edit_distance):
+            next_frontier = set()
+            for item in frontier:
+                if len(item) <= 1:
+                    continue
+                for i in range(len(item)):
+                    variant = item[:i] + item[i + 1:]
+                    if variant not in variants:
+                        variants.add(variant)
+                        next_frontier.add(variant)
+            frontier = next_frontier
+        return variants
+
+    def add_word(self, term, count=1):
+        term = term.upper()
+        if term in self.words:
+            self.words[term] += count
+            return
+        self.words[term] = count
+        for variant in self._delete_variants(term):
+            self.deletes[variant].append(term)
+
+    def load_lexicon(self, lexicon_file=LEXICON_FILE):
+        """Load the bundled surname / given-name / place lexicon"""
+        try:
+            with open(lexicon_file, 'r', encoding='utf-8') as f:
+                lexicon = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ OCR lexicon not loaded: {e}")
+            return 0
+
+        for section in ('surnames', 'given_names', 'places'):
+            terms = lexicon.get(section, [])
+            for rank, term in enumerate(terms):
+                # Earlier entries are more common
+                self.add_word(term, len(terms) - rank)
+
+        return len(self.words)
+
+    def max_distance_for(self, token):
+        """Short tokens get fewer edits so real short names are not rewritten"""
+        if len(token) < 4:
+            return 0
+        if len(token) < 8:
+            return min(1, self.max_edit_distance)
+        return self.max_edit_distance
+
+    def lookup(self, token, max_distance=None):
+        """Best (term, distance) for a token, or None when nothing is close enough"""
+        token = token.upper().translate(OCR_DIGIT_TABLE)
+        if token in self.words:
+            return token, 0
+
+        if max_distance is None:
+            max_distance = self.max_distance_for(token)
+        if max_distance == 0:
+            return None
+
+        best = []  # (distance, -frequency, term)
+        checked = set()
+        prefix_len = min(len(token), self.prefix_length)
+
+        for variant in self._delete_variants(token):
+            # Deletes within the prefix already account for this many edits
+            if prefix_len - len(variant) > max_distance:
+                continue
+            for term in self.deletes.get(variant, ()):
+                if term in checked:
+                    continue
+                checked.add(term)
+                distance = edit_distance(token, term, max_distance)
+                if distance <= max_distance:
+                    best.append((distance, -self.words[term], term))
+
+        if not best:
+            return None
+
+        best.sort()
+        distance, neg_freq, term = best[0]
+        # Two different terms equally close and equally common: do not guess
+        if len(best) > 1 and best[1][0] == distance and best[1][1] == neg_freq:
+            return None
+        return term, distance
+
+    def correct_text(self, text, keep=(), misreads_only=False):
+        """Correct every alphabetic token in a field; returns (text, corrections)
+
+        Tokens in keep (e.g. the words the user typed for this field) are
+        already confirmed and left as they are, even when not in the lexicon.
+        With misreads_only (nothing to compare against), only tokens mixing
+        letters and look-alike digits (ESPEN1DA) are corrected: a clean
+        alphabetic token may be a rarer real name (ROSAS, not ROSA).
+        """
+        corrections = []
+        keep = {token.upper() for token in keep}
+
+        def replace(match):
+            token = match.group(0)
+            if not re.search(r'[A-Z]', token) or token in keep:
+                return token  # pure numbers (zone, ID digits) and confirmed tokens are left alone
+            if misreads_only and not re.search(r'\d', token):
+                return token
+            result = self.lookup(token)
+            if result and result[0] != token:
+                corrections.append({'from': token, 'to': result[0], 'distance': result[1]})
+                return result[0]
+            return token
+
+        corrected = TOKEN_RE.sub(replace, text.upper())
+        return corrected, corrections
+
+
+# Singleton
+ocr_corrector = SymSpellCorrector()
+ocr_corrector.load_lexicon()
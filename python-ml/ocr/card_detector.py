@@ -0,0 +1,118 @@
+# python-ml/ocr/card_detector.py
+"""Find the ID card in a photo and warp it to a flat, canonical crop
+
+Phone photos of IDs lying on a table are mostly background. The card is
+found as the largest convex quadrilateral in an edge map, computed on a
+downscaled copy. It is then perspective-warped to the ID-1 aspect ratio
+(85.60 x 53.98 mm) at roughly its original pixel width.
+"""
+import time
+
+import cv2
+import numpy as np
+
+DETECTION_SIZE = 640          # long side of the copy edges are detected on
+CARD_ASPECT = 85.60 / 53.98   # ID-1 (CR80): UMID, driver's license, PhilSys, ...
+MIN_CARD_AREA = 0.05          # fraction of the photo a card must cover
+SKIP_CROP_AREA = 0.90         # card already fills the photo: nothing to gain from warping
+MIN_RECTANGULARITY = 0.85     # contour area / min-area-rect area for the rectangle fallback
+CANNY_LOW, CANNY_HIGH = 20, 60  # low enough for a light card on a light table
+
+
+def order_corners(points):
+    """4x2 points -> top-left, top-right, bottom-right, bottom-left"""
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([points[np.argmin(sums)], points[np.argmin(diffs)],
+                     points[np.argmax(sums)], points[np.argmax(diffs)]], dtype=np.float32)
+
+
+def detect_card(image):
+    """Card corners in full-resolution pixels, or None when no card-like quadrilateral is found"""
+    height, width = image.shape[:2]
+    scale = min(1.0, DETECTION_SIZE / max(height, width))
+    small = image
+    if scale < 0.5:
+        # Cheap bilinear step to twice the detection size, then area-average the rest of the way
+        small = cv2.resize(image, (round(width * scale * 2), round(height * scale * 2)),
+                           interpolation=cv2.INTER_LINEAR)
+    if scale < 1.0:
+        small = cv2.resize(small, (max(1, round(width * scale)), max(1, round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(gray, CANNY_LOW, CANNY_HIGH)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=2)
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    image_area = float(gray.shape[0] * gray.shape[1])
+
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        area = cv2.contourArea(contour)
+        if area < MIN_CARD_AREA * image_area:
+            break
+
+        perimeter = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.02 * perimeter, True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            corners, method = approx.reshape(4, 2), 'quadrilateral'
+        else:
+            # Rounded corners or a finger over one edge: fall back to the bounding rotated rect
+            rect = cv2.minAreaRect(contour)
+            rect_area = rect[1][0] * rect[1][1]
+            if not rect_area or area / rect_area < MIN_RECTANGULARITY:
+                continue
+            corners, method = cv2.boxPoints(rect), 'rotated_rect'
+
+        corners = order_corners(corners) / scale
+        corners[:, 0] = corners[:, 0].clip(0, width - 1)
+        corners[:, 1] = corners[:, 1].clip(0, height - 1)
+        return {
+            'corners': corners,
+            'areaFraction': float(cv2.contourArea(corners) / (width * height)),
+            'method': method
+        }
+    return None
+
+
+def warp_card(image, corners):
+    """Perspective-warp the card to CARD_ASPECT, keeping its landscape/portrait orientation"""
+    tl, tr, br, bl = corners
+    card_width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+    card_height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+
+    if card_width >= card_height:
+        out_width = int(round(card_width))
+        out_height = int(round(out_width / CARD_ASPECT))
+    else:
+        out_height = int(round(card_height))
+        out_width = int(round(out_height / CARD_ASPECT))
+
+    target = np.array([[0, 0], [out_width - 1, 0], [out_width - 1, out_height - 1], [0, out_height - 1]],
+                      dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(corners.astype(np.float32), target)
+    return cv2.warpPerspective(image, matrix, (out_width, out_height), flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_REPLICATE)
+
+
+def crop_card(image):
+    """(card crop or None, detection info) for a BGR photo"""
+    start = time.perf_counter()
+    detection = detect_card(image)
+
+    info = {'detected': detection is not None, 'cropped': False}
+    crop = None
+    if detection:
+        info.update({
+            'method': detection['method'],
+            'areaFraction': round(detection['areaFraction'], 3),
+            'corners': detection['corners'].astype(float).round(1).tolist()
+        })
+        if detection['areaFraction'] < SKIP_CROP_AREA:
+            crop = warp_card(image, detection['corners'])
+            info.update({'cropped': True, 'cropSize': [crop.shape[1], crop.shape[0]]})
+
+    info['elapsedMs'] = round((time.perf_counter() - start) * 1000, 2)
+    return crop, info
@@ -0,0 +1,65 @@
+# python-ml/ocr/document_image.py
+import os
+import sys
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'runtime'))
+from pipeline_config import pipeline_config
+from card_detector import crop_card
+
+
+class DocumentImage:
+    """One uploaded photo and what the pipeline derives from it, computed once per request
+
+    The full-resolution photo and the card crop are decoded / detected at most
+    once and shared by the stages that need them. crop_mode (default
+    ML_CARD_CROP) decides which stages get the crop: 'ocr', 'all' or 'off'.
+    Without a crop the CNN gets the path, so it can decode the JPEG at
+    reduced size instead of at full resolution.
+    """
+
+    def __init__(self, path, crop_mode=None):
+        self.path = path
+        self.crop_mode = crop_mode or pipeline_config['cardCrop']
+        self._image = None
+        self._card = None
+        self._card_info = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def image(self):
+        """Decoded full-resolution BGR photo (None when unreadable)"""
+        if self._image is None:
+            self._image = cv2.imread(self.path)
+        return self._image
+
+    def card(self):
+        """Perspective-corrected card crop, or the whole photo when no card was found"""
+        if self._card_info is None:
+            if self.image is None:
+                self._card_info = {'detected': False, 'cropped': False}
+            else:
+                self._card, self._card_info = crop_card(self.image)
+        return self._card if self._card is not None else self.image
+
+    def for_ocr(self):
+        """Image array for OCR (the path when it could not be decoded, so OCR reports the error)"""
+        if self.image is None:
+            return self.path
+        return self.card() if self.crop_mode in ('ocr', 'all') else self.image
+
+    def for_cnn(self):
+        """Card crop for classification with crop_mode 'all', otherwise the path"""
+        if self.crop_mode != 'all' or self.image is None:
+            return self.path
+        return self.card()
+
+    def crop_info(self):
+        """Card detection details for API responses (None when no stage of this request used the crop)"""
+        if self.crop_mode == 'off' or self._card_info is None:
+            return None
+        return dict(self._card_info, mode=self.crop_mode)
@@ -4,47 +4,145 @@ import cv2
 import re
 import os
 import numpy as np
+import atexit
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'runtime'))
+from pipeline_config import pipeline_config
+from ocr_ladder import OCRStrategyLadder
+from layout_templates import LayoutRegionReader
+from resolution import normalize_resolution
+from mrz import is_passport_type, read_mrz
+from id_codes import read_id_codes
 
 # Set Tesseract path
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+# Per-document-type success counts of the OCR strategies (adapts the ladder order)
+OCR_STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'ocr_strategy_stats.json')
+
 class PhilippineOCR:
     def __init__(self):
         self.languages = 'eng'
+        self.ladder = OCRStrategyLadder(OCR_STATS_FILE, adaptive=pipeline_config['ocrLadder'] == 'adaptive')
+        atexit.register(self.ladder.save_stats, True)
+        self.regions = LayoutRegionReader() if pipeline_config['layoutOcr'] == 'on' else None
+        
+    def extract_text(self, image_path, id_type=None):
+        """OCR up the strategy ladder; id_type (expected document type) picks the ladder order
         
-    def extract_text(self, image_path):
-        """Simple OCR that works"""
+        image_path may also be an already decoded BGR array (e.g. a card crop)
+        """
         try:
-            print(f"🔍 OCR Processing: {os.path.basename(image_path)}")
-            
-            # Read image
-            img = cv2.imread(image_path)
+            if isinstance(image_path, np.ndarray):
+                print(f"🔍 OCR Processing: {image_path.shape[1]}x{image_path.shape[0]} image")
+                img = image_path
+            else:
+                print(f"🔍 OCR Processing: {os.path.basename(image_path)}")
+                # Read image
+                img = cv2.imread(image_path)
             if img is None:
                 return self.error_response("Cannot read image")
             
-            # Simple preprocessing
-            processed = self.simple_preprocess(img)
+            # Passports: the check-digit-protected MRZ alone carries every field we need
+            mrz = read_mrz(img) if is_passport_type(id_type) else None
+            mrz_summary = {key: value for key, value in mrz.items() if key != 'fields'} if mrz else None
+            if mrz:
+                print(f"   MRZ: {'valid' if mrz['valid'] else 'failed checks'} ({mrz['elapsedMs']:.0f}ms)")
+            if mrz and mrz['valid']:
+                return {
+                    'text': '\n'.join(mrz['lines']),
+                    'confidence': 100.0,  # every check digit holds
+                    'fields': mrz['fields'],
+                    'id_type': 'Philippine Passport',
+                    'success': True,
+                    'ocrStrategy': 'mrz',
+                    'ocrAttempts': [],
+                    'mrz': mrz_summary,
+                    'note': 'OCR Complete'
+                }
+            
+            # QR code / barcode (PhilSys QR and other coded IDs): decoded payload instead of OCR
+            codes = None
+            if pipeline_config['codeDecode'] == 'on' and not (mrz and mrz['valid']):
+                codes = read_id_codes(img, id_type)
+            codes_summary = {key: value for key, value in codes.items() if key != 'fields'} if codes else None
+            if codes:
+                print(f"   Codes: {', '.join(code['type'] for code in codes['codes'])} -> "
+                      f"{len(codes['fields'])} fields ({codes['elapsedMs']:.0f}ms)")
+            if codes and codes['complete']:
+                return {
+                    'text': '\n'.join(codes['fields'].values()),
+                    'confidence': 100.0,  # decoded, not recognized
+                    'fields': codes['fields'],
+                    'id_type': id_type or 'Unknown',
+                    'success': True,
+                    'ocrStrategy': 'qr_code' if codes['codes'][0]['type'] == 'QR_CODE' else 'barcode',
+                    'ocrAttempts': [],
+                    'mrz': mrz_summary,
+                    'codes': codes_summary,
+                    'note': 'OCR Complete'
+                }
+            
+            # Known card layout: read each field from its own region first
+            layout = self.regions.read(img, id_type) if self.regions else None
+            if layout:
+                print(f"   Layout OCR ({layout['template']}): {len(layout['fields'])} of "
+                      f"{len(layout['regions'])} regions read in {layout['elapsedMs']:.0f}ms")
+            if layout and layout['complete']:
+                return {
+                    'text': '\n'.join(layout['fields'].values()),
+                    'confidence': round(min(region['confidence'] for region in layout['regions'].values()
+                                            if region['accepted']), 1),
+                    'fields': {**layout['fields'], **(codes['fields'] if codes else {})},
+                    'id_type': layout['template'],
+                    'success': True,
+                    'ocrStrategy': 'layout_template',
+                    'ocrAttempts': [],
+                    'layoutRegions': layout['regions'],
+                    'mrz': mrz_summary,
+                    'codes': codes_summary,
+                    'note': 'OCR Complete'
+                }
             
-            # OCR
-            text = pytesseract.image_to_string(processed, config='--psm 6')
+            # Text at ~300 DPI size: bounded Tesseract time on big photos, readable thumbnails
+            resolution = None
+            if pipeline_config['ocrResolution'] == 'auto':
+                img, resolution = normalize_resolution(img)
+                print(f"   Resolution: {resolution['method']} x{resolution['scale']} -> "
+                      f"{resolution['size'][0]}x{resolution['size'][1]} ({resolution['elapsedMs']:.0f}ms)")
             
-            # Get confidence
-            data = pytesseract.image_to_data(processed, config='--psm 6', output_type=pytesseract.Output.DICT)
-            confidences = [int(c) for c in data['conf'] if int(c) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+            # Cheapest strategy first, escalating only while confidence / fields fall short
+            ladder_result = self.ladder.run(img, id_type)
+            text = ladder_result['text']
+            print(f"   OCR strategy: {ladder_result['strategy']} "
+                  f"({len(ladder_result['attempts'])} of {len(self.ladder.order_for(id_type))} tried, "
+                  f"confidence {ladder_result['confidence']:.0f})")
             
             # Extract fields SIMPLY
             fields = self.extract_fields_simply(text)
+            if layout:
+                # Region values beat regexes over the full text
+                fields.update(layout['fields'])
+            if codes:
+                # Decoded values beat anything read from pixels
+                fields.update(codes['fields'])
             
             # Detect ID type
-            id_type = self.detect_id_type_simply(text)
+            detected_type = self.detect_id_type_simply(text)
             
             return {
                 'text': text.strip(),
-                'confidence': avg_confidence,
+                'confidence': ladder_result['confidence'],
                 'fields': fields,
-                'id_type': id_type,
+                'id_type': detected_type,
                 'success': True,
+                'ocrStrategy': ladder_result['strategy'],
+                'ocrAttempts': ladder_result['attempts'],
+                'layoutRegions': layout['regions'] if layout else None,
+                'resolution': resolution,
+                'mrz': mrz_summary,
+                'codes': codes_summary,
                 'note': 'OCR Complete'
             }
             
@@ -0,0 +1,156 @@
+# python-ml/ocr/id_codes.py
+"""QR / barcode fast path for IDs that carry the holder's data in a code
+
+The PhilSys National ID QR holds a JSON document with the holder's names,
+PCN, sex and birth date; some other IDs print the ID number or a key/value
+record as a QR or 1-D barcode. Codes are found and decoded locally with
+OpenCV's QR and barcode detectors (tens of milliseconds) and the payload
+is mapped onto the standard OCR fields. The PhilSys signature is not
+verified here: the payload is used as OCR would be, and is still compared
+against what the resident typed.
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+import cv2
+
+from ocr_ladder import DEFAULT_REQUIRED_FIELDS, REQUIRED_FIELDS
+from resolution import shrink
+
+MAX_DECODE_SIDE = 1200  # px; about card-crop size, where a PhilSys QR still has ~4 px per module
+
+# Payload key (lower case, letters and digits only) -> field
+FIELD_ALIASES = {
+    'full_name': ('fullname', 'name', 'holdername'),
+    'last_name': ('lname', 'ln', 'lastname', 'surname', 'familyname'),
+    'first_name': ('fname', 'fn', 'firstname', 'givenname', 'givennames'),
+    'middle_name': ('mname', 'mn', 'middlename'),
+    'suffix': ('suffix', 'sf'),
+    'id_number': ('pcn', 'psn', 'idnumber', 'idno', 'id', 'prn', 'crn', 'licenseno', 'licensenumber', 'number'),
+    'birth_date': ('dob', 'birthdate', 'dateofbirth', 'bday', 'birthday'),
+    'address': ('address', 'addr', 'permanentaddress', 'presentaddress'),
+    'sex': ('sex', 's', 'gender'),
+}
+_KEY_TO_FIELD = {alias: field for field, aliases in FIELD_ALIASES.items() for alias in aliases}
+
+DATE_FORMATS = ('%B %d, %Y', '%b %d, %Y', '%B %d %Y', '%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%m-%d-%Y', '%d %b %Y')
+BARE_ID_NUMBER = re.compile(r'^[A-Z0-9]{1,4}(?:[- ]?[A-Z0-9]{2,}){1,5}$')
+
+_detectors = threading.local()
+
+
+def _qr_detector():
+    # The ArUco-based detector is several times faster on images without a code (most IDs)
+    if not hasattr(_detectors, 'qr'):
+        _detectors.qr = cv2.QRCodeDetectorAruco() if hasattr(cv2, 'QRCodeDetectorAruco') else cv2.QRCodeDetector()
+    return _detectors.qr
+
+
+def _barcode_detector():
+    if not hasattr(_detectors, 'barcode'):
+        _detectors.barcode = cv2.barcode.BarcodeDetector() if hasattr(cv2, 'barcode') else None
+    return _detectors.barcode
+
+
+def normalize_date(value):
+    """Any of DATE_FORMATS -> MM/DD/YYYY (the format the OCR fields use); unknown formats unchanged"""
+    text = re.sub(r'\s+', ' ', str(value)).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).strftime('%m/%d/%Y')
+        except ValueError:
+            continue
+    return text
+
+
+def _flatten(payload, into):
+    """Nested JSON objects (PhilSys 'subject' / 'sb') -> flat {normalized key: value}"""
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            _flatten(value, into)
+        elif isinstance(value, (str, int)) and str(value).strip():
+            into.setdefault(re.sub(r'[^a-z0-9]', '', str(key).lower()), str(value).strip())
+    return into
+
+
+def parse_payload(payload):
+    """Standard fields from a decoded QR / barcode payload (JSON, key: value lines or a bare ID number)"""
+    text = (payload or '').strip()
+    if not text:
+        return {}
+
+    pairs = {}
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            pairs = _flatten(data, {})
+    except ValueError:
+        for part in re.split(r'[\n|;]+', text):
+            match = re.match(r'\s*([A-Za-z][A-Za-z .#_]*?)\s*[:=]\s*(.+)', part)
+            if match:
+                pairs.setdefault(re.sub(r'[^a-z0-9]', '', match.group(1).lower()), match.group(2).strip())
+
+    fields = {}
+    for key, value in pairs.items():
+        field = _KEY_TO_FIELD.get(key)
+        if field and field not in fields:
+            fields[field] = value.upper() if field != 'birth_date' else normalize_date(value)
+
+    if not pairs and BARE_ID_NUMBER.match(text.upper()) and re.search(r'\d', text):
+        fields['id_number'] = text.upper()
+
+    if 'full_name' not in fields and any(fields.get(k) for k in ('first_name', 'last_name')):
+        fields['full_name'] = ' '.join(fields[k] for k in ('first_name', 'middle_name', 'last_name', 'suffix')
+                                       if fields.get(k))
+    return fields
+
+
+def decode_codes(img):
+    """[{'type', 'payload'}] for every QR code / barcode OpenCV can decode in img"""
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    height, width = img.shape[:2]
+    scale = MAX_DECODE_SIDE / max(height, width)
+    if scale < 1.0:
+        img = shrink(img, max(1, round(width * scale)), max(1, round(height * scale)))
+
+    codes = []
+    payload, _, _ = _qr_detector().detectAndDecode(img)
+    if payload:
+        codes.append({'type': 'QR_CODE', 'payload': payload})
+
+    barcode = _barcode_detector()
+    if barcode is not None:
+        ok, payloads, types, _ = barcode.detectAndDecodeWithType(img)
+        if ok:
+            codes.extend({'type': code_type, 'payload': payload}
+                         for payload, code_type in zip(payloads, types) if payload)
+    return codes
+
+
+def read_id_codes(img, id_type=None):
+    """Decode the ID's codes; None when there are none
+
+    Returns {'codes' (types, payload sizes), 'fields', 'complete' (the required
+    fields for id_type are all present), 'elapsedMs'}.
+    """
+    start = time.perf_counter()
+    codes = decode_codes(img)
+    if not codes:
+        return None
+
+    fields = {}
+    for code in codes:
+        for field, value in parse_payload(code['payload']).items():
+            fields.setdefault(field, value)
+
+    required = REQUIRED_FIELDS.get(id_type, DEFAULT_REQUIRED_FIELDS)
+    return {
+        'codes': [{'type': code['type'], 'length': len(code['payload'])} for code in codes],
+        'fields': fields,
+        'complete': all(fields.get(field) for field in required),
+        'elapsedMs': round((time.perf_counter() - start) * 1000, 1)
+    }
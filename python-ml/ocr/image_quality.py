@@ -0,0 +1,200 @@
+# python-ml/ocr/image_quality.py
+"""Fast image-quality gate for uploaded ID photos
+
+Runs on a downsampled grayscale copy (a few milliseconds for a phone
+photo: JPEGs are decoded at 1/2-1/8 scale, with the real size taken from
+the file header) before the CNN and Tesseract see the image. Each check produces a
+metric, and failing checks produce a reason the Node side can show to the
+user. 'reject' reasons make the upload unusable; 'warn' reasons are
+reported but the upload is still processed.
+
+Brightness and clipping describe the whole frame, and a clean white card
+with black print is mostly clipped white by design. Exposure problems
+therefore reject only when no text strokes survive (a black or washed-out
+frame); a bright or dark photo whose text is still there is only flagged.
+"""
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+ANALYSIS_SIZE = 512  # long side of the copy the metrics are computed on
+
+REDUCED_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+EXIF_ORIENTATION = 0x0112
+
+QUALITY_THRESHOLDS = {
+    'minLongSide': 480,        # px, original image
+    'minShortSide': 300,       # px, original image
+    'minSharpness': 40.0,      # Laplacian variance at ANALYSIS_SIZE: below = reject
+    'warnSharpness': 120.0,    # below = warn
+    'minBrightness': 40.0,     # mean gray level
+    'maxBrightness': 230.0,
+    'maxClipped': 0.45,        # fraction of pixels at <= 5 or >= 250
+    'minContrast': 8.0,        # gray-level standard deviation: below = reject
+    'warnContrast': 18.0,      # below = warn
+    'minTextDensity': 0.015,   # fraction of pixels on strong horizontal-gradient strokes
+}
+
+REASON_MESSAGES = {
+    'unreadable': 'The file could not be read as an image. Upload a JPG or PNG photo of the ID.',
+    'too_small': 'The photo resolution is too low. Take the photo closer to the ID or use a higher camera resolution.',
+    'blurry': 'The photo is blurry. Hold the camera steady, tap to focus on the ID and retake the photo.',
+    'slightly_blurry': 'The photo is slightly blurry, some text may not be read correctly.',
+    'too_dark': 'The photo is too dark. Retake it in better lighting.',
+    'overexposed': 'The photo is too bright or has glare. Avoid direct light or flash on the ID.',
+    'low_contrast': 'The photo has very low contrast. Retake it on a plain, contrasting background.',
+    'no_text': 'No text was detected. Make sure the whole ID fills the photo and the text side is facing the camera.',
+}
+
+
+def _reason(code, severity, value=None, threshold=None):
+    return {
+        'code': code,
+        'severity': severity,
+        'message': REASON_MESSAGES[code],
+        'value': None if value is None else round(float(value), 3),
+        'threshold': threshold
+    }
+
+
+def downsample_gray(image, size=ANALYSIS_SIZE):
+    """Grayscale copy whose long side is at most size (INTER_AREA)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    height, width = gray.shape[:2]
+    scale = size / max(height, width)
+    if scale < 1.0:
+        gray = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                          interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def quality_metrics(image, original_size=None):
+    """Resolution, sharpness, exposure and text-density metrics of a BGR or gray image
+
+    original_size (width, height) is the resolution reported and checked when
+    image is a reduced decode of a larger file.
+    """
+    width, height = original_size or (image.shape[1], image.shape[0])
+    gray = downsample_gray(image)
+
+    histogram = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    total = max(1.0, histogram.sum())
+    levels = np.arange(256)
+    brightness = float((histogram * levels).sum() / total)
+    contrast = float(np.sqrt((histogram * (levels - brightness) ** 2).sum() / total))
+
+    # Text strokes: strong horizontal gradients in short runs, which is what printed lines produce
+    gradient = np.abs(cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3))
+    strokes = gradient > max(40, 2 * float(gradient.mean()))
+
+    return {
+        'width': width,
+        'height': height,
+        'sharpness': float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+        'brightness': brightness,
+        'contrast': contrast,
+        'clipped': float((histogram[:6].sum() + histogram[250:].sum()) / total),
+        'textDensity': float(strokes.mean())
+    }
+
+
+def assess_image_quality(image, thresholds=None, original_size=None):
+    """Quality verdict for a decoded image: 'accept', 'flag' (warnings only) or 'reject'"""
+    start = time.perf_counter()
+    limits = dict(QUALITY_THRESHOLDS, **(thresholds or {}))
+
+    if image is None or image.size == 0:
+        return {
+            'verdict': 'reject',
+            'reasons': [_reason('unreadable', 'reject')],
+            'metrics': {},
+            'elapsedMs': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    metrics = quality_metrics(image, original_size)
+    reasons = []
+
+    long_side = max(metrics['width'], metrics['height'])
+    short_side = min(metrics['width'], metrics['height'])
+    if long_side < limits['minLongSide'] or short_side < limits['minShortSide']:
+        reasons.append(_reason('too_small', 'reject', short_side,
+                               f"{limits['minLongSide']}x{limits['minShortSide']}"))
+
+    # Exposure only makes the photo unusable when it has wiped out the text
+    text_found = metrics['textDensity'] >= limits['minTextDensity']
+    exposure_severity = 'warn' if text_found else 'reject'
+    if metrics['brightness'] < limits['minBrightness']:
+        reasons.append(_reason('too_dark', exposure_severity, metrics['brightness'], limits['minBrightness']))
+    elif metrics['brightness'] > limits['maxBrightness']:
+        reasons.append(_reason('overexposed', exposure_severity, metrics['brightness'], limits['maxBrightness']))
+    elif metrics['clipped'] > limits['maxClipped']:
+        code = 'too_dark' if metrics['brightness'] < 128 else 'overexposed'
+        reasons.append(_reason(code, exposure_severity, metrics['clipped'], limits['maxClipped']))
+
+    exposure_failed = any(r['code'] in ('too_dark', 'overexposed') and r['severity'] == 'reject'
+                          for r in reasons)
+    if not exposure_failed and metrics['contrast'] < limits['minContrast']:
+        reasons.append(_reason('low_contrast', 'reject', metrics['contrast'], limits['minContrast']))
+    elif not exposure_failed and metrics['contrast'] < limits['warnContrast']:
+        reasons.append(_reason('low_contrast', 'warn', metrics['contrast'], limits['warnContrast']))
+
+    # Sharpness and text are meaningless on a black or washed-out frame
+    if not exposure_failed:
+        if metrics['sharpness'] < limits['minSharpness']:
+            reasons.append(_reason('blurry', 'reject', metrics['sharpness'], limits['minSharpness']))
+        elif metrics['sharpness'] < limits['warnSharpness']:
+            reasons.append(_reason('slightly_blurry', 'warn', metrics['sharpness'], limits['warnSharpness']))
+        if not text_found:
+            reasons.append(_reason('no_text', 'reject', metrics['textDensity'], limits['minTextDensity']))
+
+    if any(r['severity'] == 'reject' for r in reasons):
+        verdict = 'reject'
+    else:
+        verdict = 'flag' if reasons else 'accept'
+
+    return {
+        'verdict': verdict,
+        'reasons': reasons,
+        'metrics': {key: round(value, 3) if isinstance(value, float) else value
+                    for key, value in metrics.items()},
+        'elapsedMs': round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+def image_header(image_path):
+    """(format, (width, height) as displayed after EXIF rotation) from the file header, or None"""
+    try:
+        with Image.open(image_path) as header:
+            width, height = header.size
+            if header.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+                width, height = height, width
+            return header.format, (width, height)
+    except Exception:
+        return None
+
+
+def assess_image_file(image_path, thresholds=None):
+    """assess_image_quality for an image on disk
+
+    JPEGs are decoded straight to grayscale at the largest 1/2, 1/4 or 1/8
+    scale that still covers ANALYSIS_SIZE, so a 12 MP photo is never
+    materialized at full resolution here.
+    """
+    start = time.perf_counter()
+    header = image_header(image_path)
+    factor = 1
+    if header and header[0] == 'JPEG':
+        long_side = max(header[1])
+        factor = next((f for f in (8, 4, 2) if long_side // f >= ANALYSIS_SIZE), 1)
+
+    gray = cv2.imread(image_path, REDUCED_GRAYSCALE_FLAGS[factor])
+    report = assess_image_quality(gray, thresholds, header[1] if header and gray is not None else None)
+    report['elapsedMs'] = round((time.perf_counter() - start) * 1000, 2)
+    return report
@@ -0,0 +1,213 @@
+# python-ml/ocr/mrz.py
+"""Passport fast path: read and validate the machine-readable zone (ICAO 9303 TD3)
+
+The two 44-character MRZ lines at the bottom of the data page carry the
+surname, given names, passport number, nationality, birth date, sex and
+expiry date, each number protected by a check digit. The band is located
+with morphology on a small copy (black-hat to lift dark text, horizontal
+gradient, closing into wide blocks). Only that band is OCR'd, with the MRZ
+alphabet as whitelist, and the fields are accepted only when every check
+digit validates.
+
+Check digits cover line 2 only. Line 1 (document code, issuing state and the
+names) must be exactly 44 MRZ characters starting with 'P', or the result is
+invalid and the caller falls back to OCR. Trailing runs of filler misreads
+('<' read as K or X) are stripped from the names, and the names are
+reported as not checksum-validated.
+"""
+import re
+import time
+from datetime import date
+
+import cv2
+import numpy as np
+import pytesseract
+
+from ocr_executor import ocr_executor
+
+ANALYSIS_HEIGHT = 600
+MIN_MRZ_WIDTH = 0.45  # fraction of the image width the MRZ lines span (less when the page isn't cropped)
+MRZ_LINE_LENGTH = 44
+MRZ_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<'
+MRZ_CONFIG = f'--psm 6 -c tessedit_char_whitelist={MRZ_WHITELIST}'
+MRZ_CHAR_HEIGHT = 32  # px the band is scaled to per text line
+
+# Typical OCR confusions, fixed according to whether a position must be a digit or a letter
+TO_DIGIT = str.maketrans('OQDIZSBG', '00012586')
+TO_LETTER = str.maketrans('0125863', 'OIZSBGE')
+# Second-line positions that are always digits: check digits, birth and expiry dates
+DIGIT_POSITIONS = frozenset([9, *range(13, 20), *range(21, 28), 43])
+# Letters Tesseract produces for runs of '<' filler
+FILLER_MISREADS = frozenset('KX')
+
+
+def check_digit(value):
+    """ICAO 9303 check digit: weights 7, 3, 1 over digits, A-Z = 10-35 and '<' = 0"""
+    total = 0
+    for i, char in enumerate(value):
+        if char.isdigit():
+            number = int(char)
+        elif 'A' <= char <= 'Z':
+            number = ord(char) - 55
+        else:
+            number = 0
+        total += number * (7, 3, 1)[i % 3]
+    return str(total % 10)
+
+
+def locate_mrz(gray):
+    """(x, y, w, h) of the MRZ band in full-resolution pixels, or None"""
+    height, width = gray.shape[:2]
+    scale = ANALYSIS_HEIGHT / height
+    small = cv2.resize(gray, (max(1, round(width * scale)), ANALYSIS_HEIGHT),
+                       interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+    small = cv2.GaussianBlur(small, (3, 3), 0)
+
+    # Dark characters on a light page -> bright blobs, then join characters and lines into a band
+    blackhat = cv2.morphologyEx(small, cv2.MORPH_BLACKHAT, cv2.getStructuringElement(cv2.MORPH_RECT, (13, 5)))
+    gradient = np.absolute(cv2.Sobel(blackhat, cv2.CV_32F, 1, 0, ksize=-1))
+    gradient = cv2.normalize(gradient, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    gradient = cv2.morphologyEx(gradient, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (13, 5)))
+    _, band = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    band = cv2.morphologyEx(band, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (21, 21)))
+    band = cv2.erode(band, None, iterations=2)
+
+    contours, _ = cv2.findContours(band, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    small_height, small_width = band.shape
+    # MRZ lines: long, flat and in the lower half of the page (or of the photo around it)
+    lines = sorted((box for box in map(cv2.boundingRect, contours)
+                    if box[2] >= MIN_MRZ_WIDTH * small_width and box[2] / max(box[3], 1) >= 5
+                    and box[1] + box[3] / 2 >= small_height / 2), key=lambda box: -box[1])
+    if not lines:
+        return None
+
+    # Start from the bottom line and take in the line just above it when they were not joined already
+    x, y, w, h = lines[0]
+    for lx, ly, lw, lh in lines[1:2]:
+        if y - (ly + lh) < 3 * lh:
+            x, y, w, h = min(x, lx), ly, max(x + w, lx + lw) - min(x, lx), y + h - ly
+
+    pad_x, pad_y = int(0.03 * w), int(0.25 * h)
+    x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+    x1, y1 = min(small_width, x + w + pad_x), min(small_height, y + h + pad_y)
+    return (int(x0 / scale), int(y0 / scale), int((x1 - x0) / scale), int((y1 - y0) / scale))
+
+
+def mrz_lines(text):
+    """The two TD3 lines from OCR text: MRZ characters only, line 2 padded / cut to 44
+
+    Line 1 is returned as read: its length is part of the structure check.
+    """
+    lines = [re.sub(r'[^A-Z0-9<]', '', line.upper()) for line in text.splitlines()]
+    lines = [line for line in lines if len(line) >= 30]
+    if len(lines) < 2:
+        return None
+    first, second = lines[-2], lines[-1]
+    return [first, second[:MRZ_LINE_LENGTH].ljust(MRZ_LINE_LENGTH, '<')]
+
+
+def strip_filler(name):
+    """Name words without trailing filler misreads: '<' read as K or X ('ANNA<MARIA<KKKK' -> 'ANNA MARIA')"""
+    # A run of 3+ filler letters glued to the last word is filler too (no name ends in KKK)
+    words = [word for word in re.sub(r'[KX]{3,}(?=<*$)', '', name).split('<') if word]
+    while words and set(words[-1]) <= FILLER_MISREADS:
+        words.pop()
+    return ' '.join(words)
+
+
+def _mrz_date(value, future=False):
+    """YYMMDD -> date; birth dates are in the past, expiry dates may be in the future"""
+    try:
+        year, month, day = int(value[:2]), int(value[2:4]), int(value[4:6])
+        this_year = date.today().year % 100
+        century = 2000 if (year <= this_year or (future and year < this_year + 50)) else 1900
+        return date(century + year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_td3(first, second):
+    """Fields and check results of a TD3 (passport) MRZ; 'valid' only if every check digit holds"""
+    # Line 1 has no check digit: only its structure shows whether it was read whole
+    structure_ok = len(first) == MRZ_LINE_LENGTH and first[0] == 'P'
+    first = first[:MRZ_LINE_LENGTH].ljust(MRZ_LINE_LENGTH, '<')
+
+    # Positions that must be digits / letters get OCR confusions corrected first
+    second = ''.join(char.translate(TO_DIGIT) if i in DIGIT_POSITIONS else char
+                     for i, char in enumerate(second))
+    first = first[:2] + first[2:].translate(TO_LETTER)
+
+    number, number_check = second[0:9], second[9]
+    birth, birth_check = second[13:19], second[19]
+    expiry, expiry_check = second[21:27], second[27]
+    personal, personal_check = second[28:42], second[42]
+    composite = second[0:10] + second[13:20] + second[21:43]
+
+    checks = {
+        'line1Structure': structure_ok,
+        'passportNumber': check_digit(number) == number_check,
+        'birthDate': check_digit(birth) == birth_check,
+        'expiryDate': check_digit(expiry) == expiry_check,
+        # An unused personal number may carry '<' instead of 0 as its check digit
+        'personalNumber': check_digit(personal) == personal_check or (personal_check == '<' and
+                                                                     not personal.strip('<')),
+        'composite': check_digit(composite) == second[43]
+    }
+
+    surname, _, given = first[5:].partition('<<')
+    surname = strip_filler(surname)
+    given = strip_filler(given)
+    birth_date = _mrz_date(birth)
+    expiry_date = _mrz_date(expiry, future=True)
+
+    fields = {
+        'full_name': f"{given} {surname}".strip(),
+        'first_name': given,
+        'last_name': surname,
+        'id_number': number.replace('<', ''),
+        'nationality': second[10:13].translate(TO_LETTER).replace('<', ''),
+        'sex': second[20] if second[20] in 'MF' else None,
+        'birth_date': birth_date.strftime('%m/%d/%Y') if birth_date else None,
+        'expiry_date': expiry_date.strftime('%m/%d/%Y') if expiry_date else None,
+        'issuing_country': first[2:5].replace('<', '')
+    }
+    return {
+        'lines': [first, second],
+        'fields': {key: value for key, value in fields.items() if value},
+        'checks': checks,
+        'namesValidated': False,  # not covered by any check digit
+        'valid': all(checks.values()) and bool(surname) and bool(birth_date)
+    }
+
+
+def is_passport_type(id_type):
+    return bool(id_type) and 'passport' in id_type.lower()
+
+
+def read_mrz(img):
+    """Locate, OCR and validate a passport MRZ; None when no MRZ band is found"""
+    start = time.perf_counter()
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    box = locate_mrz(gray)
+    if box is None:
+        return None
+
+    x, y, w, h = box
+    band = gray[y:y + h, x:x + w]
+    # Two text lines plus padding: scale so each line is about MRZ_CHAR_HEIGHT px tall
+    scale = (3 * MRZ_CHAR_HEIGHT) / max(h, 1)
+    band = cv2.resize(band, None, fx=scale, fy=scale,
+                      interpolation=cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA)
+    _, band = cv2.threshold(band, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    with ocr_executor.slot():
+        text = pytesseract.image_to_string(band, config=MRZ_CONFIG)
+
+    lines = mrz_lines(text)
+    result = parse_td3(*lines) if lines else {'lines': [], 'fields': {}, 'checks': {}, 'namesValidated': False,
+                                              'valid': False}
+    result.update({
+        'box': [x, y, w, h],
+        'elapsedMs': round((time.perf_counter() - start) * 1000, 1)
+    })
+    return result
@@ -0,0 +1,138 @@
+# python-ml/ocr/ocr_executor.py
+"""Bounded execution of Tesseract work
+
+Every Tesseract call is a separate process that keeps a core busy, so the
+API caps how many run at once:
+
+    ML_OCR_CONCURRENCY         Tesseract runs at once, all requests together (default: ML_THREADS / cores)
+    ML_OCR_DEBUG_CONCURRENCY   how many of those the debug / test endpoints may hold (default: half,
+                               at most all but one)
+
+Production OCR takes a global slot per call. Debug variant runs also need
+a debug slot, so an admin comparing preprocessing variants can use at
+most part of the OCR capacity. With a single OCR slot there is no part to
+give, so debug variants run inline one after another, each taking the
+global slot like a production call. Slots are re-entrant per thread, so a
+variant that itself runs the OCR ladder doesn't wait on its own slot.
+Work that can split across processes (strip OCR) borrows only the slots
+that are free right now, so it never waits on, or starves, other requests;
+inside debug work each borrowed slot also takes a free debug slot, so
+splitting doesn't lift debug work past its cap.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'runtime'))
+from resource_config import cpu_count, current_resource_config
+
+
+def _default_concurrency():
+    config = current_resource_config()
+    return config['threads'] if config else cpu_count()
+
+
+class OCRExecutor:
+    def __init__(self, max_concurrency=None, debug_concurrency=None):
+        self.max_concurrency = max(1, int(max_concurrency or os.environ.get('ML_OCR_CONCURRENCY')
+                                          or _default_concurrency()))
+        self.debug_concurrency = 0 if self.max_concurrency == 1 else max(1, min(self.max_concurrency - 1, int(
+            debug_concurrency or os.environ.get('ML_OCR_DEBUG_CONCURRENCY') or self.max_concurrency // 2)))
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._debug_slots = threading.BoundedSemaphore(self.debug_concurrency) if self.debug_concurrency else None
+        self._held = threading.local()
+        # Variant workers wait on debug slots, so more of them than debug slots would only sit idle
+        self._pool = (ThreadPoolExecutor(max_workers=self.debug_concurrency, thread_name_prefix='ocr')
+                      if self.debug_concurrency else None)
+
+    @contextmanager
+    def slot(self, debug=False):
+        """Hold one OCR slot (and a debug slot for debug work) around a Tesseract call"""
+        if getattr(self._held, 'depth', 0):
+            self._held.depth += 1
+            try:
+                yield
+            finally:
+                self._held.depth -= 1
+            return
+
+        debug = debug and self._debug_slots is not None
+        if debug:
+            self._debug_slots.acquire()
+        self._slots.acquire()
+        self._held.depth = 1
+        self._held.debug = debug
+        try:
+            yield
+        finally:
+            self._held.depth = 0
+            self._held.debug = False
+            self._slots.release()
+            if debug:
+                self._debug_slots.release()
+
+    @contextmanager
+    def spare_slots(self, wanted):
+        """Take up to wanted currently free slots without waiting; yields how many were taken
+
+        A thread doing debug work also needs a free debug slot for each one.
+        """
+        debug = getattr(self._held, 'debug', False)
+        taken = 0
+        while taken < wanted:
+            if debug and not self._debug_slots.acquire(blocking=False):
+                break
+            if not self._slots.acquire(blocking=False):
+                if debug:
+                    self._debug_slots.release()
+                break
+            taken += 1
+        try:
+            yield taken
+        finally:
+            for _ in range(taken):
+                self._slots.release()
+                if debug:
+                    self._debug_slots.release()
+
+    def _run_timed(self, fn, submitted, debug):
+        with self.slot(debug):
+            started = time.perf_counter()
+            try:
+                result, error = fn(), None
+            except Exception as e:
+                result, error = None, str(e)
+        return {
+            'result': result,
+            'error': error,
+            'elapsedMs': round((time.perf_counter() - started) * 1000, 1),
+            'queuedMs': round((started - submitted) * 1000, 1)
+        }
+
+    def run_variants(self, variants, debug=True):
+        """Run {name: callable} concurrently within the slot limits
+
+        Returns ({name: {'result', 'error', 'elapsedMs', 'queuedMs'}}, wall-clock ms),
+        in the order the variants were given. Without a debug pool (a single
+        OCR slot) they run inline, one at a time.
+        """
+        start = time.perf_counter()
+        if self._pool is None:
+            outcomes = {name: self._run_timed(fn, time.perf_counter(), debug) for name, fn in variants.items()}
+            return outcomes, round((time.perf_counter() - start) * 1000, 1)
+        futures = {name: self._pool.submit(self._run_timed, fn, time.perf_counter(), debug)
+                   for name, fn in variants.items()}
+        outcomes = {name: future.result() for name, future in futures.items()}
+        return outcomes, round((time.perf_counter() - start) * 1000, 1)
+
+    def status(self):
+        return {
+            'maxConcurrency': self.max_concurrency,
+            'debugConcurrency': self.debug_concurrency
+        }
+
+
+ocr_executor = OCRExecutor()
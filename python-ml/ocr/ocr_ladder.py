@@ -0,0 +1,213 @@
+# python-ml/ocr/ocr_ladder.py
+"""Confidence-driven OCR strategy ladder
+
+Each strategy is one preprocessing + Tesseract page-segmentation mode. The
+ladder runs the strategies one at a time, cheapest-expected-first, and stops
+as soon as the mean word confidence and the required-field coverage pass.
+Per document type it counts how often each strategy was the one that
+passed, and orders the ladder by success rate per unit of cost, so IDs that
+always need CLAHE + sparse-text mode go straight there.
+"""
+import json
+import os
+import threading
+import time
+
+import cv2
+
+from field_extractor import field_extractor
+from strip_ocr import image_to_data
+
+MIN_WORD_CONFIDENCE = 60.0
+STATS_SAVE_INTERVAL = 10.0  # seconds between writes of the success counters
+
+
+def _threshold(gray):
+    _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+    return binary
+
+
+def _clahe_otsu(gray):
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    _, binary = cv2.threshold(clahe.apply(gray), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+
+def _gray(gray):
+    return gray
+
+
+# name -> (preprocessing, Tesseract config, relative cost); listed in default ladder order
+OCR_STRATEGIES = {
+    'threshold_psm6': (_threshold, '--psm 6', 1.0),
+    'clahe_otsu_psm6': (_clahe_otsu, '--psm 6', 1.1),
+    'clahe_otsu_psm4': (_clahe_otsu, '--psm 4', 1.2),
+    'gray_psm11': (_gray, '--psm 11', 1.5),
+    'gray_psm3': (_gray, '--psm 3', 2.0),
+}
+
+# Fields that must be readable for an OCR result to count as usable
+REQUIRED_FIELDS = {
+    'Barangay ID': ('full_name', 'address'),
+    'Voters ID': ('full_name', 'address'),
+    'Postal ID': ('full_name', 'address'),
+}
+DEFAULT_REQUIRED_FIELDS = ('full_name', 'id_number')
+
+# ID types the success counters are kept for; anything else a client sends counts as 'Unknown'
+STATS_ID_TYPES = frozenset(REQUIRED_FIELDS) | {
+    'Philippine Passport',
+    'UMID (Unified Multi-Purpose ID)',
+    'Drivers License (LTO)',
+    'National ID (PhilSys)',
+    'SSS ID (Social Security System)',
+    'PhilHealth ID',
+    'Municipal ID',
+    'Student ID',
+    'TIN ID (Tax Identification Number)',
+}
+
+
+def stats_key(id_type):
+    """Counter key for an ID type: the type itself when known, else 'Unknown'"""
+    return id_type if id_type in STATS_ID_TYPES else 'Unknown'
+
+
+def text_from_data(data):
+    """Rebuild image_to_string-style text from image_to_data output"""
+    lines = []
+    current_key = None
+    current_block = None
+    words = []
+    for i, word in enumerate(data['text']):
+        if not word or not word.strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != current_key:
+            if words:
+                lines.append(' '.join(words))
+            if current_block is not None and key[0] != current_block:
+                lines.append('')
+            current_key, current_block, words = key, key[0], []
+        words.append(word.strip())
+    if words:
+        lines.append(' '.join(words))
+    return '\n'.join(lines)
+
+
+def mean_word_confidence(data):
+    confidences = [float(c) for c, word in zip(data['conf'], data['text'])
+                   if word and word.strip() and float(c) > 0]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+class OCRStrategyLadder:
+    def __init__(self, stats_path=None, adaptive=True, min_confidence=MIN_WORD_CONFIDENCE):
+        self.stats_path = stats_path
+        self.adaptive = adaptive
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.stats = self._load_stats()
+
+    def _load_stats(self):
+        if not self.stats_path:
+            return {}
+        try:
+            with open(self.stats_path, 'r') as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(stats, dict):
+            return {}
+        # Drop counters a client-supplied idType created before keys were restricted
+        return {id_type: counts for id_type, counts in stats.items()
+                if id_type in STATS_ID_TYPES or id_type == 'Unknown'}
+
+    def save_stats(self, force=False):
+        if not self.stats_path:
+            return
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._last_save < STATS_SAVE_INTERVAL):
+                return
+            snapshot = json.dumps(self.stats, indent=2)
+            self._dirty = False
+            self._last_save = time.time()
+        os.makedirs(os.path.dirname(os.path.abspath(self.stats_path)), exist_ok=True)
+        tmp_path = f"{self.stats_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.stats_path)
+
+    def order_for(self, id_type=None):
+        """Strategy names, highest (smoothed success rate / cost) first"""
+        names = list(OCR_STRATEGIES)
+        if not self.adaptive:
+            return names
+        with self._lock:
+            counts = self.stats.get(stats_key(id_type), {})
+
+            def expected_value(name):
+                entry = counts.get(name, {})
+                # Prior of 1 success in 2 tries keeps untried strategies in the running
+                rate = (entry.get('successes', 0) + 1) / (entry.get('attempts', 0) + 2)
+                return rate / OCR_STRATEGIES[name][2]
+
+            return sorted(names, key=lambda name: (-expected_value(name), names.index(name)))
+
+    def _record(self, id_type, attempts, winner):
+        with self._lock:
+            counts = self.stats.setdefault(stats_key(id_type), {})
+            for attempt in attempts:
+                entry = counts.setdefault(attempt['strategy'], {'attempts': 0, 'successes': 0, 'totalMs': 0.0})
+                entry['attempts'] += 1
+                entry['totalMs'] = round(entry['totalMs'] + attempt['elapsedMs'], 1)
+                if attempt['strategy'] == winner:
+                    entry['successes'] += 1
+            self._dirty = True
+        self.save_stats()
+
+    def run(self, img, id_type=None):
+        """OCR img (BGR or gray) up the ladder; returns the first passing or the best attempt"""
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        required = REQUIRED_FIELDS.get(id_type, DEFAULT_REQUIRED_FIELDS)
+
+        attempts = []
+        best = None
+        winner = None
+        for name in self.order_for(id_type):
+            preprocess, config, _ = OCR_STRATEGIES[name]
+            start = time.perf_counter()
+            # Large images are read as parallel strips when OCR slots are free
+            data, strips = image_to_data(preprocess(gray), config)
+            text = text_from_data(data)
+            confidence = mean_word_confidence(data)
+            found = field_extractor.extract_fields(text, id_type) if text else {}
+            coverage = sum(1 for field in required if found.get(field)) / len(required)
+
+            attempt = {
+                'strategy': name,
+                'text': text,
+                'confidence': round(confidence, 1),
+                'fieldCoverage': round(coverage, 2),
+                'strips': strips,
+                'elapsedMs': round((time.perf_counter() - start) * 1000, 1)
+            }
+            attempts.append(attempt)
+
+            if best is None or (coverage, confidence) > (best['fieldCoverage'], best['confidence']):
+                best = attempt
+            if confidence >= self.min_confidence and coverage >= 1.0:
+                winner = name
+                break
+
+        self._record(id_type, attempts, winner)
+        return {
+            'text': best['text'],
+            'confidence': best['confidence'],
+            'strategy': best['strategy'],
+            'passed': winner is not None,
+            'attempts': [{key: value for key, value in attempt.items() if key != 'text'}
+                         for attempt in attempts]
+        }
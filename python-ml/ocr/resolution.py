@@ -0,0 +1,105 @@
+# python-ml/ocr/resolution.py
+"""Resolution normalization before OCR
+
+Tesseract time grows with the number of pixels, but its accuracy depends on
+how tall the text is: it reads best at roughly 300 DPI, where ID-card text
+is 25-35 px tall. A 12 MP phone photo gives it several times that, and a
+thumbnail far less. The text height is estimated from the connected
+components of a small binarized copy and the image is rescaled so text
+lands at TARGET_TEXT_HEIGHT. When too few character-like components are
+found, a card crop is scaled to the ID-1 width at TARGET_DPI, and other
+images are only brought within MIN_LONG_SIDE..MAX_LONG_SIDE.
+"""
+import time
+
+import cv2
+import numpy as np
+
+TARGET_DPI = 300
+CARD_WIDTH_MM = 85.60
+CARD_WIDTH_PX = round(CARD_WIDTH_MM / 25.4 * TARGET_DPI)  # ID-1 card width at TARGET_DPI (1011 px)
+CARD_ASPECT = 85.60 / 53.98
+
+TARGET_TEXT_HEIGHT = 28.0   # px, median character height after scaling (8-10 pt capitals at 300 DPI)
+ANALYSIS_SIZE = 1024        # long side of the copy text height is estimated on
+MIN_COMPONENTS = 15         # character-like components needed to trust the estimate
+MIN_SCALE, MAX_SCALE = 0.15, 4.0
+MIN_LONG_SIDE, MAX_LONG_SIDE = 1000, 3200
+SCALE_DEADBAND = 0.15       # closer than this to 1.0: leave the image alone
+
+
+def shrink(img, width, height):
+    """Downscale to (width, height) without paying for INTER_AREA's slow non-integer path
+
+    Large reductions take a bilinear step to exactly twice the target, then an
+    exact 2:1 area average; reductions under 2x are plain bilinear.
+    """
+    if img.shape[1] < 2 * width or img.shape[0] < 2 * height:
+        return cv2.resize(img, (width, height), interpolation=cv2.INTER_LINEAR)
+    img = cv2.resize(img, (2 * width, 2 * height), interpolation=cv2.INTER_LINEAR)
+    return cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def estimate_text_height(img):
+    """Median height (px, full resolution) of character-like blobs, or None when there are too few"""
+    height, width = img.shape[:2]
+    scale = min(1.0, ANALYSIS_SIZE / max(height, width))
+    small = img
+    if scale < 1.0:
+        small = shrink(img, max(1, round(width * scale)), max(1, round(height * scale)))
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    # Dark text on a light card: invert so characters are the foreground
+    _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return None
+
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    fill = stats[1:, cv2.CC_STAT_AREA] / np.maximum(1, w * h)
+    characters = ((h >= 4) & (h <= small.shape[0] * 0.1) &
+                  (w <= h * 2.0) & (w >= h * 0.1) & (fill >= 0.15) & (fill <= 0.95))
+    if characters.sum() < MIN_COMPONENTS:
+        return None
+    return float(np.median(h[characters])) / scale
+
+
+def normalize_resolution(img, target_text_height=TARGET_TEXT_HEIGHT):
+    """(rescaled image, info) so that text is about target_text_height px tall
+
+    info: method ('text_height', 'card_width', 'size_bounds' or 'unchanged'),
+    textHeight (estimated, original px), scale, size [w, h] after scaling, elapsedMs.
+    """
+    start = time.perf_counter()
+    height, width = img.shape[:2]
+    text_height = estimate_text_height(img)
+    long_side = max(height, width)
+    if text_height:
+        method, scale = 'text_height', target_text_height / text_height
+    elif abs(max(width, height) / min(width, height) - CARD_ASPECT) <= 0.1 * CARD_ASPECT:
+        method, scale = 'card_width', CARD_WIDTH_PX / long_side
+    elif long_side < MIN_LONG_SIDE:
+        method, scale = 'size_bounds', MIN_LONG_SIDE / long_side
+    elif long_side > MAX_LONG_SIDE:
+        method, scale = 'size_bounds', MAX_LONG_SIDE / long_side
+    else:
+        method, scale = 'unchanged', 1.0
+
+    # Never blow up past MAX_LONG_SIDE or shrink below a readable size
+    scale = min(MAX_SCALE, max(MIN_SCALE, scale), MAX_LONG_SIDE / long_side)
+    if abs(scale - 1.0) < SCALE_DEADBAND:
+        scale = 1.0
+    elif scale < 1.0:
+        img = shrink(img, max(1, round(width * scale)), max(1, round(height * scale)))
+    else:
+        img = cv2.resize(img, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_CUBIC)
+
+    return img, {
+        'method': method,
+        'textHeight': round(text_height, 1) if text_height else None,
+        'scale': round(scale, 3),
+        'size': [img.shape[1], img.shape[0]],
+        'elapsedMs': round((time.perf_counter() - start) * 1000, 2)
+    }
@@ -0,0 +1,112 @@
+# python-ml/ocr/strip_ocr.py
+"""Parallel strip-wise OCR for large images
+
+One Tesseract process reads a page on essentially one core, so a large scan
+is bounded by a single core no matter how many are idle. Above
+STRIP_MIN_PIXELS the image is cut into horizontal strips at whitespace
+gaps found by the row projection profile (so no text line is split), the
+strips are OCR'd concurrently in separate Tesseract processes, and their
+image_to_data output is stitched back together: boxes shifted by the strip
+offset, block numbers renumbered, so reading order and per-word confidences
+are preserved.
+
+Strips only use OCR slots that are free at that moment (ocr_executor), so a
+busy server falls back to whole-image OCR instead of queueing.
+
+    ML_STRIP_OCR_MIN_PIXELS   image size (pixels) from which strips are used (default 4000000)
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytesseract
+
+from ocr_executor import ocr_executor
+
+STRIP_MIN_PIXELS = int(os.environ.get('ML_STRIP_OCR_MIN_PIXELS') or 4_000_000)
+MIN_STRIP_HEIGHT = 200      # px; shorter strips cost more in process start-up than they save
+MIN_GAP_ROWS = 3            # consecutive blank rows that count as a gap between text lines
+BLANK_ROW_INK = 0.002       # fraction of dark pixels below which a row is blank
+CUT_SEARCH = 0.25           # how far (fraction of a strip) a cut may move to find a gap
+STRIPPABLE_PSMS = ('--psm 3', '--psm 4', '--psm 6', '--psm 11')  # page / block modes, not single lines
+
+DATA_KEYS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+             'left', 'top', 'width', 'height', 'conf', 'text')
+
+_strip_pool = ThreadPoolExecutor(max_workers=max(1, ocr_executor.max_concurrency - 1),
+                                 thread_name_prefix='ocr-strip')
+
+
+def blank_gaps(image):
+    """(start, end) row ranges with no ink, at least MIN_GAP_ROWS tall"""
+    if image.dtype != np.uint8 or len(np.unique(image[::8, ::8])) > 2:
+        _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    ink = (image < 128).mean(axis=1)
+    blank = np.concatenate(([False], ink <= BLANK_ROW_INK, [False]))
+    edges = np.flatnonzero(np.diff(blank.astype(np.int8)))
+    return [(start, end) for start, end in zip(edges[::2], edges[1::2]) if end - start >= MIN_GAP_ROWS]
+
+
+def strip_cuts(image, strips):
+    """Row offsets cutting image into up to strips pieces, each cut in the middle of a blank gap"""
+    height = image.shape[0]
+    strips = min(strips, height // MIN_STRIP_HEIGHT)
+    if strips < 2:
+        return []
+    gaps = blank_gaps(image)
+    centres = np.array([(start + end) // 2 for start, end in gaps])
+    if not len(centres):
+        return []
+
+    cuts = []
+    window = CUT_SEARCH * height / strips
+    for k in range(1, strips):
+        ideal = height * k / strips
+        nearest = int(centres[np.argmin(np.abs(centres - ideal))])
+        if abs(nearest - ideal) <= window and nearest - (cuts[-1] if cuts else 0) >= MIN_STRIP_HEIGHT \
+                and height - nearest >= MIN_STRIP_HEIGHT:
+            cuts.append(nearest)
+    return cuts
+
+
+def stitch(parts):
+    """Merge image_to_data dicts of strips [(row offset, data), ...] into one, in reading order"""
+    merged = {key: [] for key in DATA_KEYS}
+    block_offset = 0
+    for offset, data in parts:
+        for key in DATA_KEYS:
+            values = data.get(key, [])
+            if key == 'top':
+                values = [value + offset for value in values]
+            elif key == 'block_num':
+                values = [value + block_offset if value else value for value in values]
+            merged[key].extend(values)
+        block_offset += max(data.get('block_num') or [0])
+    return merged
+
+
+def _read(image, config):
+    return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+
+def image_to_data(image, config, min_pixels=STRIP_MIN_PIXELS):
+    """pytesseract.image_to_data (dict output) of a preprocessed image, in strips when large
+
+    Holds an OCR slot for the call; returns (data, strips used).
+    """
+    with ocr_executor.slot():
+        if image.shape[0] * image.shape[1] < min_pixels or config.split(' -c')[0] not in STRIPPABLE_PSMS:
+            return _read(image, config), 1
+
+        with ocr_executor.spare_slots(ocr_executor.max_concurrency - 1) as spare:
+            cuts = strip_cuts(image, spare + 1) if spare else []
+            if not cuts:
+                return _read(image, config), 1
+
+            bounds = list(zip([0] + cuts, cuts + [image.shape[0]]))
+            # This thread reads the first strip; one borrowed slot per remaining strip
+            futures = [_strip_pool.submit(_read, image[top:bottom], config) for top, bottom in bounds[1:]]
+            parts = [(0, _read(image[:bounds[0][1]], config))]
+            parts += [(top, future.result()) for (top, _), future in zip(bounds[1:], futures)]
+            return stitch(parts), len(bounds)
@@ -0,0 +1,54 @@
+# python-ml/runtime/pipeline_config.py
+"""Switches for the optional stages of the upload pipeline
+
+Read once from the environment at import:
+
+    ML_QUALITY_GATE        'flag' (default): report the quality check but process every upload
+                           'reject': unusable photos get HTTP 422 before CNN/OCR
+                           'off': skip the check
+    ML_OCR_LADDER          'adaptive' (default): order OCR strategies by per-document-type success
+                           'static': always use the default ladder order
+    ML_CARD_CROP           'ocr' (default): detect the ID card and OCR the perspective-corrected crop
+                           'all': also classify the crop (for CNNs trained on cropped cards)
+                           'off': use the whole photo everywhere
+    ML_LAYOUT_OCR          'on' (default): read fields from per-type template regions of the card crop,
+                           falling back to the full-card OCR ladder when required fields are missing
+                           'off': full-card OCR only
+    ML_OCR_RESOLUTION      'auto' (default): rescale images so text is ~28 px tall before full-card OCR
+                           'off': OCR at the uploaded resolution
+    ML_CODE_DECODE         'on' (default): decode QR codes / barcodes on the ID and skip OCR when
+                           the payload carries the required fields
+                           'off': OCR only
+"""
+import os
+
+QUALITY_GATE_MODES = ('reject', 'flag', 'off')
+OCR_LADDER_MODES = ('adaptive', 'static')
+CARD_CROP_MODES = ('ocr', 'all', 'off')
+LAYOUT_OCR_MODES = ('on', 'off')
+OCR_RESOLUTION_MODES = ('auto', 'off')
+CODE_DECODE_MODES = ('on', 'off')
+
+
+def _env_choice(name, choices, default):
+    value = os.environ.get(name, '').strip().lower()
+    if not value:
+        return default
+    if value not in choices:
+        print(f"⚠️ Ignoring {name}={value!r} (expected one of: {', '.join(choices)})")
+        return default
+    return value
+
+
+def resolve_pipeline_config():
+    return {
+        'qualityGate': _env_choice('ML_QUALITY_GATE', QUALITY_GATE_MODES, 'flag'),
+        'ocrLadder': _env_choice('ML_OCR_LADDER', OCR_LADDER_MODES, 'adaptive'),
+        'cardCrop': _env_choice('ML_CARD_CROP', CARD_CROP_MODES, 'ocr'),
+        'layoutOcr': _env_choice('ML_LAYOUT_OCR', LAYOUT_OCR_MODES, 'on'),
+        'ocrResolution': _env_choice('ML_OCR_RESOLUTION', OCR_RESOLUTION_MODES, 'auto'),
+        'codeDecode': _env_choice('ML_CODE_DECODE', CODE_DECODE_MODES, 'on')
+    }
+
+
+pipeline_config = resolve_pipeline_config()
@@ -0,0 +1,156 @@
+# python-ml/runtime/resource_config.py
+"""CPU thread budget shared by TensorFlow, OpenCV and Tesseract
+
+Each library otherwise sizes its thread pool to every core on the box, so
+several API workers oversubscribe the CPU. All settings come from the
+environment so a process manager can give each worker its own slice:
+
+    ML_WORKERS             workers sharing this machine (default 1)
+    ML_WORKER_INDEX        this worker's index, used for automatic affinity (default 0)
+    ML_THREADS             CPU threads for this worker (default cores / ML_WORKERS)
+    ML_TF_INTRA_THREADS    TensorFlow intra-op threads (default ML_THREADS)
+    ML_TF_INTER_THREADS    TensorFlow inter-op threads (default 1 for serving, 2 for training)
+    ML_OPENCV_THREADS      OpenCV threads (default ML_THREADS)
+    ML_TESSERACT_THREADS   Tesseract OpenMP threads via OMP_THREAD_LIMIT (default 1)
+    ML_CPU_AFFINITY        'auto' (slice by worker index), a core list like '0-3,8', or unset
+    ML_NICE                lower this process's CPU priority by this much (POSIX only, default 0)
+"""
+import os
+
+_applied = None
+
+
+def cpu_count():
+    """Cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _env_int(name, default, minimum=1):
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return max(minimum, int(value))
+    except ValueError:
+        print(f"⚠️ Ignoring {name}={value!r} (not a number)")
+        return default
+
+
+def parse_core_list(text):
+    """'0-3,8' -> [0, 1, 2, 3, 8]"""
+    cores = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cores.update(range(int(start), int(end) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def resolve_resource_config(role='serving'):
+    """Thread counts and affinity for this process, from the environment"""
+    cores = cpu_count()
+    workers = _env_int('ML_WORKERS', 1)
+    try:
+        worker_index = max(0, int(os.environ.get('ML_WORKER_INDEX') or 0))
+    except ValueError:
+        worker_index = 0
+    threads = _env_int('ML_THREADS', max(1, cores // workers))
+
+    affinity = None
+    affinity_setting = os.environ.get('ML_CPU_AFFINITY', '').strip().lower()
+    if affinity_setting == 'auto':
+        total = os.cpu_count() or 1
+        start = (worker_index * threads) % total
+        affinity = [(start + i) % total for i in range(min(threads, total))]
+    elif affinity_setting:
+        try:
+            affinity = parse_core_list(affinity_setting)
+        except ValueError:
+            print(f"⚠️ Ignoring ML_CPU_AFFINITY={affinity_setting!r} (expected e.g. '0-3,8')")
+
+    return {
+        'role': role,
+        'workers': workers,
+        'workerIndex': worker_index,
+        'threads': threads,
+        'tfIntraOpThreads': _env_int('ML_TF_INTRA_THREADS', threads),
+        'tfInterOpThreads': _env_int('ML_TF_INTER_THREADS', 2 if role == 'training' else 1),
+        'opencvThreads': _env_int('ML_OPENCV_THREADS', threads),
+        'tesseractThreads': _env_int('ML_TESSERACT_THREADS', 1),
+        'cpuAffinity': affinity,
+        'niceness': _env_int('ML_NICE', 0, minimum=0)
+    }
+
+
+def apply_resource_config(role='serving', quiet=False):
+    """Apply the thread budget once per process; returns the applied settings
+
+    Call before the first TensorFlow op runs: TensorFlow's pools are fixed
+    once it has initialized.
+    """
+    global _applied
+    if _applied is not None:
+        return _applied
+
+    config = resolve_resource_config(role)
+
+    # Tesseract is a child process of pytesseract and inherits this environment
+    os.environ['OMP_THREAD_LIMIT'] = str(config['tesseractThreads'])
+
+    if config['cpuAffinity'] and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, config['cpuAffinity'])
+        except (OSError, ValueError) as e:
+            print(f"⚠️ CPU affinity not applied: {e}")
+            config['cpuAffinity'] = None
+    elif config['cpuAffinity']:
+        # Windows / macOS: no per-process affinity API in the standard library
+        print("⚠️ CPU affinity is not supported on this platform, ignoring ML_CPU_AFFINITY")
+        config['cpuAffinity'] = None
+
+    if config['niceness'] and hasattr(os, 'nice'):
+        try:
+            os.nice(config['niceness'])
+        except OSError as e:
+            print(f"⚠️ Priority not lowered: {e}")
+            config['niceness'] = 0
+    elif config['niceness']:
+        # Windows: the parent starts the process with a lower priority class instead
+        config['niceness'] = 0
+    
+    try:
+        import cv2
+        cv2.setNumThreads(config['opencvThreads'])
+    except ImportError:
+        pass
+
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(config['tfIntraOpThreads'])
+        tf.config.threading.set_inter_op_parallelism_threads(config['tfInterOpThreads'])
+    except ImportError:
+        pass
+    except RuntimeError as e:
+        # TensorFlow already ran an op in this process
+        print(f"⚠️ TensorFlow thread pools already initialized: {e}")
+
+    _applied = config
+    if not quiet:
+        affinity = ','.join(map(str, config['cpuAffinity'])) if config['cpuAffinity'] else 'any'
+        print(f"⚙️ CPU budget ({role}): worker {config['workerIndex'] + 1}/{config['workers']}, "
+              f"TF {config['tfIntraOpThreads']}+{config['tfInterOpThreads']} threads, "
+              f"OpenCV {config['opencvThreads']}, Tesseract {config['tesseractThreads']}, cores {affinity}"
+              + (f", nice +{config['niceness']}" if config['niceness'] else ''))
+    return config
+
+
+def current_resource_config():
+    """Settings applied in this process, or None"""
+    return _applied
@@ -317,6 +317,20 @@ exports.createDocumentRequest = async (req, res) => {
             // Run CNN classification
             cnnResult = await cnnService.classifyID(imageBuffer);
             
+            // Unusable photo (blurry, dark, no text): ask for a new one before doing any OCR
+            if (cnnResult.qualityRejected) {
+                return res.status(422).json({
+                    success: false,
+                    error: 'Image quality too low for verification',
+                    userMessage: cnnResult.userMessage,
+                    qualityCheck: cnnResult.qualityCheck,
+                    options: {
+                        uploadNew: true,
+                        cancel: true
+                    }
+                });
+            }
+            
             // Run OCR extraction
             ocrResult = await ocrService.extractTextFromImage(imageBuffer, cnnResult.detectedIdType);
             
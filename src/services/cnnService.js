@@ -153,6 +153,11 @@ class CNNService {
             return result;
             
         } catch (error) {
+            // 422 = the photo failed the Python image-quality gate: ask for a new photo, don't simulate
+            if (error.response?.status === 422) {
+                return this.qualityRejection(error.response.data);
+            }
+            
             console.error('❌ Python API Classification error:');
             console.error('   Message:', error.message);
             
@@ -167,6 +172,24 @@ class CNNService {
         }
     }
 
+    qualityRejection(pythonResult) {
+        console.log('⚠️ Photo rejected by the image-quality check');
+        console.log('   Reasons:', (pythonResult.qualityCheck?.reasons || []).map(r => r.code).join(', '));
+        
+        return {
+            detectedIdType: 'Unknown',
+            confidenceScore: 0,
+            category: this.getDocumentCategory('Unknown'),
+            isAccepted: false,
+            isRealCNN: true,
+            qualityRejected: true,
+            userMessage: pythonResult.userMessage || 'The photo quality is too low. Please retake the photo of your ID.',
+            qualityCheck: pythonResult.qualityCheck || null,
+            backend: 'Python TensorFlow API',
+            pythonResponse: pythonResult
+        };
+    }
+
     async classifySimulation(imageBuffer) {
         // Simulation for thesis demonstration
         console.log('⚠️ Using simulation mode (Python API unavailable)');
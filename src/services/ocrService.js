@@ -73,6 +73,21 @@ class OCRService {
             return result;
             
         } catch (error) {
+            // 422 = the photo failed the Python image-quality gate: JS Tesseract would fail on it too
+            if (error.response?.status === 422) {
+                return {
+                    text: '',
+                    confidence: 0,
+                    words: [],
+                    lines: [],
+                    backend: 'Python OCR (Real)',
+                    fields: {},
+                    qualityRejected: true,
+                    userMessage: error.response.data.userMessage,
+                    qualityCheck: error.response.data.qualityCheck || null
+                };
+            }
+            
             console.error('❌ Python OCR error:');
             console.error('   Message:', error.message);
             
@@ -265,6 +280,11 @@ class OCRService {
             return response.data;
             
         } catch (error) {
+            // Quality-gate rejection: pass the user-facing reasons through instead of retrying
+            if (error.response?.status === 422) {
+                return error.response.data;
+            }
+            
             console.error('Complete verification error:', error.message);
             
             // Fallback to separate CNN + OCR